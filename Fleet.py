@@ -4,12 +4,27 @@ import functools
 import pandas as pd
 import numpy as np
 import os
+from concurrent.futures import ProcessPoolExecutor
 from Model.WindFarm import WindFarm, FarmComponent
+from Model.ChunkedWindFarm import (
+    DEFAULT_WINDOW_DAYS,
+    ChunkedWindFarm,
+    get_required_overlap_days,
+    select_owned_days,
+)
+from Model.DailyResultStore import DailyResultStore
+from Model.WindFarmOutputs import WindFarmOutputs, get_windfarm_outputs
 
 from enum import Enum
 from Utils.Enums import DataSourceType
 from Model.DataAccess import RepositoryFactory
 from Utils.Constants import PROJECT_SUBSETS
+from Utils.ParquetFiles import (
+    is_parquet_path,
+    read_column_names,
+    read_compressed,
+    read_time_series,
+)
 
 
 class InputFileType(Enum):
@@ -17,6 +32,148 @@ class InputFileType(Enum):
     COMPRESSED = "compressed"
 
 
+def get_turbines_subset(path, data, turbines):
+    """Return the columns of the given turbines.
+
+    Args:
+        path (str): The time indexed file of a project.
+        data (pandas.DataFrame): The content of that file, or None to
+            read only the columns of the subset from the file.
+        turbines (list): The turbines of the subset.
+
+    Returns:
+        (pandas.DataFrame): The columns of the subset.
+    """
+    columns = read_column_names(path) if data is None else data.columns
+    subset_columns = [x for x in columns if any(y in x for y in turbines)]
+    if data is None:
+        return read_time_series(path, columns=subset_columns)
+    return data[subset_columns]
+
+
+def get_compressed_subset(compressed_data, turbines):
+    """Return the (datetime, value) column pairs of the given turbines.
+
+    Args:
+        compressed_data (pandas.DataFrame): The compressed data of a project.
+        turbines (list): The turbines of the subset.
+
+    Returns:
+        (pandas.DataFrame): The columns of the subset.
+    """
+    cmp_col_to_keep = []
+    # Iterate through the data columns
+    for i in range(1, len(compressed_data.columns), 2):
+        col_name = compressed_data.columns[i]
+        if any(x in col_name for x in turbines):
+            datetime_col = compressed_data.columns[i - 1]
+            cmp_col_to_keep.append(datetime_col)
+            cmp_col_to_keep.append(col_name)
+
+    return compressed_data.loc[:, cmp_col_to_keep]
+
+
+def create_windfarm_outputs(job):
+    """Build one wind farm and return only its daily outputs.
+
+    This runs in the worker processes of a `Fleet` with `max_workers`, so
+    the job only holds file paths and names, and only the daily frames
+    are sent back (not the WindFarm and its data).
+
+    Args:
+        job (dict): See `Fleet._get_windfarm_jobs`.
+
+    Returns:
+        (WindFarmOutputs): The daily outputs of the farm.
+    """
+    print(f"Fleet: Processing {job['name']} in process {os.getpid()}...")
+    if job["window_days"] is not None:
+        windfarm = ChunkedWindFarm(
+            avg_path=job["avg_path"],
+            compressed_path=job["compressed_path"],
+            yaw_path=job["yaw_path"],
+            turbines=job["turbines"],
+            window_days=job["window_days"],
+            overlap_days=job["overlap_days"],
+            start=job.get("start"),
+            data_freq="10T",
+            project=job["project"],
+            technology=job["technology"],
+            oem_powercurve_path=job["oem_powercurve_path"],
+        )
+        outputs = windfarm._process()
+    else:
+        if job["turbines"] is None:
+            windfarm = WindFarm(
+                avg_path=job["avg_path"],
+                compressed_path=job["compressed_path"],
+                yaw_path=job["yaw_path"],
+                data_source_type=(
+                    DataSourceType.PARQUET
+                    if is_parquet_path(job["avg_path"])
+                    else DataSourceType.CSV
+                ),
+                data_freq="10T",
+                project=job["project"],
+                oem_powercurve_path=job["oem_powercurve_path"],
+            )
+        else:
+            # not every project has yaw data
+            yaw_data = None
+            if job["yaw_path"] is not None:
+                yaw_data = get_turbines_subset(job["yaw_path"], None, job["turbines"])
+            windfarm = WindFarm(
+                avg_data=get_turbines_subset(job["avg_path"], None, job["turbines"]),
+                compressed_data=get_compressed_subset(
+                    read_compressed(job["compressed_path"]), job["turbines"]
+                ),
+                yaw_data=yaw_data,
+                data_source_type=DataSourceType.CSV,
+                data_freq="10T",
+                project=job["project"],
+                technology=job["technology"],
+                oem_powercurve_path=job["oem_powercurve_path"],
+            )
+        # everything Fleet combines is computed here, since the farm is not kept
+        outputs = get_windfarm_outputs(
+            windfarm, with_powercurves=job["oem_powercurve_path"] is not None
+        )
+    return WindFarmOutputs(job["project"], technology=job["technology"], outputs=outputs)
+
+
+def append_daily_output(path, daily_output, first_day=None):
+    """Write a daily output to a CSV file, keeping the days it does not cover.
+
+    The rows of the file from `first_day` on are replaced by `daily_output`,
+    and the rows before it are kept, so a run that only computed the last
+    days can update the full history file.
+
+    Args:
+        path (str): The CSV file, like "power_curve.csv". It is written in
+            full if it does not exist.
+        daily_output (pandas.DataFrame): The days from `first_day` on,
+            indexed by day or with a "Day" column (the power curves).
+        first_day (pandas.Timestamp, optional): The first day of
+            `daily_output`. Defaults to None, to overwrite the file.
+    """
+    # the file header holds strings, like the power curve bins
+    daily_output = daily_output.copy()
+    daily_output.columns = daily_output.columns.astype(str)
+    ignore_index = "Day" in daily_output.columns
+    # the power curves are indexed by turbine and day, the other outputs by day
+    indexed_by_day = not ignore_index and "Day" not in daily_output.index.names
+    if first_day is not None and os.path.exists(path):
+        stored_output = pd.read_csv(
+            path,
+            index_col=list(range(daily_output.index.nlevels)),
+            parse_dates=[0] if indexed_by_day else None,
+        )
+        # the rows that are not of a day, like the OEM power curve, are in daily_output
+        stored_output = select_owned_days(stored_output, pd.Timestamp.min, first_day)
+        daily_output = pd.concat([stored_output, daily_output], ignore_index=ignore_index)
+    daily_output.to_csv(path)
+
+
 class Fleet:
     """
     Represents a fleet of wind farms.
@@ -44,6 +201,8 @@ class Fleet:
         yaw_dir=None,
         oem_powercurves_path=None,
         single_plant=None,
+        window_days=None,
+        max_workers=None,
     ):
         """
         Initializes a Fleet object.
@@ -55,6 +214,13 @@ class Fleet:
             oem_power_curve_path(str, optional): path to the warranted power curves all plants
             single_plant (str, optional): 3 letter code. if specified will only run for
                 the specified plant
+            window_days (int, optional): if specified, each wind farm is processed in windows of
+                this many days (see Model.ChunkedWindFarm), so that the memory used does not
+                grow with the length of the history. Only the daily outputs are available then.
+            max_workers (int, optional): if specified, the wind farms (one per project, or per
+                technology of the projects in PROJECT_SUBSETS) are processed in parallel by this
+                many worker processes. Only their daily outputs are sent back, so the values of
+                `windfarms` are then `WindFarmOutputs`.
         """
         self._windfarms = {}
         self._compressed_dir = cmp_dir
@@ -77,6 +243,8 @@ class Fleet:
         self._flagged_turbines = None
         self._daily_severity_scores = None
         self._oem_powercurves_path = oem_powercurves_path
+        self._window_days = window_days
+        self._max_workers = max_workers
         self.create_windfarms(single_plant=single_plant)
 
     @property
@@ -131,11 +299,11 @@ class Fleet:
         # define a function to extract the project name from each column name
         # depending on file type
         if fileType == InputFileType.AVERAGE:
-            get_project_names = lambda dataframe: list(
+            get_project_names = lambda columns: list(
                 set(
                     [
                         name[:3]
-                        for name in dataframe.columns
+                        for name in columns
                         if not any(
                             [name.lstrip()[:3] == y for y in ["Unn", "Dat", "Off"]]
                         )
@@ -143,11 +311,11 @@ class Fleet:
                 )
             )
         elif fileType == InputFileType.COMPRESSED:
-            get_project_names = lambda dataframe: list(
+            get_project_names = lambda columns: list(
                 set(
                     [
                         name[:3]
-                        for i, name in enumerate(dataframe.columns)
+                        for i, name in enumerate(columns)
                         if (i % 2 == 1)
                         and not any(
                             [name.lstrip()[:3] == y for y in ["Unn", "Dat", "Off"]]
@@ -158,8 +326,9 @@ class Fleet:
 
         file_dict = {}
         for file in os.listdir(dir):
-            this_frame = pd.read_csv(os.path.join(dir, file), nrows=1)
-            projects_found = get_project_names(this_frame)
+            # only the header (or Parquet schema) is read
+            this_columns = read_column_names(os.path.join(dir, file))
+            projects_found = get_project_names(this_columns)
 
             if len(projects_found) == 1:
                 file_dict[projects_found[0]] = os.path.join(dir, file)
@@ -180,7 +349,11 @@ class Fleet:
         and instantiatiate a windfarm object for
         each subset other wise use all the turbines
         to create the windfarm object.
+
+        With `max_workers`, the wind farms are built in worker processes,
+        which only send their daily outputs back.
         """
+        jobs = []
         for project in self._average_files.keys():
             if single_plant is not None:
                 if single_plant != project:
@@ -194,48 +367,37 @@ class Fleet:
                 )
                 continue
 
-            if project in PROJECT_SUBSETS:
-                project_avg_data = pd.read_csv(
-                    self._average_files[project], index_col=[0], parse_dates=[0]
-                )
-                project_cmp_data = pd.read_csv(
-                    self._compressed_files[project], low_memory=False
+            if self._max_workers is not None:
+                jobs.extend(self._get_windfarm_jobs(project))
+            elif self._window_days is not None:
+                self._create_chunked_windfarms(project)
+            elif project in PROJECT_SUBSETS:
+                avg_path = self._average_files[project]
+                yaw_path = self._yaw_files[project]
+                # a CSV file is read once for all the subsets, while only the
+                # columns of each subset are read from a Parquet file
+                project_avg_data = (
+                    None if is_parquet_path(avg_path) else read_time_series(avg_path)
                 )
-                project_yaw_data = pd.read_csv(
-                    self._yaw_files[project], index_col=[0], parse_dates=[0]
+                project_cmp_data = read_compressed(self._compressed_files[project])
+                project_yaw_data = (
+                    None if is_parquet_path(yaw_path) else read_time_series(yaw_path)
                 )
 
                 for technology, turbines in PROJECT_SUBSETS[project].items():
                     # extract this subset from avg data
-                    project_avg_subset_columns = [
-                        x
-                        for x in project_avg_data.columns
-                        if any(y in x for y in turbines)
-                    ]
-                    project_avg_subset_data = project_avg_data[
-                        project_avg_subset_columns
-                    ]
+                    project_avg_subset_data = get_turbines_subset(
+                        avg_path, project_avg_data, turbines
+                    )
 
                     # extract this subset from yaw data
-                    project_yaw_subset_columns = [
-                        x
-                        for x in project_yaw_data.columns
-                        if any(y in x for y in turbines)
-                    ]
-                    project_yaw_subset_data = project_yaw_data[
-                        project_yaw_subset_columns
-                    ]
-
-                    cmp_col_to_keep = []
-                    # Iterate through the data columns
-                    for i in range(1, len(project_cmp_data.columns), 2):
-                        col_name = project_cmp_data.columns[i]
-                        if any(x in col_name for x in turbines):
-                            datetime_col = project_cmp_data.columns[i - 1]
-                            cmp_col_to_keep.append(datetime_col)
-                            cmp_col_to_keep.append(col_name)
+                    project_yaw_subset_data = get_turbines_subset(
+                        yaw_path, project_yaw_data, turbines
+                    )
 
-                    project_cmp_subset_data = project_cmp_data.loc[:, cmp_col_to_keep]
+                    project_cmp_subset_data = get_compressed_subset(
+                        project_cmp_data, turbines
+                    )
                     project_subset_name = f"{project}_{technology}"
 
                     print(f"Fleet 122: Processing {project_subset_name}...")
@@ -255,12 +417,85 @@ class Fleet:
                     avg_path=self._average_files[project],
                     compressed_path=self._compressed_files[project],
                     yaw_path=self._yaw_files.get(project),
-                    data_source_type=DataSourceType.CSV,  # This could be SQL (if linked to SPC data)
+                    data_source_type=(
+                        DataSourceType.PARQUET
+                        if is_parquet_path(self._average_files[project])
+                        else DataSourceType.CSV  # This could be SQL (if linked to SPC data)
+                    ),
                     data_freq="10T",
                     project=project,
                     oem_powercurve_path=self._oem_powercurves_path,
                 )
 
+        if jobs:
+            self._create_windfarm_outputs(jobs)
+
+    def _get_windfarm_jobs(self, project):
+        """Describe the wind farm (or one per technology) of a project.
+
+        Returns:
+            (list): One dict per farm, with its name and the arguments of
+                `create_windfarm_outputs`.
+        """
+        job = {
+            "project": project,
+            "avg_path": self._average_files[project],
+            "compressed_path": self._compressed_files[project],
+            "yaw_path": self._yaw_files.get(project),
+            "oem_powercurve_path": self._oem_powercurves_path,
+            "window_days": self._window_days,
+            # the same lookback as a farm built in this process
+            "overlap_days": get_required_overlap_days(),
+        }
+        if project in PROJECT_SUBSETS:
+            return [
+                dict(
+                    job,
+                    name=f"{project}_{technology}",
+                    technology=technology,
+                    turbines=turbines,
+                )
+                for technology, turbines in PROJECT_SUBSETS[project].items()
+            ]
+        return [dict(job, name=project, technology=None, turbines=None)]
+
+    def _create_windfarm_outputs(self, jobs):
+        """Run the wind farm jobs in a pool of `max_workers` processes."""
+        print(f"Fleet: Processing {len(jobs)} wind farms with {self._max_workers} workers...")
+        with ProcessPoolExecutor(max_workers=self._max_workers) as executor:
+            results = executor.map(create_windfarm_outputs, jobs)
+            for job, windfarm_outputs in zip(jobs, results):
+                self._windfarms[job["name"]] = windfarm_outputs
+
+    def _create_chunked_windfarms(self, project):
+        """Create the ChunkedWindFarm (or one per technology) of a project."""
+        if project in PROJECT_SUBSETS:
+            # read once, shared by the technologies of the project
+            project_cmp_data = read_compressed(self._compressed_files[project])
+            subsets = [
+                (f"{project}_{technology}", technology, turbines)
+                for technology, turbines in PROJECT_SUBSETS[project].items()
+            ]
+        else:
+            project_cmp_data = None
+            subsets = [(project, None, None)]
+
+        for farm_name, technology, turbines in subsets:
+            print(f"Fleet: Processing {farm_name} by {self._window_days} days...")
+            self._windfarms[farm_name] = ChunkedWindFarm(
+                avg_path=self._average_files[project],
+                compressed_path=self._compressed_files[project],
+                compressed_data=project_cmp_data,
+                yaw_path=self._yaw_files.get(project),
+                turbines=turbines,
+                window_days=self._window_days,
+                overlap_days=get_required_overlap_days(),
+                data_freq="10T",
+                project=project,
+                technology=technology,
+                oem_powercurve_path=self._oem_powercurves_path,
+            )
+
     def get_daily_efficiency(self):
         """
         Combines daily efficincies from each project and outputs a single dataset.
@@ -271,7 +506,10 @@ class Fleet:
 
         daily_efficiencies = []
         for wf_name, windfarm in self.windfarms.items():
-            this_daily_efficiency = windfarm.Lost_Energy.daily_efficiency
+            if isinstance(windfarm, WindFarmOutputs):
+                this_daily_efficiency = windfarm.daily_efficiency
+            else:
+                this_daily_efficiency = windfarm.Lost_Energy.daily_efficiency
             if this_daily_efficiency is not None:
                 daily_efficiencies.append(this_daily_efficiency)
 
@@ -289,6 +527,9 @@ class Fleet:
 
         daily_means = []
         for wf_name, windfarm in self.windfarms.items():
+            if isinstance(windfarm, WindFarmOutputs):
+                daily_means.append(windfarm.daily_mean)
+                continue
             for component_name, component_obj in windfarm.components.items():
                 if isinstance(component_obj, FarmComponent) and not any(
                     x.lower() in component_name.lower() for x in ["yaw", "dir"]
@@ -311,7 +552,10 @@ class Fleet:
 
         project_daily_lost_energy = []
         for wf_name, windfarm in self.windfarms.items():
-            this_daily_lost_energy = windfarm.Lost_Energy.daily_lost_energy
+            if isinstance(windfarm, WindFarmOutputs):
+                this_daily_lost_energy = windfarm.daily_lost_energy
+            else:
+                this_daily_lost_energy = windfarm.Lost_Energy.daily_lost_energy
             if this_daily_lost_energy is not None:
                 project_daily_lost_energy.append(this_daily_lost_energy)
 
@@ -331,7 +575,10 @@ class Fleet:
 
         project_daily_lost_revenue = []
         for wf_name, windfarm in self.windfarms.items():
-            this_daily_lost_revenue = windfarm.Lost_Energy.daily_lost_revenue
+            if isinstance(windfarm, WindFarmOutputs):
+                this_daily_lost_revenue = windfarm.daily_lost_revenue
+            else:
+                this_daily_lost_revenue = windfarm.Lost_Energy.daily_lost_revenue
             if this_daily_lost_revenue is not None:
                 project_daily_lost_revenue.append(this_daily_lost_revenue)
 
@@ -345,8 +592,43 @@ class Fleet:
 
         return fleet_daily_lost_revenue
 
+    def get_daily_outputs(self):
+        """Combine every daily output of the fleet in one frame.
+
+        This is the "fleet_daily_severity_scores_stage.csv" frame the
+        treemap datasets are made from: the daily severity scores (their
+        columns renamed -SEVERITY), efficiencies, lost energy, lost revenue
+        and means.
+
+        Returns:
+            (pandas.DataFrame): columns are <project>-<turbine>-<output type>,
+                index is day.
+        """
+        daily_severity_scores = self.daily_severity_scores.copy()
+        daily_severity_scores.columns = [
+            x.replace("-LOST-ENERGY", "-SEVERITY") for x in daily_severity_scores.columns
+        ]
+        return pd.concat(
+            [
+                daily_severity_scores,
+                self.get_daily_efficiency(),
+                self.get_daily_lost_energy(),
+                self.get_daily_lost_revenue(),
+                self.get_daily_mean(),
+            ],
+            axis=1,
+        )
+
     def get_flagged_turbines(
-        self, start=None, end=None, period="6H", density_thresh=0.9, n_std=1, top_n=100
+        self,
+        start=None,
+        end=None,
+        period="6H",
+        density_thresh=0.9,
+        n_std=1,
+        top_n=100,
+        component_workers=None,
+        component_executor="thread",
     ):
         """Returns a dataframe of flagged turbines for the specified component type, time range, and wind farms.
 
@@ -355,6 +637,9 @@ class Fleet:
             start (str or datetime): The start time of the data range. Defaults to None.
             end (str or datetime): The end time of the data range. Defaults to None.
             windfarms (list): The list of wind farm names to include. Defaults to None.
+            component_workers (int): If specified, the components of each wind farm are scored by
+                this many workers (see `WindFarm.get_flagged_turbines`). Defaults to None.
+            component_executor (str): Either "thread" or "process". Defaults to "thread".
 
         Returns:
             pandas.DataFrame: A dataframe of flagged turbines.
@@ -373,6 +658,8 @@ class Fleet:
                 density_thresh=density_thresh,
                 n_std=n_std,
                 top_n=top_n,
+                max_workers=component_workers,
+                executor=component_executor,
             )
 
             farm_flagged_turbines = farm_flagged_turbines.reset_index()
@@ -425,3 +712,126 @@ class Fleet:
         fleet_powercurve_distributions = pd.concat(powercurve_distributions)
 
         return fleet_powercurve_distributions
+
+
+class IncrementalFleet(Fleet):
+    """A Fleet that only computes the days added since its last run.
+
+    The daily outputs of each wind farm are kept in a `DailyResultStore`.
+    Each run processes a farm from the last stored day (which may have been
+    partial), reading the days before it only as the lookback of the
+    rolling windows (see `get_required_overlap_days`), and merges the new
+    days into the store. The run time then grows with the new data, not
+    with the history.
+
+    Example:
+        >>> fleet = IncrementalFleet("path/to/store", avg_dir="path/to/average", cmp_dir="path/to/compressed")
+        >>> fleet.append_outputs("path/to/outputs")
+    """
+
+    def __init__(
+        self,
+        store_dir,
+        avg_dir=None,
+        cmp_dir=None,
+        yaw_dir=None,
+        oem_powercurves_path=None,
+        single_plant=None,
+        window_days=None,
+        max_workers=None,
+    ):
+        """
+        Initializes an IncrementalFleet object.
+
+        Args:
+            store_dir (str): The directory of the `DailyResultStore`.
+            window_days (int, optional): See `Fleet`. Defaults to
+                DEFAULT_WINDOW_DAYS, since the farms are always processed by
+                window here.
+
+        See `Fleet` for the other arguments.
+        """
+        self._store = DailyResultStore(store_dir)
+        self._first_days = {}
+        if window_days is None:
+            window_days = DEFAULT_WINDOW_DAYS
+        super().__init__(
+            avg_dir=avg_dir,
+            cmp_dir=cmp_dir,
+            yaw_dir=yaw_dir,
+            oem_powercurves_path=oem_powercurves_path,
+            single_plant=single_plant,
+            window_days=window_days,
+            max_workers=max_workers,
+        )
+
+    def create_windfarms(self, single_plant=None):
+        """Process the new days of each wind farm and merge them into the store.
+
+        The values of `windfarms` are the `WindFarmOutputs` of the whole
+        stored history.
+        """
+        jobs = []
+        for project in self._average_files.keys():
+            if single_plant is not None and single_plant != project:
+                continue
+            if project not in self._compressed_files:
+                print(
+                    f"IncrementalFleet.create_windfarms : skipping {project}. Average file but No compressed file found"
+                )
+                continue
+            jobs.extend(self._get_windfarm_jobs(project))
+
+        for job in jobs:
+            job["start"] = self._store.get_last_day(job["name"])
+            print(f"IncrementalFleet: Processing {job['name']} from {job['start']}...")
+
+        if self._max_workers is None:
+            results = map(create_windfarm_outputs, jobs)
+            self._merge_windfarm_outputs(jobs, results)
+        else:
+            with ProcessPoolExecutor(max_workers=self._max_workers) as executor:
+                results = executor.map(create_windfarm_outputs, jobs)
+                self._merge_windfarm_outputs(jobs, results)
+
+    def _merge_windfarm_outputs(self, jobs, results):
+        for job, windfarm_outputs in zip(jobs, results):
+            self._windfarms[job["name"]] = self._store.update(
+                job["name"], windfarm_outputs, job["start"]
+            )
+            self._first_days[job["name"]] = job["start"]
+
+    @property
+    def first_day(self):
+        """pandas.Timestamp: The first day computed by this run, or None if
+        a farm was computed from the start of its history."""
+        first_days = list(self._first_days.values())
+        if not first_days or any(day is None for day in first_days):
+            return None
+        return min(first_days)
+
+    def append_outputs(self, output_dir):
+        """Update the output files of the fleet with the days of this run.
+
+        The "fleet_daily_severity_scores_stage.csv", "power_curve.csv" and
+        "power_curve_counts.csv" files are rewritten from `first_day` on,
+        and their earlier days are kept.
+
+        Args:
+            output_dir (str): The directory of the output files.
+        """
+        first_day = self.first_day
+        outputs = {
+            "fleet_daily_severity_scores_stage.csv": self.get_daily_outputs(),
+            "power_curve.csv": self.get_powercurves(),
+            "power_curve_counts.csv": self.get_powercurve_distributions(),
+        }
+        for file_name, daily_output in outputs.items():
+            if len(daily_output) == 0:
+                continue
+            if first_day is not None:
+                owned = select_owned_days(
+                    daily_output, first_day, pd.Timestamp.max, keep_undated=True
+                )
+                daily_output = daily_output.iloc[:0] if owned is None else owned
+            append_daily_output(os.path.join(output_dir, file_name), daily_output, first_day)
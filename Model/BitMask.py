@@ -0,0 +1,210 @@
+"""A compact boolean mask for time series frames.
+
+The online maps of a wind farm hold one boolean per turbine and per 10
+minutes (or 10 seconds), which as a pandas DataFrame takes a byte per
+value, and every FarmComponent used to get its own copy. `BitMask` keeps
+the values packed with `np.packbits`, eight rows per byte, and never
+changes them in place, so a single mask can be shared by reference.
+
+Each column is packed separately along the rows, so selecting columns
+works on the packed bytes directly, while the operations on rows
+(resampling) unpack the values first.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+
+class BitMask:
+    """An immutable, bit-packed boolean frame."""
+
+    def __init__(self, values, index, columns):
+        """Initializes a new instance of the class.
+
+        Args:
+            values (numpy.ndarray): The 2D boolean values, rows x columns.
+            index (pandas.Index): The labels of the rows.
+            columns (list): The labels of the columns.
+        """
+        values = np.asarray(values, dtype=bool)
+        if values.ndim != 2 or values.shape != (len(index), len(columns)):
+            raise ValueError(
+                f"The values have shape {values.shape}, "
+                f"expected ({len(index)}, {len(columns)})."
+            )
+        self._bits = np.packbits(values, axis=0)
+        self.index = pd.Index(index)
+        self.columns = pd.Index(columns)
+        self._resampled = {}
+
+    @classmethod
+    def _from_bits(cls, bits, index, columns):
+        """Wrap already packed values, without copying them."""
+        mask = cls.__new__(cls)
+        mask._bits = bits
+        mask.index = pd.Index(index)
+        mask.columns = pd.Index(columns)
+        mask._resampled = {}
+        return mask
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Pack a boolean DataFrame. Missing values count as False.
+
+        Args:
+            frame (pandas.DataFrame): The mask to pack.
+
+        Returns:
+            (BitMask): The packed mask.
+        """
+        values = frame.fillna(False).to_numpy(dtype=bool)
+        return cls(values, frame.index, frame.columns)
+
+    @property
+    def shape(self):
+        """(tuple): The number of rows and columns."""
+        return (len(self.index), len(self.columns))
+
+    @property
+    def nbytes(self):
+        """(int): The size of the packed values."""
+        return self._bits.nbytes
+
+    def to_numpy(self):
+        """Return the values as a 2D boolean array."""
+        return np.unpackbits(self._bits, axis=0, count=len(self.index)).view(bool)
+
+    def to_frame(self):
+        """Return the values as a boolean DataFrame."""
+        return pd.DataFrame(self.to_numpy(), index=self.index, columns=self.columns)
+
+    def _check_aligned(self, other):
+        if not (self.index.equals(other.index) and self.columns.equals(other.columns)):
+            raise ValueError("Both masks must have the same index and columns.")
+
+    def __and__(self, other):
+        self._check_aligned(other)
+        return BitMask._from_bits(self._bits & other._bits, self.index, self.columns)
+
+    def __or__(self, other):
+        self._check_aligned(other)
+        return BitMask._from_bits(self._bits | other._bits, self.index, self.columns)
+
+    def __invert__(self):
+        return BitMask(~self.to_numpy(), self.index, self.columns)
+
+    def sum(self):
+        """Return the number of True values of each column, as a Series."""
+        return pd.Series(self.to_numpy().sum(axis=0), index=self.columns, dtype="int64")
+
+    def mean(self):
+        """Return the proportion of True values of each column, as a Series."""
+        return self.sum() / len(self.index)
+
+    def take_columns(self, positions, columns=None):
+        """Select (and repeat) columns by position, without unpacking.
+
+        Args:
+            positions (array-like): The position of the column to use for
+                each column of the result. -1 gives an all False column.
+            columns (list, optional): The labels of the result. Defaults to
+                the labels of the selected columns.
+
+        Returns:
+            (BitMask): The selected columns.
+        """
+        positions = np.asarray(positions, dtype=np.intp)
+        missing = positions < 0
+        if len(self.columns) == 0:
+            bits = np.zeros((self._bits.shape[0], len(positions)), dtype=np.uint8)
+        else:
+            bits = self._bits[:, np.where(missing, 0, positions)]
+            bits[:, missing] = 0
+        if columns is None:
+            columns = [self.columns[p] if p >= 0 else None for p in positions]
+        return BitMask._from_bits(bits, self.index, columns)
+
+    def broadcast_columns(self, keys, columns=None):
+        """Expand the columns by key, eg. from one per turbine to one per tag.
+
+        Args:
+            keys (list): For each column of the result, the label of the
+                column of this mask to use. Unknown labels give an all
+                False column.
+            columns (list, optional): The labels of the result. Defaults to
+                `keys`.
+
+        Returns:
+            (BitMask): The expanded mask.
+        """
+        positions = self.columns.get_indexer(keys)
+        if columns is None:
+            columns = keys
+        return self.take_columns(positions, columns=columns)
+
+    def expand(self, index, column_positions):
+        """Lay the mask out like a data frame, in one indexing operation.
+
+        Args:
+            index (pandas.Index): The rows of the result. Rows that are not
+                in the mask are False.
+            column_positions (numpy.ndarray): For each column of the
+                result, the position of the column of the mask to use, or
+                -1 for an all False column.
+
+        Returns:
+            (numpy.ndarray): The 2D boolean values.
+        """
+        rows = self.index.get_indexer(index)
+        column_positions = np.asarray(column_positions, dtype=np.intp)
+        if len(self.index) == 0 or len(self.columns) == 0:
+            return np.zeros((len(rows), len(column_positions)), dtype=bool)
+        values = self.to_numpy()[
+            np.ix_(np.maximum(rows, 0), np.maximum(column_positions, 0))
+        ]
+        values &= (rows >= 0)[:, None]
+        values &= (column_positions >= 0)[None, :]
+        return values
+
+    def resample(self, freq):
+        """Resample to another frequency, like `frame.resample(freq).ffill()`.
+
+        Rows before the first row of the mask are False. The mask is
+        returned as is if it already has that frequency, and the resampled
+        masks are kept, so each frequency is only computed once per mask.
+
+        Args:
+            freq (str): The new frequency, as a pandas offset string.
+
+        Returns:
+            (BitMask): The resampled mask.
+        """
+        offset = to_offset(freq)
+        if offset not in self._resampled:
+            # (compared as offsets, since infer_freq says "10min" for "10T")
+            inferred_freq = pd.infer_freq(self.index) if len(self.index) > 2 else None
+            if inferred_freq is not None and to_offset(inferred_freq) == offset:
+                self._resampled[offset] = self
+            else:
+                self._resampled[offset] = self._resample(freq)
+        return self._resampled[offset]
+
+    def _resample(self, freq):
+        # resample the row positions, which has the exact pandas semantics
+        positions = (
+            pd.Series(np.arange(len(self.index), dtype=float), index=self.index)
+            .resample(freq)
+            .ffill()
+        )
+        known = positions.notna().to_numpy()
+        rows = positions.fillna(0).to_numpy(dtype=np.intp)
+        values = self.to_numpy()[rows]
+        values[~known] = False
+        return BitMask(values, positions.index, self.columns)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __repr__(self):
+        return f"BitMask(shape={self.shape}, nbytes={self.nbytes})"
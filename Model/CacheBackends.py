@@ -0,0 +1,458 @@
+"""Storage backends for the repository result cache.
+
+`QueryCache` decides *whether* a cached result can be used (TTL, table
+versions). The backends only store the entries:
+
+- `MemoryCacheBackend` keeps them in the memory of the current process.
+- `DiskCacheBackend` keeps them in a directory, so that all the gunicorn
+  workers of a host share the results that any one of them fetched.
+  DataFrames are written as Parquet files, anything else is stored as
+  JSON. Nothing is unpickled, so a file dropped in the directory can not
+  run code in the workers.
+"""
+
+import contextlib
+import datetime
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # the Windows executable (see iSightSolar.spec)
+    fcntl = None
+
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_DISK_CACHE_MAX_BYTES = 1024 ** 3
+
+CacheEntry = namedtuple("CacheEntry", ["expires_at", "versions", "value"])
+
+# the data files an entry may have, including the pickles of older versions
+DATA_FILE_FORMATS = ("parquet", "pickle")
+
+
+@contextlib.contextmanager
+def file_lock(path, exclusive=True):
+    """Hold an advisory lock on a file, across processes.
+
+    On platforms without `fcntl` this is a no-op: the writes of the disk
+    backend are atomic renames, so the lock only serializes the eviction.
+
+    Args:
+        path (str): The lock file. It is created if it does not exist.
+        exclusive (bool): Whether to take an exclusive or a shared lock.
+    """
+    with open(path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def encode_value(value):
+    """Turn a query result into something `json.dump` can write.
+
+    Tuples, dicts, dates and timestamps are tagged, so that
+    `decode_value` gives back the same types.
+
+    Args:
+        value (object): A result made of None, booleans, numbers, strings,
+            dates, timestamps, lists, tuples and dicts.
+
+    Returns:
+        (object): The JSON compatible value.
+
+    Raises:
+        TypeError: If the value holds anything else.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return encode_value(value.item())
+    if isinstance(value, list):
+        return [encode_value(item) for item in value]
+    if isinstance(value, tuple):
+        return {"__tuple__": [encode_value(item) for item in value]}
+    if isinstance(value, dict):
+        return {"__dict__": [[encode_value(k), encode_value(v)] for k, v in value.items()]}
+    if isinstance(value, pd.Timestamp):
+        return {"__timestamp__": value.isoformat()}
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"__date__": value.isoformat()}
+    raise TypeError(f"Can not store a {type(value).__name__} as JSON")
+
+
+def decode_value(value):
+    """Undo `encode_value`."""
+    if isinstance(value, list):
+        return [decode_value(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "__tuple__" in value:
+        return tuple(decode_value(item) for item in value["__tuple__"])
+    if "__dict__" in value:
+        return {decode_value(k): decode_value(v) for k, v in value["__dict__"]}
+    if "__timestamp__" in value:
+        return pd.Timestamp(value["__timestamp__"])
+    if "__datetime__" in value:
+        return datetime.datetime.fromisoformat(value["__datetime__"])
+    if "__date__" in value:
+        return datetime.date.fromisoformat(value["__date__"])
+    raise ValueError(f"Unknown JSON value: {value}")
+
+
+def check_private_directory(directory):
+    """Make sure that only the current user can write to a directory.
+
+    Args:
+        directory (str): The directory.
+
+    Raises:
+        PermissionError: If the directory belongs to another user, or if
+            its group or other users can write to it.
+    """
+    if not hasattr(os, "geteuid"):  # the Windows executable
+        return
+    status = os.stat(directory)
+    if status.st_uid != os.geteuid():
+        raise PermissionError(f"{directory} belongs to another user")
+    if status.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"{directory} can be written to by other users")
+
+
+class MemoryCacheBackend:
+    """Keep the cache entries in an LRU dictionary of the current process."""
+
+    def __init__(self, max_entries=None):
+        """Initializes a new instance of the class.
+
+        Args:
+            max_entries (int, optional): The number of entries kept before
+                the least recently used ones are evicted.
+        """
+        if max_entries is None:
+            max_entries = DEFAULT_MAX_ENTRIES
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the `CacheEntry` of a key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        """Store an entry.
+
+        Returns:
+            (int): The number of entries evicted to make room.
+        """
+        evicted = 0
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def key_lock(self, key):
+        """Serialize the computation of a key across processes.
+
+        Entries are not shared with other processes, so there is nothing
+        to serialize: concurrent calls of this process are already
+        coalesced by `SingleFlight`.
+        """
+        return contextlib.nullcontext()
+
+    def delete(self, key):
+        """Drop an entry, if it exists."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskCacheBackend:
+    """Keep the cache entries in a directory shared by several processes.
+
+    Each entry is made of a small JSON metadata file, holding its expiry
+    time and table versions, and of a Parquet file if its value is a
+    DataFrame. Other values are stored in the metadata file itself. Files
+    are written to a temporary name first and then renamed, so a reader
+    never sees half an entry. Once the entries exceed `max_bytes`, the
+    least recently read ones are deleted.
+
+    The directory must only be writable by the current user, since
+    anyone who can write to it can change the cached results.
+    """
+
+    def __init__(self, directory, max_bytes=None):
+        """Initializes a new instance of the class.
+
+        Args:
+            directory (str): Where the entries are stored. It is created,
+                private to the current user, if it does not exist.
+            max_bytes (int, optional): The size cap of the entries.
+
+        Raises:
+            PermissionError: If the directory belongs to another user, or
+                if other users can write to it.
+        """
+        if max_bytes is None:
+            max_bytes = DEFAULT_DISK_CACHE_MAX_BYTES
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        check_private_directory(directory)
+        self._locks_directory = os.path.join(directory, "locks")
+        os.makedirs(self._locks_directory, mode=0o700, exist_ok=True)
+        check_private_directory(self._locks_directory)
+        self._lock_path = os.path.join(directory, ".lock")
+
+    @staticmethod
+    def _file_stem(key):
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def _meta_path(self, key):
+        return os.path.join(self.directory, f"{self._file_stem(key)}.json")
+
+    def _data_path(self, key, file_format):
+        return os.path.join(self.directory, f"{self._file_stem(key)}.{file_format}")
+
+    def _key_lock_path(self, stem):
+        return os.path.join(self._locks_directory, f"{stem}.lock")
+
+    def _write_atomic(self, path, write):
+        """Write a file through a temporary file and a rename."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _read_frame(path, meta):
+        value = pd.read_parquet(path)
+        columns = meta.get("columns")
+        if columns is not None:
+            labels = decode_value(columns["labels"])
+            names = decode_value(columns["names"])
+            if columns["multi"]:
+                value.columns = pd.MultiIndex.from_tuples(labels, names=names)
+            else:
+                value.columns = pd.Index(labels, name=names[0])
+        return value
+
+    def _write_frame(self, key, value):
+        """Write a DataFrame as Parquet.
+
+        Returns:
+            (dict): The column labels, if they had to be replaced by their
+                positions (eg. non-string, repeated or MultiIndex labels),
+                else None.
+        """
+        path = self._data_path(key, "parquet")
+        try:
+            self._write_atomic(path, lambda tmp_path: value.to_parquet(tmp_path))
+            return None
+        except (ValueError, TypeError):
+            pass
+        columns = {
+            "labels": encode_value(list(value.columns)),
+            "names": encode_value(list(value.columns.names)),
+            "multi": isinstance(value.columns, pd.MultiIndex),
+        }
+        positional = value.set_axis([str(i) for i in range(value.shape[1])], axis=1)
+        self._write_atomic(path, lambda tmp_path: positional.to_parquet(tmp_path))
+        return columns
+
+    def get(self, key):
+        """Return the `CacheEntry` of a key, or None."""
+        meta_path = self._meta_path(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta["key"] != key:
+                return None
+            if meta["format"] == "parquet":
+                value = self._read_frame(self._data_path(key, "parquet"), meta)
+            elif meta["format"] == "json":
+                value = decode_value(meta["value"])
+            else:
+                # eg. a pickle written by an older version
+                return None
+            # the access time of the metadata drives the LRU eviction
+            os.utime(meta_path)
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, ValueError):
+            # the entry does not exist, or was evicted while being read
+            return None
+        return CacheEntry(meta["expires_at"], meta["versions"], value)
+
+    def set(self, key, entry):
+        """Store an entry.
+
+        Values that can not be stored as Parquet or JSON are not stored.
+
+        Returns:
+            (int): The number of entries evicted to make room.
+        """
+        meta = {
+            "key": key,
+            "expires_at": entry.expires_at,
+            "versions": entry.versions,
+        }
+        try:
+            if isinstance(entry.value, pd.DataFrame):
+                meta["format"] = "parquet"
+                meta["columns"] = self._write_frame(key, entry.value)
+            else:
+                meta["format"] = "json"
+                meta["value"] = encode_value(entry.value)
+        except (ValueError, TypeError, ImportError) as e:
+            print(f"Not able to store the cached result of {key} on disk: {e}")
+            return 0
+
+        def write_meta(path):
+            with open(path, "w") as f:
+                json.dump(meta, f)
+
+        with file_lock(self._lock_path):
+            self._write_atomic(self._meta_path(key), write_meta)
+            # the data file of the previous format of the entry, if it changed
+            for file_format in DATA_FILE_FORMATS:
+                if file_format != meta["format"]:
+                    self._remove(self._data_path(key, file_format))
+            return self._evict()
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _remove_key_lock(self, stem):
+        """Delete the lock file of a key, unless a worker is holding it.
+
+        A worker that opened the file just before it is deleted may still
+        compute the key at the same time as another one, which only costs
+        a duplicate query.
+        """
+        path = self._key_lock_path(stem)
+        if fcntl is None:
+            self._remove(path)
+            return
+        try:
+            lock_file = open(path, "a")
+        except FileNotFoundError:
+            return
+        with lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return  # held by a worker computing the key
+            try:
+                self._remove(path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _evict(self):
+        """Delete the least recently read entries until under the size cap.
+
+        Also deletes the lock files that do not belong to an entry, eg.
+        those of computations that failed. Must be called with the
+        directory lock held.
+        """
+        entries = []
+        total_bytes = 0
+        stems = set()
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            stem = name[: -len(".json")]
+            meta_path = os.path.join(self.directory, name)
+            data_paths = [
+                os.path.join(self.directory, f"{stem}.{file_format}")
+                for file_format in DATA_FILE_FORMATS
+            ]
+            try:
+                last_used = os.path.getmtime(meta_path)
+                size = os.path.getsize(meta_path)
+            except FileNotFoundError:
+                continue
+            size += sum(os.path.getsize(p) for p in data_paths if os.path.exists(p))
+            total_bytes += size
+            stems.add(stem)
+            entries.append((last_used, size, stem, meta_path, data_paths))
+
+        evicted = 0
+        entries.sort()
+        for _, size, stem, meta_path, data_paths in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            for path in [meta_path] + data_paths:
+                self._remove(path)
+            stems.discard(stem)
+            total_bytes -= size
+            evicted += 1
+
+        for name in os.listdir(self._locks_directory):
+            stem = name[: -len(".lock")]
+            if name.endswith(".lock") and stem not in stems:
+                self._remove_key_lock(stem)
+        return evicted
+
+    def key_lock(self, key):
+        """Serialize the computation of a key across processes.
+
+        While a worker holds the lock of a key, the other workers asking
+        for the same key wait, and then find the result it stored.
+        """
+        return file_lock(self._key_lock_path(self._file_stem(key)))
+
+    def delete(self, key):
+        """Drop an entry, if it exists."""
+        with file_lock(self._lock_path):
+            self._remove(self._meta_path(key))
+            for file_format in DATA_FILE_FORMATS:
+                self._remove(self._data_path(key, file_format))
+            self._remove_key_lock(self._file_stem(key))
+
+    def clear(self):
+        """Drop every entry."""
+        with file_lock(self._lock_path):
+            for name in os.listdir(self.directory):
+                if name.endswith((".json",) + tuple(f".{f}" for f in DATA_FILE_FORMATS)):
+                    os.remove(os.path.join(self.directory, name))
+            for name in os.listdir(self._locks_directory):
+                os.remove(os.path.join(self._locks_directory, name))
+
+    def __len__(self):
+        return len([n for n in os.listdir(self.directory) if n.endswith(".json")])
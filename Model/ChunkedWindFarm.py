@@ -0,0 +1,458 @@
+"""Process the history of a wind farm in date windows.
+
+A `WindFarm` holds all of its AVG (and 10 second yaw) data in memory, so
+its peak memory grows with the length of the history. `ChunkedWindFarm`
+reads the input files one date window at a time, builds a `WindFarm` for
+each window and only keeps its daily outputs, which are then stitched
+together.
+
+Every window is read with `overlap_days` of data on both sides, so the
+gradient filter, the 6 hour severity windows and the daily recovery
+filter see the same data around the edges of a window as they would in a
+single farm. Of each window, only the days it owns are kept.
+
+Only the AVG and yaw files are streamed, and when a `start` day is given
+their rows before it are skipped without being parsed. The compressed
+(event) data is loaded in full, with its timestamps parsed, and sliced for
+each window: the state of a turbine at the start of a window is its last
+event before it, which can be anywhere earlier in the file.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+from Model.Constants.GradientFilter import GRADIENT_FILTER_PARAMETERS
+from Model.WindFarm import WindFarm
+from Model.WindFarmOutputs import WindFarmOutputs, get_windfarm_outputs
+from Utils.Enums import DataSourceType
+from Utils.ParquetFiles import (
+    is_parquet_path,
+    iter_time_series_chunks,
+    parse_compressed_datetimes,
+    read_column_names,
+    read_compressed,
+)
+from Utils.RevenueGrid import load_revenue_grid
+
+
+DEFAULT_WINDOW_DAYS = 30
+DEFAULT_OVERLAP_DAYS = 1
+
+# the rolling windows of the analysis, in data intervals
+EFFICIENCY_WINDOW_INTERVALS = 144
+SEVERITY_WINDOW_INTERVALS = 36
+DEFAULT_CHUNK_ROWS = 10000
+
+# the turbine name of the park counts of the power curve distributions
+PARK_DISTRIBUTION_SUFFIX = "_Park_Distribution"
+
+
+def get_required_overlap_days(data_freq="10T"):
+    """Return the number of days a window must be read with on each side.
+
+    It covers the longest rolling window of the analysis: the 24 hour
+    efficiency, the 6 hour severity windows, and the runs of the gradient
+    filter (with their margin) for every project. It is rounded up to
+    whole days, since the daily recovery filter works on whole days.
+
+    Args:
+        data_freq (str): The frequency of the AVG data.
+
+    Returns:
+        (int): The number of days.
+    """
+    interval = pd.to_timedelta(to_offset(data_freq))
+    lookbacks = [
+        EFFICIENCY_WINDOW_INTERVALS * interval,
+        SEVERITY_WINDOW_INTERVALS * interval,
+    ]
+    for technologies in GRADIENT_FILTER_PARAMETERS.values():
+        for components in technologies.values():
+            for params in components.values():
+                gradient_interval = pd.to_timedelta(
+                    to_offset(params.get("time_interval", data_freq))
+                )
+                run_intervals = (
+                    params["repeat_threshold"] + params["diff_depth"] + params["margin"]
+                )
+                lookbacks.append(run_intervals * gradient_interval)
+    return max(DEFAULT_OVERLAP_DAYS, math.ceil(max(lookbacks) / pd.Timedelta(days=1)))
+
+
+def keep_turbine_columns(columns, turbines=None):
+    """Return the columns of the given turbines, the same way Fleet subsets a project.
+
+    Args:
+        columns (list): The column names.
+        turbines (list, optional): Turbine names. Defaults to all the columns.
+
+    Returns:
+        (list): The matching columns.
+    """
+    if turbines is None:
+        return list(columns)
+    return [c for c in columns if any(t in c for t in turbines)]
+
+
+class DateWindowReader:
+    """Read a time indexed file forward, one date window at a time.
+
+    The file is read in chunks of `chunk_rows` rows, and only the rows of
+    the current window are kept, so the memory used does not depend on
+    the length of the file. The windows must be requested in order.
+    """
+
+    def __init__(self, path, chunk_rows=None, turbines=None, to_numeric=False, start=None):
+        """Initializes a new instance of the class.
+
+        Args:
+            path (str): The CSV file (the first column holds the timestamps)
+                or Parquet file.
+            chunk_rows (int, optional): The number of rows read at once.
+            turbines (list, optional): Only keep the columns of these turbines.
+            to_numeric (bool): Whether to convert every value to a number,
+                with -9999 for the missing or invalid ones, the way
+                `WindFarm` loads an AVG file.
+            start (pandas.Timestamp, optional): The first window will not
+                start before this, so the start of the file is skipped
+                without being parsed (see `iter_time_series_chunks`).
+        """
+        if chunk_rows is None:
+            chunk_rows = DEFAULT_CHUNK_ROWS
+        columns = None
+        if is_parquet_path(path):
+            # only read the columns that are kept
+            columns = keep_turbine_columns(read_column_names(path), turbines)
+        self._chunks = iter_time_series_chunks(
+            path, chunk_rows, columns=columns, start=start
+        )
+        self._turbines = turbines
+        self._to_numeric = to_numeric
+        self._buffer = None
+        self.exhausted = False
+
+    def _read_chunk(self):
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self.exhausted = True
+            return
+        chunk = chunk[keep_turbine_columns(chunk.columns, self._turbines)]
+        if self._to_numeric:
+            chunk = chunk.apply(lambda x: pd.to_numeric(x, errors="coerce"))
+            chunk = chunk.fillna(-9999)
+        if self._buffer is None:
+            self._buffer = chunk
+        else:
+            self._buffer = pd.concat([self._buffer, chunk])
+
+    @property
+    def first_timestamp(self):
+        """(pandas.Timestamp): The first timestamp of the rows not yet dropped."""
+        while not self.exhausted and (self._buffer is None or len(self._buffer) == 0):
+            self._read_chunk()
+        if self._buffer is None or len(self._buffer) == 0:
+            return None
+        return self._buffer.index[0]
+
+    def read(self, start, end):
+        """Return the rows from `start` (included) to `end` (excluded).
+
+        The rows before `start` are dropped, so the next windows must not
+        start before this one.
+        """
+        while not self.exhausted and (
+            self._buffer is None
+            or len(self._buffer) == 0
+            or self._buffer.index[-1] < end
+        ):
+            self._read_chunk()
+            # drop the rows before the window as they are read, so skipping
+            # the start of a file does not hold it in memory
+            if self._buffer is not None:
+                self._buffer = self._buffer[self._buffer.index >= start]
+        if self._buffer is None:
+            return None
+        self._buffer = self._buffer[self._buffer.index >= start]
+        return self._buffer[self._buffer.index < end]
+
+
+def slice_compressed(compressed_data, start, end):
+    """Return the events of compressed data between two dates.
+
+    The state of a turbine at `start` is the last event before it, so that
+    event is kept, moved to `start`, unless an event is at `start`. The first event at or after `end` is
+    kept too, moved to `end`, so the last state of the window lasts until
+    its end.
+
+    Args:
+        compressed_data (pandas.DataFrame): Compressed data with parsed
+            datetime columns (see `parse_compressed_datetimes`).
+        start (pandas.Timestamp): The start of the window.
+        end (pandas.Timestamp): The end of the window.
+
+    Returns:
+        (pandas.DataFrame): The compressed data of the window.
+    """
+    pairs = []
+    for datetime_col, value_col in zip(
+        compressed_data.columns[::2], compressed_data.columns[1::2]
+    ):
+        pair = compressed_data[[datetime_col, value_col]].dropna()
+        times = pair[datetime_col]
+        inside = (times >= start) & (times < end)
+        before = times[times < start]
+        after = times[times >= end]
+        keep = inside.copy()
+        # unless an event starts the window, the state at its start is the last one before it
+        if len(before) and not (times == start).any():
+            keep[before.idxmax()] = True
+        if len(after):
+            keep[after.idxmin()] = True
+        pair = pair[keep].copy()
+        pair[datetime_col] = pair[datetime_col].clip(lower=start, upper=end)
+        pairs.append(pair.reset_index(drop=True))
+    return pd.concat(pairs, axis=1)
+
+
+def select_owned_days(daily_output, start, end, keep_undated=False):
+    """Keep the days from `start` (included) to `end` (excluded) of a daily output.
+
+    Args:
+        daily_output (pandas.DataFrame): Indexed by day, by turbine and day
+            like the power curves, or with a "Day" column.
+        start (pandas.Timestamp): The first day.
+        end (pandas.Timestamp): The day after the last one.
+        keep_undated (bool): Whether to keep the rows that are not of a
+            day, like the OEM power curve (its day is "All").
+
+    Returns:
+        (pandas.DataFrame): The selected days.
+    """
+    if daily_output is None or len(daily_output) == 0:
+        return None
+    days = get_output_days(daily_output)
+    owned = (days >= start) & (days < end)
+    if keep_undated:
+        owned = owned | days.isna()
+    return daily_output[np.asarray(owned)]
+
+
+def get_output_days(daily_output):
+    """Return the day of each row of a daily output, see `select_owned_days`.
+
+    The rows that are not of a day, like the OEM power curve, get NaT.
+    """
+    if "Day" in daily_output.index.names:
+        days = daily_output.index.get_level_values("Day")
+    elif "Day" in daily_output.columns:
+        days = daily_output["Day"]
+    else:
+        days = daily_output.index
+    # the days read back from a CSV file are strings
+    return pd.DatetimeIndex(pd.to_datetime(days, errors="coerce", format="ISO8601"))
+
+
+def concat_daily_outputs(frames):
+    """Stitch the pieces of a daily output, in the order of a single farm.
+
+    Args:
+        frames (list): The pieces, see `select_owned_days`.
+
+    Returns:
+        (pandas.DataFrame): The daily output.
+    """
+    if "Day" in frames[0].columns:
+        return pd.concat(frames, ignore_index=True)
+    output = pd.concat(frames)
+    if "Day" in output.index.names:
+        # the power curves are sorted by turbine and day, and by wind speed bin,
+        # and a piece may not have every bin
+        output = output.sort_index().sort_index(axis=1)
+    if "Turbine" in output.index.names:
+        # the park distribution counts the turbines of each bin, so it is 0,
+        # not missing, for the bins of a day that only other pieces have
+        park = np.asarray(
+            output.index.get_level_values("Turbine").str.endswith(PARK_DISTRIBUTION_SUFFIX)
+        )
+        if park.any():
+            output.loc[park] = output.loc[park].fillna(0)
+    return output
+
+
+class ChunkedWindFarm(WindFarmOutputs):
+    """A wind farm whose daily outputs are computed one date window at a time.
+
+    It provides the daily outputs that `Fleet` combines across farms:
+    daily means, efficiency, lost energy and revenue, severity scores and
+    flagged turbines, and the power curves when an OEM power curve file is
+    given.
+    """
+
+    def __init__(
+        self,
+        avg_path,
+        compressed_path=None,
+        compressed_data=None,
+        yaw_path=None,
+        turbines=None,
+        window_days=None,
+        overlap_days=None,
+        start=None,
+        chunk_rows=None,
+        n_std=1,
+        data_freq="10T",
+        project="WAK",
+        technology=None,
+        revenue_grid=None,
+        oem_powercurve_path=None,
+    ):
+        """Initializes a new instance of the class.
+
+        Args:
+            avg_path (str): The AVG CSV file.
+            compressed_path (str): The compressed data CSV file.
+            compressed_data (pandas.DataFrame): The compressed data, instead
+                of `compressed_path`.
+            yaw_path (str, optional): The 10 second yaw CSV file.
+            turbines (list, optional): Only use the columns of these turbines,
+                eg. one technology of a project in PROJECT_SUBSETS.
+            window_days (int, optional): The number of days of each window.
+            overlap_days (int, optional): The number of days read on each
+                side of a window. They must cover the longest rolling window
+                of the analysis (the gradient filter and the 6 hour severity
+                windows).
+            start (str or datetime, optional): The first day to process. The
+                days before it are only read as the overlap of the first
+                window. Defaults to the first day of the AVG file.
+            chunk_rows (int, optional): The number of CSV rows read at once.
+            n_std (float): The n_std of the severity scores.
+            data_freq (str): See `WindFarm`.
+            project (str): See `WindFarm`.
+            technology (str): See `WindFarm`.
+            revenue_grid (RevenueGrid, optional): See `WindFarm`. It is shared by
+                all windows.
+            oem_powercurve_path (str, optional): See `WindFarm`.
+        """
+        if window_days is None:
+            window_days = DEFAULT_WINDOW_DAYS
+        if overlap_days is None:
+            overlap_days = DEFAULT_OVERLAP_DAYS
+        if all(x is None for x in [compressed_path, compressed_data]):
+            raise ValueError(
+                "ChunkedWindFarm: you must pass either the path to a compressed data file "
+                "or a compressed dataframe."
+            )
+        if compressed_data is None:
+            compressed_data = read_compressed(compressed_path)
+
+        keep_pairs = []
+        for datetime_col, value_col in zip(
+            compressed_data.columns[::2], compressed_data.columns[1::2]
+        ):
+            if keep_turbine_columns([value_col], turbines):
+                keep_pairs.extend([datetime_col, value_col])
+
+        super().__init__(project, technology=technology, n_std=n_std)
+        self._avg_path = avg_path
+        self._yaw_path = yaw_path
+        self._compressed_data = parse_compressed_datetimes(compressed_data[keep_pairs])
+        self._turbines = turbines
+        self._window = pd.Timedelta(days=window_days)
+        self._overlap = pd.Timedelta(days=overlap_days)
+        self._start = None if start is None else pd.Timestamp(start).normalize()
+        self._chunk_rows = chunk_rows
+        self._data_freq = data_freq
+        self._oem_powercurve_path = oem_powercurve_path
+        self._revenue_grid = (
+            revenue_grid if revenue_grid is not None else load_revenue_grid()
+        )
+
+    def iter_windows(self):
+        """Build the WindFarm of each window, in order.
+
+        Yields:
+            (tuple): `(start, end, windfarm)`. The farm holds the data from
+                `start - overlap` to `end + overlap`, and owns the days from
+                `start` (included) to `end` (excluded).
+        """
+        first_read = None if self._start is None else self._start - self._overlap
+        avg_reader = DateWindowReader(
+            self._avg_path,
+            self._chunk_rows,
+            self._turbines,
+            to_numeric=True,
+            start=first_read,
+        )
+        yaw_reader = None
+        if self._yaw_path is not None:
+            yaw_reader = DateWindowReader(
+                self._yaw_path, self._chunk_rows, self._turbines, start=first_read
+            )
+
+        first_timestamp = avg_reader.first_timestamp
+        if first_timestamp is None:
+            return
+        start = first_timestamp.normalize()
+        if self._start is not None:
+            start = max(start, self._start)
+        while True:
+            end = start + self._window
+            avg_data = avg_reader.read(start - self._overlap, end + self._overlap)
+            if avg_data is None or len(avg_data) == 0:
+                if avg_reader.exhausted:
+                    return
+                start = end
+                continue
+
+            yaw_data = None
+            if yaw_reader is not None:
+                yaw_data = yaw_reader.read(start - self._overlap, end + self._overlap)
+
+            windfarm = WindFarm(
+                avg_data=avg_data,
+                compressed_data=slice_compressed(
+                    self._compressed_data,
+                    avg_data.index[0],
+                    end + self._overlap,
+                ),
+                yaw_data=yaw_data if yaw_data is not None and len(yaw_data) else None,
+                data_source_type=DataSourceType.CSV,
+                data_freq=self._data_freq,
+                project=self.name,
+                technology=self.technology,
+                revenue_grid=self._revenue_grid,
+                oem_powercurve_path=self._oem_powercurve_path,
+            )
+            yield start, end, windfarm
+
+            if avg_reader.exhausted and avg_data.index[-1] < end:
+                return
+            start = end
+
+    def _process(self):
+        """Run every window once and stitch their daily outputs together."""
+        if self._outputs is None:
+            pieces = {}
+            for start, end, windfarm in self.iter_windows():
+                print(f"ChunkedWindFarm: processing {self.name} {start} to {end}...")
+                window_outputs = get_windfarm_outputs(
+                    windfarm,
+                    n_std=self._n_std,
+                    with_powercurves=self._oem_powercurve_path is not None,
+                )
+                for name, output in window_outputs.items():
+                    # the OEM power curve is the same in every window
+                    owned = select_owned_days(
+                        output, start, end, keep_undated=name not in pieces
+                    )
+                    if owned is not None:
+                        pieces.setdefault(name, []).append(owned)
+            self._outputs = {
+                name: concat_daily_outputs(frames)
+                for name, frames in pieces.items()
+            }
+        return self._outputs
@@ -0,0 +1,144 @@
+"""A parsed index of the columns of the wide solar tables.
+
+The metrics and recovery tables have one column per weather station and
+metric, named "{plant}-{block}-{pcs}-{ws}-{measurement}_{metric}" (eg.
+"ADB-BLK01-PCS002-WS1-GHI_cosine"). Rather than scanning the hundreds of
+names on every query, `ColumnCatalog` parses them once with the extractors
+of `Charts/Solar/Helpers.py`, and indexes them so that selecting columns is
+a dictionary lookup.
+
+A catalog only changes with the schema of its table, so `COLUMN_CATALOGS`
+keeps one per table and rebuilds it when the version of the table changes.
+"""
+
+import threading
+from collections import defaultdict
+
+from Charts.Solar.Helpers import (
+    extract_base,
+    extract_measurement,
+    extract_metric,
+    extract_plant,
+    extract_weather_station,
+)
+
+
+DATE_COLUMN_NAMES = ("date", "start_time_utc", "Date")
+
+# the parts of a column name that can be selected on
+COLUMN_CATALOG_KEYS = ("plant", "weather_station", "measurement", "metric", "base")
+
+
+class ColumnCatalog:
+    """The columns of a wide table, indexed by the parts of their names."""
+
+    def __init__(self, columns):
+        """Initializes a new instance of the class.
+
+        Args:
+            columns (list): The column names, in the order of the table.
+        """
+        self.date_columns = [c for c in columns if c in DATE_COLUMN_NAMES]
+        self.columns = [c for c in columns if c not in DATE_COLUMN_NAMES]
+        self._index = {key: defaultdict(list) for key in COLUMN_CATALOG_KEYS}
+        for position, column in enumerate(self.columns):
+            plant = extract_plant(column)
+            parts = {
+                "plant": plant,
+                "weather_station": f"{plant}-{extract_weather_station(column)}",
+                "measurement": extract_measurement(column),
+                "metric": extract_metric(column),
+                "base": extract_base(column),
+            }
+            for key, value in parts.items():
+                self._index[key][value].append(position)
+
+    @property
+    def plants(self):
+        """(list): The plants of the table, in order of appearance."""
+        return list(self._index["plant"])
+
+    @property
+    def weather_stations(self):
+        """(list): The "{plant}-{ws}" pairs, eg. "ADB-WS1"."""
+        return list(self._index["weather_station"])
+
+    def select(self, **criteria):
+        """Return the columns matching all the criteria.
+
+        Args:
+            **criteria: Any of `COLUMN_CATALOG_KEYS`, with either one value
+                or a list of accepted values. Criteria that are None are
+                ignored. For example:
+
+                    catalog.select(plant=["ADB", "TRQ"], measurement="GHI")
+
+        Returns:
+            (list): The column names, in the order of the table.
+        """
+        positions = None
+        for key, values in criteria.items():
+            if key not in self._index:
+                raise ValueError(
+                    f"Invalid criterion '{key}'. It must be one of {COLUMN_CATALOG_KEYS}."
+                )
+            if values is None:
+                continue
+            if not isinstance(values, (list, tuple, set)):
+                values = [values]
+            matches = set()
+            for value in values:
+                matches.update(self._index[key].get(value, ()))
+            positions = matches if positions is None else positions & matches
+
+        if positions is None:
+            return list(self.columns)
+        return [self.columns[position] for position in sorted(positions)]
+
+    def __len__(self):
+        return len(self.columns)
+
+
+class ColumnCatalogRegistry:
+    """Keep the catalog of each table, for its current version."""
+
+    def __init__(self):
+        self._catalogs = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "built": 0,
+            "reused": 0,
+        }
+
+    def get(self, table_path, version, columns):
+        """Return the catalog of a table, building it if necessary.
+
+        Args:
+            table_path (str): The fully qualified table name.
+            version (str): The current version of the table. The catalog is
+                rebuilt whenever this changes.
+            columns (callable): Called without arguments to list the
+                columns of the table, when the catalog is (re)built.
+
+        Returns:
+            (ColumnCatalog): The catalog.
+        """
+        with self._lock:
+            cached = self._catalogs.get(table_path)
+            if cached is not None and cached[0] == version:
+                self.stats["reused"] += 1
+                return cached[1]
+
+        catalog = ColumnCatalog(columns())
+        with self._lock:
+            self._catalogs[table_path] = (version, catalog)
+            self.stats["built"] += 1
+        return catalog
+
+    def clear(self):
+        """Drop every catalog."""
+        with self._lock:
+            self._catalogs.clear()
+
+
+COLUMN_CATALOGS = ColumnCatalogRegistry()
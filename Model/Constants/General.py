@@ -8,6 +8,9 @@ CLEANING_ORDER = [
     "range_filtered_data",
     "online_filtered_data_map",
 ]
+# Bit 0 of FarmComponent.cleaning_flags marks the missing raw values, bit i
+# the values removed by the (i-1)th method of CLEANING_ORDER
+RAW_MISSING_FLAG = 1
 TURBINE_TECH = {
     "BR2": {"GE_2_72_116": 2720, "GE_2_82_127": 2820},
     "BTH": {"GE_2_3_116": 2300},
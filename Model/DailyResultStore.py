@@ -0,0 +1,183 @@
+"""A local store of the daily outputs of each wind farm.
+
+The daily outputs of a farm (see `Model.WindFarmOutputs`) only change for
+the days whose data changes, so a nightly run only needs to compute the
+new days. `DailyResultStore` keeps the outputs computed so far, one file
+per farm and output, and the last day each farm was computed for, so the
+next run knows where to start (see `Fleet.IncrementalFleet`).
+
+Every file is written through a temporary file and a rename, and the
+manifest last, so a run stopped midway never leaves a truncated file, and
+the manifest never names a day that is not stored.
+"""
+
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+from Model.ChunkedWindFarm import (
+    concat_daily_outputs,
+    get_output_days,
+    select_owned_days,
+)
+from Model.WindFarmOutputs import WindFarmOutputs
+
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+class DailyResultStore:
+    """The daily outputs of each farm, in a local directory."""
+
+    def __init__(self, store_dir):
+        """Initializes a new instance of the class.
+
+        Args:
+            store_dir (str): The directory of the store. It is created if it
+                does not exist.
+        """
+        os.makedirs(store_dir, exist_ok=True)
+        self._store_dir = store_dir
+        self._manifest_path = os.path.join(store_dir, MANIFEST_FILE_NAME)
+        self._manifest = {}
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path) as f:
+                self._manifest = json.load(f)
+
+    def _get_farm_dir(self, farm_name):
+        return os.path.join(self._store_dir, farm_name)
+
+    def _get_output_path(self, farm_name, output_name):
+        # output names like "severity:<component>" are not valid file names everywhere
+        file_name = output_name.replace(":", "__")
+        return os.path.join(self._get_farm_dir(farm_name), f"{file_name}.pkl")
+
+    @staticmethod
+    def _write_temporary(path, write):
+        """Write a file next to `path`, to be renamed to it, and return its path."""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return tmp_path
+
+    def get_last_day(self, farm_name):
+        """Return the last day stored for a farm.
+
+        Args:
+            farm_name (str): The name of the farm in the fleet.
+
+        Returns:
+            (pandas.Timestamp): The day, or None if nothing was stored yet.
+        """
+        last_day = self._manifest.get(farm_name)
+        return None if last_day is None else pd.Timestamp(last_day)
+
+    def load(self, farm_name):
+        """Return the stored outputs of a farm.
+
+        Args:
+            farm_name (str): The name of the farm in the fleet.
+
+        Returns:
+            (dict): The daily frames, by output name.
+        """
+        outputs = {}
+        farm_dir = self._get_farm_dir(farm_name)
+        if not os.path.isdir(farm_dir):
+            return outputs
+        for file_name in os.listdir(farm_dir):
+            output_name, extension = os.path.splitext(file_name)
+            if extension == ".pkl":
+                outputs[output_name.replace("__", ":")] = pd.read_pickle(
+                    os.path.join(farm_dir, file_name)
+                )
+        return outputs
+
+    def update(self, farm_name, new_outputs, first_day=None):
+        """Replace the stored days of a farm from `first_day` on.
+
+        Args:
+            farm_name (str): The name of the farm in the fleet.
+            new_outputs (WindFarmOutputs): The outputs computed from
+                `first_day` on.
+            first_day (pandas.Timestamp, optional): The first day computed.
+                Defaults to None, when the whole history was computed.
+
+        Returns:
+            (WindFarmOutputs): The outputs of the whole history.
+        """
+        stored_outputs = self.load(farm_name)
+        computed_outputs = new_outputs._process()
+        os.makedirs(self._get_farm_dir(farm_name), exist_ok=True)
+
+        outputs = {}
+        removed_paths = []
+        last_day = self.get_last_day(farm_name) if first_day is not None else None
+        for output_name in sorted(set(stored_outputs) | set(computed_outputs)):
+            frames = []
+            if output_name in stored_outputs and first_day is not None:
+                # the rows that are not of a day are computed again, if at all
+                frames.append(
+                    select_owned_days(
+                        stored_outputs[output_name],
+                        pd.Timestamp.min,
+                        first_day,
+                        keep_undated=output_name not in computed_outputs,
+                    )
+                )
+            frames.append(computed_outputs.get(output_name))
+            frames = [frame for frame in frames if frame is not None and len(frame)]
+            output_path = self._get_output_path(farm_name, output_name)
+            if not frames:
+                if os.path.exists(output_path):
+                    removed_paths.append(output_path)
+                continue
+
+            output = concat_daily_outputs(frames)
+            outputs[output_name] = output
+
+            output_last_day = get_output_days(output).max()
+            if last_day is None or output_last_day > last_day:
+                last_day = output_last_day
+
+        # write every output before renaming any of them
+        tmp_paths = {}
+        try:
+            for output_name, output in outputs.items():
+                output_path = self._get_output_path(farm_name, output_name)
+                tmp_paths[output_path] = self._write_temporary(output_path, output.to_pickle)
+        except BaseException:
+            for tmp_path in tmp_paths.values():
+                os.remove(tmp_path)
+            raise
+        for output_path, tmp_path in tmp_paths.items():
+            os.replace(tmp_path, output_path)
+        for output_path in removed_paths:
+            os.remove(output_path)
+
+        if last_day is not None:
+            manifest = dict(self._manifest)
+            manifest[farm_name] = last_day.strftime("%Y-%m-%d")
+
+            def write_manifest(path):
+                with open(path, "w") as f:
+                    json.dump(manifest, f, indent=2, sort_keys=True)
+
+            os.replace(
+                self._write_temporary(self._manifest_path, write_manifest),
+                self._manifest_path,
+            )
+            self._manifest = manifest
+
+        return WindFarmOutputs(
+            new_outputs.name,
+            technology=new_outputs.technology,
+            outputs=outputs,
+            n_std=new_outputs._n_std,
+        )
@@ -12,6 +12,7 @@ from databricks.sdk import WorkspaceClient
 from databricks.sdk.core import Config
 from pyspark.sql import functions as F
 from pyspark.sql import SparkSession
+from pyspark.sql.connect.dataframe import DataFrame as ConnectDataFrame
 from pyspark.sql.functions import avg as pyspark_avg
 from pyspark.sql.functions import sum as pyspark_sum
 from pyspark.sql.functions import round as pyspark_round
@@ -52,6 +53,7 @@ from Utils.ISightConstants import (
     HISTORICAL_WS_SCALE_COLUMN_LOOKUP,
     HISTORICAL_WS_ROUNDING_COLUMN_LOOKUP,
     TOOLTIP_LOST_ENERGY_DECIMAL_ROUNDING,
+    BUDGET_DEVIATION_KPIS,
     PI_TAG_REGEX_PATTERN_LOOKUP,
 )
 from Utils.UiConstants import (
@@ -60,6 +62,22 @@ from Utils.UiConstants import (
     DESCRIPTION_CODE_DELIM,
 )
 from Utils.Enums import DataSourceType, ComponentTypes
+from Utils.ParquetFiles import read_column_names
+from Model.ColumnCatalog import COLUMN_CATALOGS
+from Model.QueryCache import (
+    QUERY_CACHE,
+    cached_query,
+    TTL_LOOKUP_SECONDS,
+    TTL_METRICS_SECONDS,
+    TTL_TIME_SERIES_SECONDS,
+)
+from Model.SessionPool import SESSION_POOL
+from Model.SparkActions import SPARK_ACTIONS, is_counting_requested
+
+# count the queries that each repository call runs on the cluster, only on
+# request since it patches the Spark Connect DataFrame for the whole process
+if is_counting_requested():
+    SPARK_ACTIONS.instrument(ConnectDataFrame)
 
 
 class RepositoryFactory:
@@ -76,7 +94,8 @@ class RepositoryFactory:
 
         Args:
             data_source_type (DataSourceType): The type of data source to use.
-            data_file_path (str): The path to the CSV file to use as the data source (if `data_source_type` is `DataSourceType.CSV`).
+            data_file_path (str): The path to the CSV file to use as the data source (if `data_source_type` is `DataSourceType.CSV`),
+                or to the Parquet file (if `data_source_type` is `DataSourceType.PARQUET`).
             data_file_index (int): The column to use as the index of the data (if `data_source_type` is `DataSourceType.CSV`).
             data_file_parse_dates (bool): Whether to parse dates in the CSV file (if `data_source_type` is `DataSourceType.CSV`).
 
@@ -94,6 +113,9 @@ class RepositoryFactory:
                 data_file_index=data_file_index,
                 data_file_parse_dates=data_file_parse_dates,
             )
+
+        if data_source_type == DataSourceType.PARQUET:
+            repo = Parquet_Repository(data_file_path=data_file_path, data=data)
         return repo
 
 
@@ -252,6 +274,123 @@ class CSV_Repository:
 
         return sorted(list(all_columns))
 
+    def get_main_column_names(self):
+        """Returns the column names of the main dataframe."""
+        return list(self.data.columns)
+
+
+class Parquet_Repository(CSV_Repository):
+    """A repository that reads data from a Parquet file, one column at a time.
+
+    Only the schema of the file is read up front. `get_column_data` reads
+    the requested columns from the file each time, so each FarmComponent
+    only loads its own tags. Data added with `add_data` is kept in memory.
+    """
+
+    def __init__(self, data_file_path=None, data=None, freq=None):
+        """Initializes a new instance of the Parquet_Repository class.
+
+        Args:
+            data_file_path (str): The path to the Parquet file, eg. written
+                by `Utils.ParquetFiles.convert_time_series_csv`.
+            data (pandas.DataFrame): More data, kept in memory.
+            freq (str): The frequency of the data in the file.
+        """
+        super().__init__(data_file_path=data_file_path, data=data, freq=freq)
+        self._file_columns = None
+
+    @property
+    def file_columns(self):
+        """(list): The columns of the Parquet file."""
+        if self._file_columns is None:
+            self._file_columns = read_column_names(self._path) if self._path else []
+        return self._file_columns
+
+    def get_data(self):
+        """Reads every column of the Parquet file.
+
+        Returns:
+            pandas.DataFrame: The data from the Parquet file.
+        """
+        if self._path:
+            return pd.read_parquet(self._path)
+        return None
+
+    def add_data(self, new_data, freq=None):
+        """Adds new data to the repository, next to the data of the file."""
+        new_freq = freq if freq is not None else pd.infer_freq(new_data.index)
+
+        if new_freq is None:
+            raise ValueError("Frequency of new dataset could not be inferred")
+
+        self._dataframes.append(new_data)
+
+    def get_column_data(self, column_names, freq=None):
+        """Retrieve data for specific columns, reading only those columns.
+
+        Args:
+            column_names (list or str): The name(s) of the column(s) to
+                retrieve.
+            freq (str, optional): The frequency of the data to retrieve,
+                for the columns that were added with `add_data`.
+
+        Returns:
+            pd.DataFrame: A dataframe containing the requested column data.
+
+        Raises:
+            ValueError: If any specified column is not found or if the frequency
+            is ambiguous.
+        """
+        if isinstance(column_names, str):
+            column_names = [column_names]
+
+        file_columns = set(self.file_columns)
+        from_file = [col for col in column_names if col in file_columns]
+        dfs_to_concat = []
+        if len(from_file) > 0:
+            dfs_to_concat.append(pd.read_parquet(self._path, columns=from_file))
+
+        for col in column_names:
+            if col in file_columns:
+                continue
+
+            found_dataframes = [df for df in self._dataframes if col in df.columns]
+
+            if len(found_dataframes) == 0:
+                raise ValueError(f"Column '{col}' not found in any dataframe.")
+
+            elif len(found_dataframes) > 1 and freq is None:
+                raise ValueError(
+                    f"Column '{col}' exists in multiple dataframes. Please specify a frequency."
+                )
+
+            for df in found_dataframes:
+                if pd.infer_freq(df.index) == freq or (
+                    freq is None and pd.infer_freq(df.index) is not None
+                ):
+                    dfs_to_concat.append(df[[col]])
+                    break
+            else:
+                raise ValueError(
+                    f"Column '{col}' not found for the specified frequency."
+                )
+
+        result_df = pd.concat(dfs_to_concat, axis=1)
+        return result_df[column_names]
+
+    def get_all_column_names(self):
+        """Returns all unique column names across the repository."""
+        all_columns = set(self.file_columns)
+
+        for df in self._dataframes:
+            all_columns.update(list(set(df.columns)))
+
+        return sorted(list(all_columns))
+
+    def get_main_column_names(self):
+        """Returns the column names of the Parquet file."""
+        return list(self.file_columns)
+
 
 class MSSQL_Repository:
     """A repository that reads data from a Microsoft SQL Server database."""
@@ -297,6 +436,60 @@ class MSSQL_Repository:
         return connection
 
 
+# The series of the inverter performance charts, by series name, and the
+# column each one becomes
+INVERTER_PERFORMANCE_SERIES = {
+    "IrradiancePOAAverage": "IrradiancePOAAverage",
+    "ActivePowerNormalized": "ActivePowerNormalized",
+    "ActivePowerExpected": "ActivePowerExpected",
+    "ActivePower+Value": "ActivePower",
+    "InverterActivePowerNormalizedAverage": "InverterActivePowerNormalizedAverage",
+}
+
+
+def join_inverter_performance_series(df_series, plant):
+    """Inner join the inverter performance series on their timestamps.
+
+    A timestamp can hold several values of a series (eg. the POA of
+    several Weather Stations attributes). Every combination of them is
+    kept, like an inner join of the series does, and missing values are
+    kept too. The rows are sorted, so the result does not depend on the
+    order the rows were read in.
+
+    Args:
+        df_series (pd.DataFrame): The long rows of the series, with the
+            columns "start_time_utc", "series_name" and "attribute_value".
+        plant (str): The plant of the inverter.
+
+    Returns:
+        (pd.DataFrame): One column per series (see
+            `INVERTER_PERFORMANCE_SERIES`), and "plant_abbrev", for the
+            timestamps where every series has a value. The active power
+            values below -1000 are dropped before the join.
+    """
+    df_series = df_series.sort_values(
+        ["start_time_utc", "series_name", "attribute_value"], kind="mergesort"
+    )
+    df_combined = None
+    for series_name, column in INVERTER_PERFORMANCE_SERIES.items():
+        df_one = df_series.loc[
+            df_series["series_name"] == series_name, ["start_time_utc", "attribute_value"]
+        ].rename(columns={"attribute_value": column})
+        if column in ("ActivePower", "ActivePowerNormalized"):
+            df_one = df_one[df_one[column] > -1000]
+        if df_combined is None:
+            df_combined = df_one
+        else:
+            df_combined = df_combined.merge(df_one, on="start_time_utc", how="inner")
+
+    df_combined.insert(
+        df_combined.columns.get_loc("InverterActivePowerNormalizedAverage"),
+        "plant_abbrev",
+        plant,
+    )
+    return df_combined.reset_index(drop=True)
+
+
 class Databricks_Repository:
     """A repository that reads data from the Databricks Tables via the PySpark API."""
 
@@ -304,8 +497,10 @@ class Databricks_Repository:
         """Initializes a new instance of the class.
 
         Args:
-            _spark (PySpark Session): The session object that establishes a connection
-                to databricks.
+            _session_pool (SparkSessionPool): The process-wide pool that holds
+                the session objects that establish a connection to databricks.
+                It is shared by every instance of this class, so creating a
+                repository per callback does not create a session per callback.
             solar_catalog (str): The name of the Databricks Catalog Explorer
                 for all data connections to be used in the Solar side of the
                 application. See config.py for more info.
@@ -316,8 +511,7 @@ class Databricks_Repository:
         Returns:
             None
         """
-        self._spark = None
-        self._active_catalog_name = None
+        self._session_pool = SESSION_POOL
         self.solar_catalog = os.environ["ALT_DATABRICKS_CATALOG_SOLAR"]
         self.wind_catalog = os.environ["ALT_DATABRICKS_CATALOG_WIND"]
 
@@ -342,16 +536,76 @@ class Databricks_Repository:
         Output:
             metrics_df (pd.DataFrame): The modified metrics data.
         """
-        for index, row in clear_sky_df.iterrows():
-            date = row["date"]
-            plant = row["plant"]
+        if clear_sky_df.empty or metrics_df.empty:
+            return metrics_df
+
+        # (date x plant) mask of the clear sky days
+        clear_sky_dates = pd.to_datetime(clear_sky_df["date"])
+        date_plant_mask = pd.crosstab(clear_sky_dates, clear_sky_df["plant"]) > 0
+        plants = date_plant_mask.columns
+
+        # spread it to the (row x column) cells of the metrics
+        row_dates = pd.to_datetime(metrics_df["date"])
+        row_plant_mask = date_plant_mask.reindex(index=row_dates, fill_value=False).to_numpy()
+        columns = pd.Index(metrics_df.columns.astype(str))
+        column_plant_mask = np.column_stack(
+            [columns.str.startswith(plant) for plant in plants]
+        )
+        cell_mask = (row_plant_mask.astype(np.int32) @ column_plant_mask.T.astype(np.int32)) > 0
+
+        masked_columns = metrics_df.columns[cell_mask.any(axis=0)]
+        if len(masked_columns) == 0:
+            return metrics_df
+        column_positions = metrics_df.columns.get_indexer(masked_columns)
+        metrics_df[masked_columns] = np.where(
+            cell_mask[:, column_positions],
+            np.nan,
+            metrics_df[masked_columns].to_numpy(dtype=float),
+        )
+        return metrics_df
 
-            df_index = metrics_df[metrics_df["date"] == date].index
-            matching_columns = [
-                col for col in metrics_df.columns if col.startswith(plant)
+    @staticmethod
+    def keep_only_clear_sky_days_pyspark(metrics_df, clear_sky_df):
+        """The PySpark counterpart of `keep_only_clear_sky_days`.
+
+        The clear sky days are pivoted to one flag per plant and joined to
+        the metrics on the date, so that the masking (and the aggregation
+        that follows it) runs on the cluster.
+
+        All the masked columns are computed by a single `select`. Chaining
+        one `withColumn` per column instead nests hundreds of projections
+        in the query plan, which is what used to raise a RecursionError.
+
+        Args:
+            metrics_df (pyspark.DataFrame): The metrics data, pre
+                aggregation.
+            clear_sky_df (pyspark.DataFrame): The clear sky data. See
+                `get_clear_sky`.
+
+        Returns:
+            (pyspark.DataFrame): The modified metrics data.
+        """
+        metric_columns = [col_name for col_name in metrics_df.columns if col_name != "date"]
+        plants = sorted({extract_plant(col_name) for col_name in metric_columns})
+        if not plants:
+            return metrics_df
+        flag_columns = {plant: f"is_clear_sky_day_{plant}" for plant in plants}
+
+        clear_sky_flags_df = clear_sky_df.groupBy("date").agg(
+            *[
+                pyspark_max(F.when(col("plant") == plant, lit(True))).alias(flag_column)
+                for plant, flag_column in flag_columns.items()
             ]
-            metrics_df.loc[df_index, matching_columns] = np.nan
-        return metrics_df
+        )
+        df = metrics_df.join(clear_sky_flags_df, on="date", how="left")
+
+        masked_columns = [
+            F.when(col(flag_columns[extract_plant(col_name)]).isNull(), col(col_name))
+            .alias(col_name)
+            for col_name in metric_columns
+        ]
+        # the join does not preserve the order of the dates
+        return df.select("date", *masked_columns).orderBy(col("date").asc())
 
     @staticmethod
     def aggr_pandas_numeric_cols(df, should_aggregate):
@@ -463,58 +717,114 @@ class Databricks_Repository:
     def get_session(self, catalog_name=None):
         """Returns the PySpark Session Connection.
 
-        Dynamically handles authentication via OAuth (Client ID and Secret) or
-        Personal Access Token (PAT). Caches the session for reuse.
+        The session is borrowed from the process-wide `SESSION_POOL`, so
+        it is only built the first time a catalog is requested by this
+        process (or after it failed a health check).
         """
         if catalog_name is None:
             catalog_name = "wind"
+        if catalog_name.lower() not in ("solar", "wind"):
+            raise Exception("The 'catalog_name' param must be either 'solar' or 'wind'. Uppercase is allowed as well.")
+        return self._session_pool.get_session(catalog_name, self._create_session)
 
-        new_connection_required = (
-            self._spark is None or
-            self._active_catalog_name != catalog_name
-        )
+    @staticmethod
+    def _create_session(catalog_name):
+        """Build a new PySpark Session Connection for a catalog.
 
-        if new_connection_required:
-            try:
-                token = os.environ.get("DATABRICKS_TOKEN")  # TODO: Remove safely
-
-                prefix = catalog_name.upper() + "_"
-                if catalog_name.lower() not in ("solar", "wind"):
-                    raise Exception("The 'catalog_name' param must be either 'solar' or 'wind'. Uppercase is allowed as well.")
-                host = os.environ.get(f"{prefix}ALT_DATABRICKS_HOST")
-                client_id = os.environ.get(f"{prefix}ALT_DATABRICKS_CLIENT_ID")
-                client_secret = os.environ.get(f"{prefix}ALT_DATABRICKS_CLIENT_SECRET")
-                if not host:
-                    raise ValueError("Environment variable DATABRICKS_HOST is not set.")
-
-                # Prioritize OAuth if client_id and client_secret are available
-                if client_id and client_secret:
-                    os.environ.pop("DATABRICKS_TOKEN", None)
-                    
-                    config = Config(
-                        host=host,
-                        client_id=client_id,
-                        client_secret=client_secret,
-                        serverless_compute_id="auto",
-                    )
-                    self._active_catalog_name = catalog_name
-                elif token:
-                    print("Using PAT authentication...")
-                    config = Config(
-                        host=host,
-                        token=token,
-                        serverless_compute_id="auto",
-                    )
-                else:
-                    raise ValueError("No valid authentication method found. Provide either PAT or OAuth credentials.")
+        Dynamically handles authentication via OAuth (Client ID and Secret) or
+        Personal Access Token (PAT).
+        """
+        try:
+            token = os.environ.get("DATABRICKS_TOKEN")  # TODO: Remove safely
+
+            prefix = catalog_name.upper() + "_"
+            host = os.environ.get(f"{prefix}ALT_DATABRICKS_HOST")
+            client_id = os.environ.get(f"{prefix}ALT_DATABRICKS_CLIENT_ID")
+            client_secret = os.environ.get(f"{prefix}ALT_DATABRICKS_CLIENT_SECRET")
+            if not host:
+                raise ValueError("Environment variable DATABRICKS_HOST is not set.")
+
+            # Prioritize OAuth if client_id and client_secret are available
+            if client_id and client_secret:
+                os.environ.pop("DATABRICKS_TOKEN", None)
+
+                config = Config(
+                    host=host,
+                    client_id=client_id,
+                    client_secret=client_secret,
+                    serverless_compute_id="auto",
+                )
+            elif token:
+                print("Using PAT authentication...")
+                config = Config(
+                    host=host,
+                    token=token,
+                    serverless_compute_id="auto",
+                )
+            else:
+                raise ValueError("No valid authentication method found. Provide either PAT or OAuth credentials.")
+
+            # Create Databricks session
+            return DatabricksSession.builder.sdkConfig(config).getOrCreate()
+
+        except Exception as e:
+            print(f"Failed to create Databricks session: {e}")
+            raise RuntimeError("Unable to establish a Databricks connection.")
+
+    def get_table_version(self, table_name, catalog_name=None):
+        """Retrieves the time at which a table was last modified.
+
+        This is used to invalidate the cached query results (see
+        `Model.QueryCache`) when a table is refreshed.
+
+        Args:
+            table_name (str): The fully qualified name of the Databricks table.
+            catalog_name (str): Either "solar" or "wind".
+
+        Returns:
+            last_modified (datetime): The `lastModified` value reported by
+                `DESCRIBE DETAIL`, or None if it could not be retrieved.
+        """
+        if catalog_name is None:
+            catalog_name = "solar"
+        spark = self.get_session(catalog_name)
+        try:
+            result = spark.sql(f"DESCRIBE DETAIL {table_name}").select("lastModified").collect()
+        except Exception as e:
+            print(f"Not able to retrieve the version of {table_name}: {e}")
+            return None
+        last_modified = result[0]["lastModified"] if result else None
+        return last_modified
 
-                # Create Databricks session
-                self._spark = DatabricksSession.builder.sdkConfig(config).getOrCreate()
+    def get_column_catalog(self, table_name, catalog_name=None):
+        """Returns the parsed column catalog of a wide table.
 
-            except Exception as e:
-                print(f"Failed to create Databricks session: {e}")
-                raise RuntimeError("Unable to establish a Databricks connection.")
-        return self._spark
+        The catalog is only rebuilt when the version of the table changes
+        (see `get_table_version`), so listing the columns of the table does
+        not cost a round trip on every query.
+
+        Args:
+            table_name (str): The table, relative to the catalog (eg.
+                "isight.metrics").
+            catalog_name (str, optional): Either "solar" or "wind".
+                Defaults to "solar".
+
+        Returns:
+            (ColumnCatalog): See `Model.ColumnCatalog`.
+        """
+        if catalog_name is None:
+            catalog_name = "solar"
+        catalog_path = self._get_catalog_path(catalog_name)
+        table_path = f"{catalog_path}.{table_name}"
+        version = QUERY_CACHE.get_table_versions(
+            (table_path,),
+            lambda path: self.get_table_version(path, catalog_name),
+        )
+        return COLUMN_CATALOGS.get(
+            table_path,
+            version,
+            lambda: self.get_session(catalog_name).table(table_path).columns,
+        )
 
     def get_table_last_updated(self, table_name):
         """Retrieves the last updated date of the specified table.
@@ -525,14 +835,12 @@ class Databricks_Repository:
         Returns:
             last_date (datetime): The last updated date of the table.
         """
-        catalog_name = "solar"
-        spark = self.get_session(catalog_name)
-        result = spark.sql(f"DESCRIBE DETAIL {table_name}").select("lastModified").collect()
-        last_date = result[0]["lastModified"] if result else None
+        last_date = self.get_table_version(table_name, catalog_name="solar")
         if last_date:
             last_date = last_date.strftime("%B %d, %Y")
         return last_date
 
+    @cached_query(tables=("isight.metrics",), ttl=TTL_LOOKUP_SECONDS)
     def get_plants(self, is_sorted=None) -> list:
         """Returns all unique plant names from the metrics table.
 
@@ -543,56 +851,28 @@ class Databricks_Repository:
         if is_sorted is None:
             is_sorted = False
 
-        catalog_name = "solar"
-        catalog_path = self._get_catalog_path(catalog_name)
-        spark = self.get_session(catalog_name)
-        df = spark.table(f"{catalog_path}.isight.metrics")
-
-        # remove the date column since we don't need it
-        df = df.drop("date")
-        df = df.drop("start_time_utc")
-        df = df.drop("Date")
-
-        column_names = df.columns
-        unique_prefixes = {col[:3] for col in column_names}
-        plant_names = list(unique_prefixes)
+        column_catalog = self.get_column_catalog("isight.metrics")
+        plant_names = column_catalog.plants
 
         if is_sorted:
             plant_names = sorted(plant_names)
         return plant_names
 
+    @cached_query(tables=("isight.metrics",), ttl=TTL_LOOKUP_SECONDS)
     def get_plant_weatherstation_pairs(self) -> list:
         """Returns all unique plant-weatherstation names from the metrics table.
 
         An example looks like "ABD-WS1": Weather Station 1 for Adobe (ADB).
         """
-
-        def _clean_colname(colname):
-            plant = extract_plant(colname)
-            ws = extract_weather_station(colname)
-            return f"{plant}-{ws}"
-
-        catalog_name = "solar"
-        catalog_path = self._get_catalog_path(catalog_name)
-        spark = self.get_session(catalog_name)
-        df = spark.table(f"{catalog_path}.isight.metrics")
-
-        # remove the date column
-        df = df.drop("date")
-        df = df.drop("start_time_utc")
-        df = df.drop("Date")
-
-        names = [_clean_colname(col) for col in df.columns]
-        names = list(set(names))
-        names = sorted(names)
-        return names
+        column_catalog = self.get_column_catalog("isight.metrics")
+        return sorted(column_catalog.weather_stations)
 
     def get_min_and_max_dates_across_tables(self, table_array, catalog_name) -> [datetime.date, datetime.date]:
         """Grab the min and max dates across an arbitrary number of tables."""
         spark = self.get_session(catalog_name)
 
-        overall_min_date = None
-        overall_max_date = None
+        # one single-row aggregate per table, all collected in one query
+        min_max_dates_df = None
         for table in table_array:
             date_columns = ["date", "day"]
             date_column = None
@@ -601,21 +881,28 @@ class Databricks_Repository:
                 if col not in spark.table(table).columns:
                     continue
                 df = spark.table(table)
-                df.select(col)
                 date_column = col
 
             if not date_column:
                 raise ValueError(f"Could not find date column in table {table}.")
             
-            min_max_dates = df.agg(
-                pyspark_min(date_column).alias("min_date"), 
-                pyspark_max(date_column).alias("max_date")
-            ).collect()[0]
-            
+            table_min_max_dates_df = df.agg(
+                pyspark_min(date_column).cast("string").alias("min_date"), 
+                pyspark_max(date_column).cast("string").alias("max_date")
+            )
+            if min_max_dates_df is None:
+                min_max_dates_df = table_min_max_dates_df
+            else:
+                min_max_dates_df = min_max_dates_df.unionByName(table_min_max_dates_df)
+
+        overall_min_date = None
+        overall_max_date = None
+        rows = min_max_dates_df.collect() if min_max_dates_df is not None else []
+        for min_max_dates in rows:
             try:
                 current_min_date = datetime.strptime(min_max_dates["min_date"], "%Y-%m-%d").date()
                 current_max_date = datetime.strptime(min_max_dates["max_date"], "%Y-%m-%d").date()
-            except ValueError:
+            except (TypeError, ValueError):
                 continue
 
             if overall_min_date is None or current_min_date < overall_min_date:
@@ -628,6 +915,10 @@ class Databricks_Repository:
         
         return overall_min_date, overall_max_date
 
+    @cached_query(
+        tables=("isight.metrics", "isight.inverter_metrics"),
+        ttl=TTL_LOOKUP_SECONDS,
+    )
     def get_date_range(self) -> [datetime.date, datetime.date]:
         """Returns the lower and upper dates for the date picker.
         
@@ -644,17 +935,20 @@ class Databricks_Repository:
 
         # Grab min and max dates from the metrics table
         df = spark.table(f"{catalog_path}.isight.metrics")
-        min_max_dates = df.agg(
+        min_max_dates_df = df.agg(
             pyspark_min("date").alias("min_date"), pyspark_max("date").alias("max_date")
-        ).collect()[0]
+        )
 
         # Grab min and max dates from the inverter metrics table
         df_inv = spark.table(f"{catalog_path}.isight.inverter_metrics")
-        inv_min_max_dates = df_inv.agg(
-            pyspark_min("day").alias("min_date"), pyspark_max("day").alias("max_date")
-        ).collect()[0]
-        inv_min_date = datetime.strptime(inv_min_max_dates["min_date"], "%Y-%m-%d").date()
-        inv_max_date = datetime.strptime(inv_min_max_dates["max_date"], "%Y-%m-%d").date()
+        inv_min_max_dates_df = df_inv.agg(
+            pyspark_min("day").alias("inv_min_date"), pyspark_max("day").alias("inv_max_date")
+        )
+
+        # both single-row aggregates come back in one query
+        min_max_dates = min_max_dates_df.crossJoin(inv_min_max_dates_df).collect()[0]
+        inv_min_date = datetime.strptime(min_max_dates["inv_min_date"], "%Y-%m-%d").date()
+        inv_max_date = datetime.strptime(min_max_dates["inv_max_date"], "%Y-%m-%d").date()
 
         # Find the min and max date across both tables
         min_date = min(
@@ -665,6 +959,15 @@ class Databricks_Repository:
         )
         return min_date, max_date
 
+    @cached_query(
+        tables=(
+            "isight.metrics",
+            "isight.daytime_metrics",
+            "isight.nighttime_metrics",
+            "isight.clear_sky_days",
+        ),
+        ttl=TTL_METRICS_SECONDS,
+    )
     def get_metrics_data(
         self,
         start_date,
@@ -728,11 +1031,12 @@ class Databricks_Repository:
         catalog_path = self._get_catalog_path(catalog_name)
         spark = self.get_session(catalog_name)
         if isinstance(day_night_filter, str) and day_night_filter.lower() == "day":
-            table_path = f"{catalog_path}.isight.daytime_metrics"
+            table_name = "isight.daytime_metrics"
         elif isinstance(day_night_filter, str) and day_night_filter.lower() == "night":
-            table_path = f"{catalog_path}.isight.nighttime_metrics"
+            table_name = "isight.nighttime_metrics"
         else:
-            table_path = f"{catalog_path}.isight.metrics"
+            table_name = "isight.metrics"
+        table_path = f"{catalog_path}.{table_name}"
 
         try:
             translated_metric = DATABASE_METRIC_TRANSLATOR[metric]
@@ -741,34 +1045,26 @@ class Databricks_Repository:
         df = spark.table(table_path)
 
         # Filter by date range first to get rid of as much data as possible for subsequential calcs
-        start_date = start_date.date()
-        end_date = end_date.date()
-        df = df.filter((df.date >= start_date) & (df.date <= end_date))
+        # (the datetimes are kept for get_clear_sky, which takes the dates itself)
+        df = df.filter(
+            (col("date") >= start_date.date()) & (col("date") <= end_date.date())
+        )
 
         # sort the date column in ascending order
         df = df.orderBy(col("date").asc())
 
-        # filter dataset by parameters: TODO: wrap and test
-        filtered_cols = df.columns
-        if translated_metric:
-            filtered_cols = [
-                col_name
-                for col_name in filtered_cols
-                if col_name.endswith(translated_metric)
-            ]
-        if measurement:
-            filtered_cols = [
-                col_name for col_name in filtered_cols if measurement in col_name
-            ]
-        if plant is not None:
-            plant_set = tuple(plant)
-            filtered_cols = [
-                col_name for col_name in filtered_cols if col_name.startswith(plant_set)
-            ]
-        filtered_cols = [col_name for col_name in filtered_cols if col_name != "date"]
+        # filter dataset by parameters
+        column_catalog = self.get_column_catalog(table_name, catalog_name)
+        filtered_cols = column_catalog.select(
+            plant=plant,
+            measurement=measurement or None,
+            metric=translated_metric or None,
+        )
         df = df.select("date", *filtered_cols)
 
-        if len(df.toPandas().columns) == 1 and df.columns[0] == "date":
+        # nothing but the dates survived the filters: checked on the schema,
+        # so that the query only runs once, below
+        if not filtered_cols:
             return df.toPandas()
 
         # Filter by clear sky if applicable
@@ -776,14 +1072,9 @@ class Databricks_Repository:
             clear_sky_df = self.get_clear_sky(
                 start_date=start_date,
                 end_date=end_date,
-                as_pyspark=False,
+                as_pyspark=True,
             )
-
-            # Note that we convert to pandas to avoid a RecursionError
-            # that happens in the aggregation stage below
-            df = df.toPandas()
-
-            df = self.keep_only_clear_sky_days(
+            df = self.keep_only_clear_sky_days_pyspark(
                 metrics_df=df,
                 clear_sky_df=clear_sky_df,
             )
@@ -795,6 +1086,14 @@ class Databricks_Repository:
             output_df = self.aggr_pyspark_numeric_cols(df=df, should_aggregate=should_aggregate)
         return output_df
 
+    @cached_query(
+        tables=(
+            "isight.recovery",
+            "isight.daytime_recovery",
+            "isight.nighttime_recovery",
+        ),
+        ttl=TTL_METRICS_SECONDS,
+    )
     def get_recovery_data(
         self,
         start_date,
@@ -843,40 +1142,38 @@ class Databricks_Repository:
         catalog_path = self._get_catalog_path(catalog_name)
         spark = self.get_session(catalog_name)
         if isinstance(day_night_filter, str) and day_night_filter.lower() == "day":
-            table_path = f"{catalog_path}.isight.daytime_recovery"
+            table_name = "isight.daytime_recovery"
         elif isinstance(day_night_filter, str) and day_night_filter.lower() == "night":
-            table_path = f"{catalog_path}.isight.nighttime_recovery"
+            table_name = "isight.nighttime_recovery"
         else:
-            table_path = f"{catalog_path}.isight.recovery"
-        df = spark.table(table_path)
+            table_name = "isight.recovery"
+        df = spark.table(f"{catalog_path}.{table_name}")
+        column_catalog = self.get_column_catalog(table_name, catalog_name)
 
         # as a safety check, rename the date column so calculations below run
         date_colname = "date"
         invalid_date_colname_arr = ["start_time_utc", "Date"]
         for invalid_colname in invalid_date_colname_arr:
-            if invalid_colname in df.columns:
+            if invalid_colname in column_catalog.date_columns:
                 df = df.withColumnRenamed(invalid_colname, date_colname)
 
         # Filter by date range first to get rid of as much data as possible for subsequential calcs
         end_date = end_date + timedelta(days=1)
-        df = df.filter((df.date >= start_date) & (df.date <= end_date))
+        df = df.filter((col(date_colname) >= start_date) & (col(date_colname) <= end_date))
 
         # Sort the DataFrame by the date column
         df = df.orderBy(col(date_colname).asc())
 
         # filter dataset by parameters
-        filtered_cols = df.columns
-        if measurement:
-            filtered_cols = [
-                col_name for col_name in filtered_cols if measurement in col_name
-            ]
-        if plant is not None:
-            plant_set = tuple(plant)
-            filtered_cols = [
-                col_name for col_name in filtered_cols if col_name.startswith(plant_set)
-            ]
+        filtered_cols = column_catalog.select(
+            plant=plant,
+            measurement=measurement or None,
+        )
         df = df.select(date_colname, *filtered_cols)
-        if len(df.toPandas().columns) == 1 and df.columns[0].lower() == date_colname:
+
+        # nothing but the dates survived the filters: checked on the schema,
+        # so that the query only runs once, below
+        if not filtered_cols:
             return df.toPandas()
 
         # Aggregate the numeric columns
@@ -895,6 +1192,7 @@ class Databricks_Repository:
             )
         return aggregated_df.toPandas()
 
+    @cached_query(tables=("isight.metrics",), ttl=TTL_METRICS_SECONDS)
     def get_daily_values_for_weather_station(
         self, weather_station, start_date, end_date
     ):
@@ -926,18 +1224,14 @@ class Databricks_Repository:
         # filter by date - convert to date so filtering works as expected
         start_date = start_date.date()
         end_date = end_date.date()
-        df = df.filter((df.date >= start_date) & (df.date <= end_date))
+        df = df.filter((col("date") >= start_date) & (col("date") <= end_date))
 
         # Sort the DataFrame by the date column
         df = df.orderBy(col("Date").asc())
 
         # filter the weather stations we care about
-        filtered_cols = df.columns
-        filtered_cols = [
-            col_name
-            for col_name in filtered_cols
-            if col_name.startswith(weather_station)
-        ]
+        column_catalog = self.get_column_catalog("isight.metrics", catalog_name)
+        filtered_cols = column_catalog.select(base=weather_station)
         df = df.select("date", *filtered_cols)
         df = df.toPandas()
         df['date'] = pd.to_datetime(df['date'])
@@ -994,6 +1288,7 @@ class Databricks_Repository:
         df_tmy_ghi = df_tmy_ghi.withColumnRenamed("value", f"Summed {attribute}")
         return df_tmy_ghi
 
+    @cached_query(tables=("isight.historical_weather_station",), ttl=TTL_LOOKUP_SECONDS)
     def get_historical_weather_station_year_range(self):
         """Get the min and max year in the historical weather station table.
         
@@ -1034,6 +1329,10 @@ class Databricks_Repository:
         output = [int(y) for y in output]
         return output
 
+    @cached_query(
+        tables=("isight.historical_weather_station",),
+        ttl=TTL_METRICS_SECONDS,
+    )
     def get_historical_weather_station_table(self, year, period, selection):
         """Get the historical weather station values.
 
@@ -1257,6 +1556,42 @@ class Databricks_Repository:
                         the actual and expected budget calcs.
                         Note that deviation actually.
         """
+        if kpi not in BUDGET_DEVIATION_KPIS:
+            raise Exception("Invalid value. The `kpi` param must be either 'energy' or 'revenue'.")
+        all_deviations_df = self.get_all_budget_deviations(
+            start_date=start_date,
+            end_date=end_date,
+        )
+        return self.select_budget_deviation(
+            all_deviations_df=all_deviations_df,
+            measurement=measurement,
+            kpi=kpi,
+        )
+
+    @cached_query(tables=("isight.budget_deviation",), ttl=TTL_METRICS_SECONDS)
+    def get_all_budget_deviations(self, start_date, end_date):
+        """Get the Budget Deviations of all weather stations, in one pass.
+
+        The tornado charts of the three measurements all need both the
+        energy and the revenue deviations. Rather than scanning the table
+        once per measurement and per kpi, every combination is aggregated
+        by the same query. Use `select_budget_deviation` to get the slice
+        of a single tornado.
+
+        Args:
+            start_date (datetime.datetime): The start date from
+                which the data is filtered.
+            end_date (datetime.datetime): The end date to which
+                the data is filtered.
+
+        Returns:
+            (pandas.DataFrame): A DataFrame with the following columns:
+                index (str): The pruned metric attributes for a specific
+                    weather station sensor, eg. "ADB-002-WS1".
+                type (str): One of "GHI, "POA" or "BOM".
+                energy (float): The deviation of the budgeted energy.
+                revenue (float): The deviation of the budgeted revenue.
+        """
         catalog_name = "solar"
         catalog_path = self._get_catalog_path(catalog_name)
         spark = self.get_session(catalog_name)
@@ -1268,24 +1603,27 @@ class Databricks_Repository:
 
         fmt_start_date = start_date.strftime("%Y-%m-%d")
         fmt_end_date = end_date.strftime("%Y-%m-%d")
-        result_df = df.filter(
-            (col("type") == measurement)
-            & (col("date").between(fmt_start_date, fmt_end_date))
-        )
-
-        # aggregate the appropriate deviation column
-        if kpi == "energy":
-            deviation_column = "budget_deviation"
-        elif kpi == "revenue":
-            deviation_column = "lost_revenue"
-        else:
-            raise Exception("Invalid value. The `kpi` param must be either 'energy' or 'revenue'.")
-        if measurement in ["GHI"]:
-            deviation_column = "".join(["pama_", deviation_column])
+        result_df = df.filter(col("date").between(fmt_start_date, fmt_end_date))
+
+        # GHI deviations are read from the "pama_" flavour of each column
+        deviation_columns = {
+            "energy": "budget_deviation",
+            "revenue": "lost_revenue",
+        }
+        aggr_rules = []
+        for kpi, deviation_column in deviation_columns.items():
+            pama_deviation_column = "".join(["pama_", deviation_column])
+            aggr_rules.append(
+                pyspark_round(
+                    pyspark_sum(
+                        F.when(col("type") == "GHI", col(pama_deviation_column))
+                        .otherwise(col(deviation_column))
+                    ),
+                    TOOLTIP_LOST_ENERGY_DECIMAL_ROUNDING,
+                ).alias(kpi)
+            )
         result_df = result_df.groupBy("plant", "type", "pcs", "weather_station").agg(
-            pyspark_round(
-                pyspark_sum(deviation_column), TOOLTIP_LOST_ENERGY_DECIMAL_ROUNDING
-            ).alias("deviation")
+            *aggr_rules
         )
 
         result_df = result_df.withColumn(
@@ -1303,11 +1641,135 @@ class Databricks_Repository:
             concat_ws("-", col("plant"), col("pcs_code"), col("weather_station")),
         )
         result_df = result_df.orderBy("plant", "weather_station")
-        result_df = result_df.select(["index", "deviation"])
+        result_df = result_df.select(["index", "type", *deviation_columns])
+        return result_df.toPandas()
+
+    @staticmethod
+    def select_budget_deviation(all_deviations_df, measurement, kpi):
+        """Slice the output of `get_all_budget_deviations` for one tornado.
+
+        Args:
+            all_deviations_df (pd.DataFrame): See `get_all_budget_deviations`.
+            measurement (str): One of "GHI, "POA" or "BOM".
+            kpi (str): Either "energy" or "revenue".
+
+        Returns:
+            (pandas.DataFrame): See `get_budget_deviation`.
+        """
+        if kpi not in BUDGET_DEVIATION_KPIS:
+            raise Exception("Invalid value. The `kpi` param must be either 'energy' or 'revenue'.")
+        result_df = all_deviations_df.loc[
+            all_deviations_df["type"] == measurement, ["index", kpi]
+        ]
+        result_df = result_df.rename(columns={kpi: "deviation"})
+        return result_df.set_index("index")
 
-        result_df_pandas = result_df.toPandas()
-        result_df_pandas.set_index("index", inplace=True)
-        return result_df_pandas
+    def get_tornado_data(
+        self,
+        start_date,
+        end_date,
+        plant=None,
+        only_clear_sky_days=None,
+        day_night_filter=None,
+    ):
+        """Fetch the data behind the tornado charts of every measurement.
+
+        The GHI, POA and BOM tornados of the Weather Station page all read
+        the same tables over the same dates. Each table is read once here
+        for all the measurements, and each tornado then takes its own
+        slice with `select_tornado_data`. Since the queries below are
+        cached and coalesced, the three callbacks that fire on a date
+        change share a single round trip per table.
+
+        Args:
+            start_date (datetime.datetime): The start date from
+                which the data is filtered.
+            end_date (datetime.datetime): The end date to which
+                the data is filtered.
+            plant (list, optional): See `get_metrics_data`.
+            only_clear_sky_days (bool): See `get_metrics_data`.
+            day_night_filter (str, optional): See `get_metrics_data`.
+
+        Returns:
+            (dict): The following DataFrames, by name:
+                metrics: See `get_metrics_data`, aggregated, across all
+                    measurements.
+                recovery: See `get_recovery_data`, averaged, across all
+                    measurements.
+                budget_deviation: See `get_all_budget_deviations`.
+                clear_sky_ratios: See `get_all_clear_sky_ratios`.
+        """
+        if only_clear_sky_days is None:
+            only_clear_sky_days = False
+        metrics_df = self.get_metrics_data(
+            start_date=start_date,
+            end_date=end_date,
+            plant=plant,
+            should_aggregate=True,
+            only_clear_sky_days=only_clear_sky_days,
+            day_night_filter=day_night_filter,
+        )
+        recovery_df = self.get_recovery_data(
+            start_date=start_date,
+            end_date=end_date,
+            plant=plant,
+            aggr_func="avg",
+            day_night_filter=day_night_filter,
+        )
+        budget_deviation_df = self.get_all_budget_deviations(
+            start_date=start_date,
+            end_date=end_date,
+        )
+        clear_sky_ratios_df = self.get_all_clear_sky_ratios(
+            start_date=start_date,
+            end_date=end_date,
+        )
+        return {
+            "metrics": metrics_df,
+            "recovery": recovery_df,
+            "budget_deviation": budget_deviation_df,
+            "clear_sky_ratios": clear_sky_ratios_df,
+        }
+
+    @staticmethod
+    def select_tornado_data(tornado_data, measurement):
+        """Slice the output of `get_tornado_data` for one tornado.
+
+        Args:
+            tornado_data (dict): See `get_tornado_data`.
+            measurement (str): One of "GHI, "POA" or "BOM".
+
+        Returns:
+            (dict): The following DataFrames, by name:
+                metrics: The metrics columns of `measurement`.
+                recovery: The recoveries of all measurements, since the
+                    tornados match them by weather station.
+                budget_deviation: See `get_budget_deviation`, with
+                    kpi="energy".
+                lost_revenue: See `get_budget_deviation`, with
+                    kpi="revenue".
+                clear_sky_ratios: See `get_all_clear_sky_ratios`.
+        """
+        metrics_df = tornado_data["metrics"]
+        metrics_columns = [
+            col_name for col_name in metrics_df.columns if measurement in col_name
+        ]
+        budget_deviation_df = tornado_data["budget_deviation"]
+        return {
+            "metrics": metrics_df[metrics_columns],
+            "recovery": tornado_data["recovery"],
+            "budget_deviation": Databricks_Repository.select_budget_deviation(
+                all_deviations_df=budget_deviation_df,
+                measurement=measurement,
+                kpi="energy",
+            ),
+            "lost_revenue": Databricks_Repository.select_budget_deviation(
+                all_deviations_df=budget_deviation_df,
+                measurement=measurement,
+                kpi="revenue",
+            ),
+            "clear_sky_ratios": tornado_data["clear_sky_ratios"],
+        }
 
     def get_clear_sky(self, start_date, end_date, as_pyspark=None):
         """Get the Clear Sky table across all plants.
@@ -1354,6 +1816,10 @@ class Databricks_Repository:
             return df
         return df.toPandas()
 
+    @cached_query(
+        tables=("isight.clear_sky_days", "isight.metrics"),
+        ttl=TTL_METRICS_SECONDS,
+    )
     def get_all_clear_sky_ratios(self, start_date, end_date, as_pyspark=None):
         """Returns the proportions of clear sky days for the desired dates.
 
@@ -1415,6 +1881,10 @@ class Databricks_Repository:
         result_df = result_df.orderBy(col("plant").asc())
         return result_df.toPandas()
 
+    @cached_query(
+        tables=("isight.weather_station_time_series",),
+        ttl=TTL_TIME_SERIES_SECONDS,
+    )
     def get_weather_station_time_series(
         self,
         plant,
@@ -1462,6 +1932,7 @@ class Databricks_Repository:
 
         return dff.toPandas()
 
+    @cached_query(tables=("isight.self_perform",), ttl=TTL_LOOKUP_SECONDS)
     def get_self_perform_plants(self):
         """Get the plants that are self-performing.
 
@@ -1486,6 +1957,7 @@ class Databricks_Repository:
         plants_arr = [row["Plant"] for row in df.collect()]
         return plants_arr
 
+    @cached_query(tables=("isight.inverter_metrics",), ttl=TTL_METRICS_SECONDS)
     def get_inverter_metrics(
         self,
         start_date,
@@ -1757,6 +2229,7 @@ class Databricks_Repository:
         ).withColumnRenamed("attribute_value", "InverterActivePowerNormalizedAverage")
         return df_ap_norm if as_pyspark else df_ap_norm.toPandas()
 
+    @cached_query(tables=("isight.clean_data",), ttl=TTL_TIME_SERIES_SECONDS)
     def get_inverter_performance_power_online_filter(
         self,
         inverter,
@@ -1784,49 +2257,49 @@ class Databricks_Repository:
                 corresponds to the plant of the inverter, and the Plant's
                 Active Power Normalized as well.
         """
-        df_ap = self.get_inverter_active_power(inverter, start_date, end_date, as_pyspark=True)
-        df_poa = self.get_plant_irradiance_poa_average(plant, start_date, end_date, as_pyspark=True)
-        df_ap_denom = self.get_inverter_active_power_denormalized(inverter, start_date, end_date, as_pyspark=True)
-        df_ap_exp = self.get_inverter_active_power_expected(inverter, start_date, end_date, as_pyspark=True)
-        df_plant_ap = self.get_plant_active_power_normalized(plant, start_date, end_date, as_pyspark=True)
+        catalog_name = "solar"
+        catalog_path = self._get_catalog_path(catalog_name)
+        spark = self.get_session(catalog_name)
+        df = spark.table(f"{catalog_path}.isight.clean_data")
 
-        
-        df_ap = df_ap.filter("ActivePower > -1000")
-        df_ap_denom = df_ap_denom.filter("ActivePowerNormalized > -1000")
-        df_combined = df_poa.join(
-            df_ap_denom,
-            on="start_time_utc",
-            how="inner"
-        ).join(
-            df_ap_exp,
-            on="start_time_utc",
-            how="inner",
-        ).join(
-            df_ap,
-            on="start_time_utc",
-            how="inner",
-        ).join(
-            df_plant_ap,
-            on="start_time_utc",
-            how="inner",
-        )
-
-        # drop the points that didn't pass our cleaning stage
-        df = df_combined.toPandas()
+        end_date = end_date + timedelta(days=1) - timedelta(minutes=10)
+        df = df.filter( (df.start_time_utc >= start_date) & (df.start_time_utc <= end_date) )
+
+        # Read the five series in a single scan of the table. The Irradiance
+        # comes from the plant's "Weather Stations" element, whatever its
+        # attribute name, so it is labelled explicitly before the join.
+        inverter_attributes = ["ActivePower+Value", "ActivePowerNormalized", "ActivePowerExpected"]
+        is_plant_poa = (df["element_name"] == "Weather Stations") & (df["plant_abbrev"] == plant)
+        df = df.filter(
+            ((df["element_name"] == inverter) & df["attribute_name"].isin(inverter_attributes))
+            | (
+                (df["attribute_name"] == "InverterActivePowerNormalizedAverage")
+                & (df["plant_abbrev"] == plant)
+            )
+            | is_plant_poa
+        )
+        df = df.withColumn(
+            "series_name",
+            F.when(is_plant_poa, lit("IrradiancePOAAverage")).otherwise(col("attribute_name")),
+        )
+
+        df_series = df.select("start_time_utc", "series_name", "attribute_value").toPandas()
+
+        # Join the series on their timestamps, like the five inner joins
+        # of separate scans did
+        df = join_inverter_performance_series(df_series, plant)
         df.replace([-9999, 9999], np.nan, inplace=True)
 
         # Make sure that we only keep rows that have at least one valid measurement
-        measurement_columns = [
-            "IrradiancePOAAverage",
-            "ActivePowerNormalized",
-            "ActivePowerExpected",
-            "ActivePower",
-            "InverterActivePowerNormalizedAverage",
-        ]
+        measurement_columns = list(INVERTER_PERFORMANCE_SERIES.values())
         df = self._filter_valid_measurements(df, measurement_columns)
 
         return df
     
+    @cached_query(
+        tables=("isight.inverter_time_series_data",),
+        ttl=TTL_TIME_SERIES_SECONDS,
+    )
     def get_inverter_performance_power_no_online_filter(
         self,
         inverter,
@@ -1919,6 +2392,14 @@ class Databricks_Repository:
 
         return df_pandas
 
+    @cached_query(
+        tables=(
+            "isight.wind_reliability_metrics",
+            "isight.wind_performance_metrics",
+        ),
+        ttl=TTL_LOOKUP_SECONDS,
+        catalog_name="wind",
+    )
     def get_wind_date_range(self) -> [datetime.date, datetime.date]:
         """Returns a date range to set bounds in the Wind app's calendar picker."""
         catalog_name = "wind"
@@ -1932,6 +2413,11 @@ class Databricks_Repository:
             catalog_name=catalog_name,
         )
 
+    @cached_query(
+        tables=("isight.parameters",),
+        ttl=TTL_LOOKUP_SECONDS,
+        catalog_name="wind",
+    )
     def get_wind_plants(self, is_sorted=None):
         """Get a Complete list of Wind Plant Name Abbreviations.
 
@@ -1955,6 +2441,11 @@ class Databricks_Repository:
 
         return plant_names
 
+    @cached_query(
+        tables=("isight.parameters",),
+        ttl=TTL_LOOKUP_SECONDS,
+        catalog_name="wind",
+    )
     def get_wind_unique_turbine_isight_attributes(self):
         """Get a list of all possible Wind iSight Attributes."""
         catalog_name = "wind"
@@ -1974,6 +2465,11 @@ class Databricks_Repository:
         isight_attribute_array = sorted(isight_attribute_array)
         return isight_attribute_array
 
+    @cached_query(
+        tables=("isight.wind_reliability_metrics",),
+        ttl=TTL_METRICS_SECONDS,
+        catalog_name="wind",
+    )
     def get_wind_component_temperature_data(
         self,
         start_date,
@@ -2058,6 +2554,11 @@ class Databricks_Repository:
 
         return df_final.toPandas()
 
+    @cached_query(
+        tables=("isight.wind_reliability_metrics",),
+        ttl=TTL_METRICS_SECONDS,
+        catalog_name="wind",
+    )
     def get_wind_component_temperature_data_by_component(
         self,
         start_date,
@@ -2130,6 +2631,11 @@ class Databricks_Repository:
         
         return df_combined
 
+    @cached_query(
+        tables=("isight.wind_reliability_metrics",),
+        ttl=TTL_METRICS_SECONDS,
+        catalog_name="wind",
+    )
     def get_wind_component_temperature_data_by_turbine(
         self,
         start_date,
@@ -2197,6 +2703,11 @@ class Databricks_Repository:
 
         return df_combined
 
+    @cached_query(
+        tables=("isight.wind_performance_metrics",),
+        ttl=TTL_METRICS_SECONDS,
+        catalog_name="wind",
+    )
     def get_wind_power_perforamnce_treemap_data(
         self,
         start_date,
@@ -2301,6 +2812,11 @@ class Databricks_Repository:
             df_pandas.sort_values(by=filter_col, ascending=ascending).head(25)
         return df_pandas
 
+    @cached_query(
+        tables=("isight.wind_performance_metrics",),
+        ttl=TTL_LOOKUP_SECONDS,
+        catalog_name="wind",
+    )
     def get_wind_all_unique_turbines(self):
         """Return all available Wind Turbine names.
 
@@ -2321,6 +2837,11 @@ class Databricks_Repository:
                     .collect()]
         return values
 
+    @cached_query(
+        tables=("isight.wind_power_curves",),
+        ttl=TTL_METRICS_SECONDS,
+        catalog_name="wind",
+    )
     def get_wind_power_curves_data(
         self,
         start_date,
@@ -2359,6 +2880,11 @@ class Databricks_Repository:
         )
         return df.toPandas()
 
+    @cached_query(
+        tables=("isight.wind_daily_yaw_error", "isight.wind_performance_metrics"),
+        ttl=TTL_METRICS_SECONDS,
+        catalog_name="wind",
+    )
     def gen_wind_yaw_error_data_by_turbine(self, start_date, end_date):
         """Fetch the Yaw Error and Efficiency data.
         
@@ -2388,17 +2914,11 @@ class Databricks_Repository:
         
         df = df.filter((df.date >= start_date) & (df.date <= end_date))
         
-        pivoted_df = df.groupBy("date") \
-            .pivot("element_name") \
-            .agg(F.first("yaw_error"))
-        
-        pivoted_df = pivoted_df.orderBy("date")
-        
-        pandas_df = pivoted_df.toPandas()
-        pandas_df.set_index('date', inplace=True)
-
-        mean_by_turbine = pandas_df.mean(skipna=True)
-        mean_by_turbine = mean_by_turbine.to_frame()
+        # one value per day and turbine, then the mean across the days
+        yaw_error_df = df.groupBy("date", "element_name") \
+            .agg(F.first("yaw_error").alias("yaw_error"))
+        yaw_error_df = yaw_error_df.groupBy("element_name") \
+            .agg(pyspark_avg("yaw_error").alias("aggr_yaw_error"))
 
         # pull in the efficiency
         df = spark.table(f"{catalog_path}.isight.wind_performance_metrics")
@@ -2408,26 +2928,25 @@ class Databricks_Repository:
             col("mean_efficiency"),
         )
         df = df.filter((df.date >= start_date) & (df.date <= end_date))
-        pivoted_df = df.groupBy("date") \
-            .pivot("element_name") \
-            .agg(pyspark_avg("mean_efficiency"))
-        pivoted_df = pivoted_df.orderBy("date")
-
-        df_pandas_eff = pivoted_df.toPandas()
-        df_pandas_eff.set_index('date', inplace=True)
-        df_pandas_eff_by_turbine = df_pandas_eff.mean()
-
-        df_pandas_eff_by_turbine = df_pandas_eff_by_turbine.to_frame()
-        
-        # Rename the columns
-        mean_by_turbine = mean_by_turbine.rename(columns={0: "aggr_yaw_error"})
-        df_pandas_eff_by_turbine = df_pandas_eff_by_turbine.rename(columns={0: "aggr_efficiency"})
-
-        # Join the dataframes on their index
-        df_result = mean_by_turbine.join(df_pandas_eff_by_turbine, how="outer")
+        efficiency_df = df.groupBy("date", "element_name") \
+            .agg(pyspark_avg("mean_efficiency").alias("mean_efficiency"))
+        efficiency_df = efficiency_df.groupBy("element_name") \
+            .agg(pyspark_avg("mean_efficiency").alias("aggr_efficiency"))
+
+        # Join both per-turbine aggregates, so they come back in one query
+        df_result = yaw_error_df.join(efficiency_df, on="element_name", how="outer")
+        df_result = df_result.toPandas()
+        df_result = df_result.set_index("element_name").sort_index()
+        df_result.index.name = None
+        df_result = df_result[["aggr_yaw_error", "aggr_efficiency"]]
         df_result = df_result.fillna(0)
         return df_result
 
+    @cached_query(
+        tables=("isight.wind_daily_turbine_fault",),
+        ttl=TTL_LOOKUP_SECONDS,
+        catalog_name="wind",
+    )
     def get_wind_turbine_fault_codes(self):
         """Get all unique turbine fault code pairs.
 
@@ -2448,6 +2967,11 @@ class Databricks_Repository:
                             .collect()]
         return turbine_fault_codes
 
+    @cached_query(
+        tables=("isight.wind_daily_turbine_fault",),
+        ttl=TTL_METRICS_SECONDS,
+        catalog_name="wind",
+    )
     def get_wind_fault_code_data(
         self,
         start_date,
@@ -2508,6 +3032,11 @@ class Databricks_Repository:
         df_pandas = df.toPandas()
         return df_pandas
 
+    @cached_query(
+        tables=("isight.fault_description_mapping",),
+        ttl=TTL_LOOKUP_SECONDS,
+        catalog_name="wind",
+    )
     def get_wind_fault_code_description_options(self):
         """Get Fault Code Descriptions options used for Acknowledge Dropdowns.
         
@@ -2531,6 +3060,11 @@ class Databricks_Repository:
                             .collect()]
         return options
 
+    @cached_query(
+        tables=("isight.wind_downtime_lost_energy",),
+        ttl=TTL_METRICS_SECONDS,
+        catalog_name="wind",
+    )
     def get_wind_fault_downtime_lost_energy(
         self,
         start_date,
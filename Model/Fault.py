@@ -3,7 +3,138 @@ import pandas as pd
 import gc
 
 from Model.Constants.Trip import NON_TRIP_CODES
-from Utils.Transformers import MWh_csv_to_dict, fill_missing_vals_from_ref_column
+from Utils.ParquetFiles import read_compressed, read_time_series
+from Utils.RevenueGrid import load_revenue_grid
+from Utils.Transformers import fill_missing_vals_from_ref_column
+
+
+def find_overlaps(starts, ends, query_starts, query_ends):
+    """Find the intervals that each query interval overlaps.
+
+    An interval overlaps a query when it starts before the query ends and
+    ends after the query starts. When the starts and the ends of the
+    intervals are both sorted, as they are for merged contiguous intervals,
+    the intervals a query overlaps are a run found by two binary searches,
+    so n queries against m intervals cost O((n + m) log m) instead of
+    O(n x m). Other intervals are compared pair by pair.
+
+    Args:
+        starts (numpy.ndarray): The starts of the intervals (datetime64).
+        ends (numpy.ndarray): The ends of the intervals (datetime64).
+        query_starts (numpy.ndarray): The starts of the query intervals.
+        query_ends (numpy.ndarray): The ends of the query intervals.
+
+    Returns:
+        (tuple): The query index and the interval index of each overlap,
+            ordered by query and then by interval.
+    """
+    if (starts[1:] >= starts[:-1]).all() and (ends[1:] >= ends[:-1]).all():
+        first = np.searchsorted(ends, query_starts, side="right")
+        last = np.searchsorted(starts, query_ends, side="left")
+        counts = np.maximum(last - first, 0)
+        # NaT sorts last, but never overlaps anything
+        counts[np.isnat(query_starts) | np.isnat(query_ends)] = 0
+        query_index = np.repeat(np.arange(len(query_starts)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return query_index, np.repeat(first, counts) + offsets
+
+    overlaps = (starts[np.newaxis, :] < query_ends[:, np.newaxis]) & (
+        ends[np.newaxis, :] > query_starts[:, np.newaxis]
+    )
+    return np.nonzero(overlaps)
+
+
+def segment_faults(df_fault, valid_starts, valid_ends):
+    """Split the faults of a turbine on the intervals where it should produce.
+
+    Each fault is cut into one segment per valid interval (active power <= 0
+    while the expected power is > 0) that it overlaps. The downtime of a
+    segment is then extended to the end of its valid interval, the "tail"
+    when the turbine did not restart after the fault, unless the next
+    segment starts within that interval.
+
+    Args:
+        df_fault (pd.DataFrame): The faults of one turbine, sorted by
+            StartDateTime, with the columns StartDateTime, EndDateTime,
+            FaultCode, Turbine, OriginalStartDateTime and
+            OriginalEndDateTime.
+        valid_starts (numpy.ndarray): The starts of the merged valid
+            intervals (datetime64[ns]), sorted.
+        valid_ends (numpy.ndarray): The ends of the merged valid intervals.
+
+    Returns:
+        pd.DataFrame: One row per segment, with the columns FaultCode,
+            Turbine, StartDateTime, EndDateTime, PreAdjustedDuration,
+            OriginalStartDateTime, OriginalEndDateTime, NextStartDateTime,
+            AdjustedDuration, AdjustedStartDateTime and AdjustedEndDateTime.
+            The adjusted columns are NaT (or 0) for segments without
+            downtime, see `fill_missing_vals_from_ref_column`.
+    """
+    fault_starts = df_fault["StartDateTime"].to_numpy(dtype="datetime64[ns]")
+    fault_ends = df_fault["EndDateTime"].to_numpy(dtype="datetime64[ns]")
+    fault_index, valid_index = find_overlaps(
+        valid_starts, valid_ends, fault_starts, fault_ends
+    )
+    segment_starts = np.maximum(valid_starts[valid_index], fault_starts[fault_index])
+    segment_ends = np.minimum(valid_ends[valid_index], fault_ends[fault_index])
+
+    segmented_df = pd.DataFrame(
+        {
+            "FaultCode": np.asarray(df_fault["FaultCode"])[fault_index],
+            "Turbine": df_fault["Turbine"].to_numpy()[fault_index],
+            "StartDateTime": segment_starts,
+            "EndDateTime": segment_ends,
+            "PreAdjustedDuration": (
+                (fault_ends - fault_starts) / np.timedelta64(1, "s")
+            )[fault_index],
+            "OriginalStartDateTime": df_fault["OriginalStartDateTime"].to_numpy(
+                dtype="datetime64[ns]"
+            )[fault_index],
+            "OriginalEndDateTime": df_fault["OriginalEndDateTime"].to_numpy(
+                dtype="datetime64[ns]"
+            )[fault_index],
+        }
+    )
+    segmented_df["NextStartDateTime"] = segmented_df["StartDateTime"].shift(-1)
+    next_starts = segmented_df["NextStartDateTime"].to_numpy(dtype="datetime64[ns]")
+
+    # only the valid intervals a segment overlaps can add to its downtime
+    row_index, valid_index = find_overlaps(
+        valid_starts, valid_ends, segment_starts, segment_ends
+    )
+    overlap_starts = np.maximum(segment_starts[row_index], valid_starts[valid_index])
+    overlap_ends = np.minimum(segment_ends[row_index], valid_ends[valid_index])
+
+    # attribute tail loss to originating fault
+    tails = (next_starts[row_index] > valid_ends[valid_index]) & (
+        valid_starts[valid_index] < overlap_ends
+    )
+    overlap_ends = np.where(tails, valid_ends[valid_index], overlap_ends)
+    overlap_durations = (
+        (overlap_ends - overlap_starts).astype("timedelta64[s]").astype(int)
+    )
+    positive_overlaps = overlap_durations > 0
+    row_index = row_index[positive_overlaps]
+
+    # the adjusted times are those of the last interval with downtime
+    last = np.diff(row_index, append=-1) != 0
+    adjusted_starts = np.full(
+        segmented_df.shape[0], np.datetime64("NaT"), dtype="datetime64[ns]"
+    )
+    adjusted_ends = np.full(
+        segmented_df.shape[0], np.datetime64("NaT"), dtype="datetime64[ns]"
+    )
+    adjusted_starts[row_index[last]] = overlap_starts[positive_overlaps][last]
+    adjusted_ends[row_index[last]] = overlap_ends[positive_overlaps][last]
+
+    segmented_df["AdjustedDuration"] = np.bincount(
+        row_index,
+        weights=overlap_durations[positive_overlaps],
+        minlength=segmented_df.shape[0],
+    )
+    segmented_df["AdjustedStartDateTime"] = adjusted_starts
+    segmented_df["AdjustedEndDateTime"] = adjusted_ends
+    return segmented_df
 
 
 class FaultAnalysis:
@@ -50,6 +181,8 @@ class FaultAnalysis:
             cmp_data_path (str, optional): Path to the CSV file containing compressed fault data. Defaults to None.
             avg_data (pd.DataFrame, optional): The 10 min averaged data. Defaults to None.
             avg_data_path (str, optional): Path to the CSV file containing 10 min averaged data. Defaults to None.
+            revenue_per_mwh_path (str, optional): Path to the revenue per MWh CSV file. Defaults to the
+                default prices file. Each file is loaded once per process, see `load_revenue_grid`.
             downtime_lost_energy_df (pandas.DataFrame, optional): a data frame of previously processed data. Introduced
                 to allow reprocessing of daily metrics without having to reprocess the full downtime lost energy metrics.
 
@@ -73,13 +206,8 @@ class FaultAnalysis:
             self.avg_data = (
                 avg_data if avg_data is not None else self.load_avg_data(avg_data_path)
             )
-        if revenue_per_mwh_path is None:
-            self._revenue_grid = MWh_csv_to_dict(
-                file_path="../assets/data/RevenuePerMwh.csv"
-            )
-
-        else:
-            self._revenue_grid = MWh_csv_to_dict(file_path=revenue_per_mwh_path)
+        # the prices file is loaded once per process, and shared with the wind farms
+        self._revenue_grid = load_revenue_grid(revenue_per_mwh_path)
 
     @property
     def reshaped_data(self):
@@ -94,27 +222,27 @@ class FaultAnalysis:
 
     def load_data(self, data_path):
         """
-        Loads compressed fault data from the specified CSV path.
+        Loads compressed fault data from the specified CSV or Parquet path.
 
         Args:
-            data_path (str): Path to the CSV file containing compressed fault data.
+            data_path (str): Path to the CSV or Parquet file containing compressed fault data.
 
         Returns:
             pd.DataFrame: DataFrame containing the loaded fault data.
         """
-        return pd.read_csv(data_path, low_memory=False)
+        return read_compressed(data_path)
 
     def load_avg_data(self, avg_data_path):
         """
-        Loads averaged data from the specified CSV path.
+        Loads averaged data from the specified CSV or Parquet path.
 
         Args:
-            avg_data_path (str): Path to the CSV file containing 10 min averaged data.
+            avg_data_path (str): Path to the CSV or Parquet file containing 10 min averaged data.
 
         Returns:
             pd.DataFrame: DataFrame containing the loaded averaged data with the index set to datetime.
         """
-        return pd.read_csv(avg_data_path, parse_dates=[0], index_col=[0])
+        return read_time_series(avg_data_path)
 
     def find_10min_start(self, timestamp):
         """
@@ -256,118 +384,13 @@ class FaultAnalysis:
                 merged_intervals["last"] == merged_intervals["first"], "last"
             ] = merged_intervals["first"] + pd.Timedelta(minutes=10)
 
-            # Convert the result to a list of tuples start_time, end_time of
-            # each contigous block of ten min valid power intervals
-            merged_valid_intervals = list(
-                zip(merged_intervals["first"], merged_intervals["last"])
+            print("      ", turbine)
+            segmented_df = segment_faults(
+                df_fault,
+                merged_intervals["first"].to_numpy(dtype="datetime64[ns]"),
+                merged_intervals["last"].to_numpy(dtype="datetime64[ns]"),
             )
 
-            all_rows = []
-            iter_turbine = None
-
-            for _, row in df_fault.iterrows():
-                turbine = row["Turbine"]
-
-                if pd.isna(turbine):
-                    continue
-
-                if turbine != iter_turbine:
-                    print("      ", turbine)
-                    iter_turbine = turbine
-
-                fault_start = row["StartDateTime"]
-                fault_end = row["EndDateTime"]
-
-                overlapping_intervals = [
-                    (valid_start, valid_end)
-                    for valid_start, valid_end in merged_valid_intervals
-                    if valid_start < fault_end and valid_end > fault_start
-                ]
-
-                for start, end in overlapping_intervals:
-                    row_tuple = (
-                        row["FaultCode"],
-                        turbine,
-                        max(start, fault_start),
-                        min(end, fault_end),
-                        (fault_end - fault_start).total_seconds(),
-                        row["OriginalStartDateTime"],
-                        row["OriginalEndDateTime"],
-                    )
-                    all_rows.append(row_tuple)
-
-            columns = [
-                "FaultCode",
-                "Turbine",
-                "StartDateTime",
-                "EndDateTime",
-                "PreAdjustedDuration",
-                "OriginalStartDateTime",
-                "OriginalEndDateTime",
-            ]
-
-            # Concatenate all the segmented dataframes to get the final segmented_df
-            segmented_df = pd.DataFrame(all_rows, columns=columns)
-
-            # Preallocate an array of zeros with the same length as df.
-            overlap_durations = np.zeros(len(segmented_df))
-            # Initialize arrays for adjusted start and end times with 'NaT'
-            adjusted_starts = np.full(
-                segmented_df.shape[0], np.datetime64("NaT"), dtype="datetime64[ns]"
-            )
-            adjusted_ends = np.full(
-                segmented_df.shape[0], np.datetime64("NaT"), dtype="datetime64[ns]"
-            )
-
-            positive_overlaps_list = []
-
-            # attribute tail loss to originating fault
-            for idx, (valid_interval_start, valid_interval_end) in enumerate(
-                merged_valid_intervals
-            ):
-                overlap_start = np.maximum(
-                    segmented_df["StartDateTime"].values,
-                    np.datetime64(valid_interval_start),
-                )
-                overlap_end = np.minimum(
-                    segmented_df["EndDateTime"].values,
-                    np.datetime64(valid_interval_end),
-                )
-
-                # Compute the next start times for each row in df
-                segmented_df["NextStartDateTime"] = segmented_df["StartDateTime"].shift(
-                    -1
-                )
-
-                # Adjust overlap_end where the next start time is after the current
-                # valid_interval_end and
-                condition = (segmented_df["NextStartDateTime"] > valid_interval_end) & (
-                    valid_interval_start < overlap_end
-                )
-                overlap_end = np.where(
-                    condition, np.datetime64(valid_interval_end), overlap_end
-                )
-
-                # calculate the downtime duration
-                current_overlap_durations = (
-                    (overlap_end - overlap_start).astype("timedelta64[s]").astype(int)
-                )
-
-                # Ensure we only count positive overlaps (negative values indicate no overlap)
-                positive_overlaps = current_overlap_durations > 0
-                current_overlap_durations[~positive_overlaps] = 0
-                positive_overlaps_list.extend(positive_overlaps)
-
-                # Directly assign values to the adjusted_starts and adjusted_ends arrays
-                adjusted_starts[positive_overlaps] = overlap_start[positive_overlaps]
-                adjusted_ends[positive_overlaps] = overlap_end[positive_overlaps]
-
-                overlap_durations += current_overlap_durations
-
-            segmented_df["AdjustedDuration"] = overlap_durations
-            segmented_df["AdjustedStartDateTime"] = adjusted_starts
-            segmented_df["AdjustedEndDateTime"] = adjusted_ends
-
             # Makes sure all have a date
             segmented_df = fill_missing_vals_from_ref_column(
                 segmented_df, "AdjustedStartDateTime", "StartDateTime"
@@ -382,6 +405,11 @@ class FaultAnalysis:
             if not segmented_df.empty:
                 df_array.append(segmented_df)
 
+            del df_fault, df_intervals, merged_intervals
+            gc.collect()
+
+        # the lost energy is computed once, for the faults of every turbine
+        if df_array:
             downtime_df = pd.concat(df_array, axis=0, ignore_index=True)
 
             downtime_lost_energy_revenue = self.calculate_lost_energy(
@@ -389,24 +417,15 @@ class FaultAnalysis:
             )
 
             # calculate revenue
-            days = downtime_lost_energy_revenue["AdjustedStartDateTime"].dt.strftime(
-                "%Y-%m-%d"
+            revenue_per_mwh = self._revenue_grid.lookup(
+                self._project, downtime_lost_energy_revenue["AdjustedStartDateTime"]
             )
-            hours = downtime_lost_energy_revenue["AdjustedStartDateTime"].dt.hour
-
-            revenue_per_mwh = [
-                self._revenue_grid.get(self._project, {}).get(day, {}).get(hour, 0)
-                for day, hour in zip(days, hours)
-            ]
 
             downtime_lost_energy_revenue["LostRevenue"] = downtime_lost_energy_revenue[
                 "LostEnergy"
             ]
             downtime_lost_energy_revenue["LostRevenue"] *= revenue_per_mwh
 
-            del df_fault, df_intervals, merged_intervals
-            gc.collect()
-
         return downtime_lost_energy_revenue
 
     def calculate_lost_energy(self, downtime_df, power_df):
@@ -416,6 +435,7 @@ class FaultAnalysis:
         This function calculates the energy loss during downtimes by referencing the difference
         between actual power and expected power for each turbine. It accounts for downtimes that
         don't align perfectly with the 10-minute intervals in the power data by using linear interpolation.
+        The losses of all the downtimes of a turbine are computed at once, see `integrate_lost_energy`.
 
         Args:
             downtime_df (pd.DataFrame): DataFrame containing downtime information. Each row represents a downtime event.
@@ -441,45 +461,151 @@ class FaultAnalysis:
             turbine_downtime = downtime_df[downtime_df["Turbine"] == turbine].copy()
             relevant_power = power_df[[f"{turbine}-KW", f"{turbine}-EXPCTD-KW-CALC"]]
             relevant_power = relevant_power.sort_index()
-            start_times = turbine_downtime["AdjustedStartDateTime"]
-            end_times = turbine_downtime["AdjustedEndDateTime"]
 
-            start_indices = (
-                relevant_power.index.searchsorted(start_times, side="right") - 1
+            turbine_downtime["LostEnergy"] = self.integrate_lost_energy(
+                turbine_downtime["AdjustedStartDateTime"],
+                turbine_downtime["AdjustedEndDateTime"],
+                relevant_power,
+                turbine,
             )
-            end_indices = relevant_power.index.searchsorted(end_times, side="left")
+            result_df_list.append(turbine_downtime)
 
-            energy_losses = []
-            for i, (start, end) in enumerate(zip(start_indices, end_indices)):
-                start_time = start_times.iloc[i]
-                end_time = end_times.iloc[i]
+        final_result_df = pd.concat(result_df_list, ignore_index=True)
+        return final_result_df
 
-                # Compute energy loss for start and end cap
-                start_cap_loss, end_cap_loss = self.compute_end_caps_energy_loss(
-                    start_time, end_time, relevant_power, turbine
-                )
+    def integrate_lost_energy(self, start_times, end_times, relevant_power, turbine):
+        """Compute the energy lost by a turbine during each of its downtimes.
 
-                # For the full duration between start and end times
-                actual_power = (
-                    relevant_power[f"{turbine}-KW"].iloc[start + 1 : end - 1].values
-                )
-                expected_power = (
-                    relevant_power[f"{turbine}-EXPCTD-KW-CALC"]
-                    .iloc[start + 1 : end - 1]
-                    .values
-                )
-                full_loss = (
-                    np.sum(expected_power - actual_power) / 6000
-                )  # Convert to MWh
-                total_loss = start_cap_loss + full_loss + end_cap_loss
+        A downtime loses the expected minus the actual power of the ten
+        minute intervals it covers in full, plus its start and end caps (see
+        `compute_end_caps_energy_loss`). The full intervals are summed from
+        a cumulative sum of the power gap, and the caps are interpolated for
+        every downtime at once, so the cost does not grow with the number of
+        downtimes times their length.
 
-                energy_losses.append(total_loss)
+        Downtimes the arrays cannot reproduce exactly (a missing time, an
+        index before or after the power data, or a non finite power gap in
+        their full intervals) are computed one by one, the original way.
 
-            turbine_downtime["LostEnergy"] = energy_losses
-            result_df_list.append(turbine_downtime)
+        Args:
+            start_times (pd.Series): The start of each downtime.
+            end_times (pd.Series): The end of each downtime.
+            relevant_power (pd.DataFrame): The ten minute avg active and
+                expected power of the turbine, with a sorted datetime index.
+            turbine (str): The turbine identifier used to select the relevant
+                columns in the dataframe.
 
-        final_result_df = pd.concat(result_df_list, ignore_index=True)
-        return final_result_df
+        Returns:
+            (numpy.ndarray): The lost energy of each downtime, in MWh.
+        """
+        actual_power = relevant_power[f"{turbine}-KW"]
+        expected_power = relevant_power[f"{turbine}-EXPCTD-KW-CALC"]
+        power_gap = expected_power.to_numpy(dtype=float) - actual_power.to_numpy(
+            dtype=float
+        )
+        n_intervals = len(power_gap)
+
+        starts = pd.DatetimeIndex(start_times)
+        ends = pd.DatetimeIndex(end_times)
+        power_index = relevant_power.index
+        # like relevant_power.iloc[start + 1 : end - 1]
+        first_full = power_index.searchsorted(starts, side="right")
+        last_full = power_index.searchsorted(ends, side="left") - 1
+        start_positions = power_index.searchsorted(starts)
+        end_positions = power_index.searchsorted(ends) - 1
+
+        # the sum of the gap over any run of intervals is one difference
+        finite = np.isfinite(power_gap)
+        gap_sums = np.concatenate([[0.0], np.cumsum(np.where(finite, power_gap, 0))])
+        non_finite_counts = np.concatenate([[0], np.cumsum(~finite)])
+        full_end = np.maximum(last_full, first_full)
+        full_loss = (gap_sums[full_end] - gap_sums[first_full]) / 6000  # Convert to MWh
+
+        start_seconds = np.nan_to_num(
+            np.asarray((starts.minute * 60 + starts.second) % 600, dtype=float)
+        ).astype(int)
+        end_seconds = np.nan_to_num(
+            np.asarray((ends.minute * 60 + ends.second) % 600, dtype=float)
+        ).astype(int)
+        end_intervals = starts - pd.to_timedelta(start_seconds, unit="s")
+        end_intervals = end_intervals + pd.Timedelta(minutes=10)
+        same_interval = np.asarray(ends <= end_intervals)
+
+        def get_gap(positions):
+            if n_intervals == 0:
+                return np.full(len(positions), np.nan)
+            return power_gap[np.clip(positions, 0, n_intervals - 1)]
+
+        # a downtime within one ten minute interval has a single cap
+        energy_start = get_gap(np.minimum(start_positions, n_intervals - 1))
+        energy_end = get_gap(end_positions)
+        delta_seconds_end_time = np.where(
+            np.asarray(ends == end_intervals), 600, end_seconds
+        )
+        m = (energy_end - energy_start) / 600
+        start_value = energy_start + m * start_seconds
+        end_value = energy_start + m * delta_seconds_end_time
+        single_cap_loss = (
+            0.5 * (start_value + end_value) * (delta_seconds_end_time - start_seconds)
+        ) / 3600000
+
+        # the start cap, from the start time to the end of its interval
+        energy_start = get_gap(start_positions - 1)
+        energy_end = get_gap(start_positions)
+        m = (energy_end - energy_start) / 600
+        start_value = energy_start + m * start_seconds
+        end_value = energy_start + m * 600
+        start_cap_loss = np.where(
+            start_seconds == 0,
+            0,
+            (0.5 * (start_value + end_value) * (600 - start_seconds)) / 3600000,
+        )
+
+        # the end cap, from the start of its interval to the end time
+        energy_start = get_gap(end_positions)
+        energy_end = get_gap(np.minimum(end_positions + 1, n_intervals - 1))
+        m = (energy_end - energy_start) / 600
+        end_value = energy_start + m * end_seconds
+        end_cap_loss = np.where(
+            end_seconds == 0,
+            0,
+            (0.5 * (energy_start + end_value) * end_seconds) / 3600000,
+        )
+
+        lost_energy = np.where(
+            same_interval,
+            single_cap_loss + full_loss,
+            start_cap_loss + full_loss + end_cap_loss,
+        )
+
+        irregular = (
+            np.asarray(starts.isna() | ends.isna())
+            | (n_intervals == 0)
+            | (last_full < 0)
+            | (non_finite_counts[full_end] > non_finite_counts[first_full])
+            | (same_interval & (end_positions < 0))
+            | (~same_interval & (start_seconds != 0) & (start_positions - 1 < 0))
+            | (~same_interval & (start_seconds != 0) & (start_positions >= n_intervals))
+            | (~same_interval & (end_seconds != 0) & (end_positions < 0))
+        )
+        for i in np.flatnonzero(irregular):
+            start_time = start_times.iloc[i]
+            end_time = end_times.iloc[i]
+            start_cap, end_cap = self.compute_end_caps_energy_loss(
+                start_time, end_time, relevant_power, turbine
+            )
+            start = first_full[i] - 1
+            end = last_full[i] + 1
+            full = (
+                np.sum(
+                    expected_power.iloc[start + 1 : end - 1].values
+                    - actual_power.iloc[start + 1 : end - 1].values
+                )
+                / 6000
+            )
+            lost_energy[i] = start_cap + full + end_cap
+
+        return lost_energy
 
     def compute_end_caps_energy_loss(
         self, start_time, end_time, relevant_power, turbine
@@ -1,5 +1,22 @@
+import re
+
 import numpy as np
 import pandas as pd
+import scipy
+from scipy import ndimage
+
+
+def _get_version(version):
+    """The (major, minor) numbers of a version string like "1.14.0rc1"."""
+    match = re.match(r"(\d+)\.(\d+)", version)
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+
+# rank_filter only keeps the window sorted as it slides along a 1D array
+# from scipy 1.14 on (the version requirements.txt asks for). Before, it
+# sorts every window, which is slower than pandas for the long windows of
+# the yaw error.
+HAS_FAST_RANK_FILTER = _get_version(scipy.__version__) >= (1, 14)
 
 
 def range_filter(df, lower_bound, upper_bound, invalid_flag=-9999):
@@ -93,58 +110,152 @@ def gradient_filter(
             Defaults to 3.
 
     Returns:
-        pandas.DataFrame: A fully flagged dataset.
+        pandas.DataFrame: A fully flagged dataset. It is `data` itself, flagged in place, so pass a
+            copy to keep the original (as `FarmComponent` does).
     """
 
     repeat_threshold = int(repeat_threshold)
     diff_depth = int(diff_depth)
     margin = int(margin)
 
-    total_flags = pd.DataFrame(index=data.index, columns=data.columns, dtype=bool)
-    total_flags = False
+    # column-major, so that every turbine is scanned as one contiguous run
+    values = np.asfortranarray(data.to_numpy(dtype=float))
+    with np.errstate(invalid="ignore"):
+        within_bounds = (values <= upper_bound) & (values >= lower_bound)
 
+    total_flags = np.zeros_like(within_bounds)
     for forward in [True, False]:
-        upper_bound_data = data <= upper_bound
-        lower_bound_data = data >= lower_bound
-
+        diff_data = None
         for diff_num in range(1, diff_depth + 1):
             window_size = (repeat_threshold - 1) * diff_num
+            periods = diff_num if forward else -diff_num
 
+            # the second order re-differences the first order
             if diff_num == 2:
-                diff_data = (
-                    diff_data.diff(periods=diff_num)
-                    if forward
-                    else diff_data.diff(periods=-diff_num)
-                )
+                diff_data = _shifted_diff(diff_data, periods)
             else:
-                diff_data = (
-                    data.diff(periods=diff_num)
-                    if forward
-                    else data.diff(periods=-diff_num)
-                )
-
-            change_data_forward = (abs(diff_data) <= change_threshold).rolling(
-                window=window_size
-            ).sum() == window_size
-            change_data_backward = (abs(diff_data) <= change_threshold).rolling(
-                window=window_size
-            ).sum().shift(-window_size + 1) == window_size
-
-            change_data = change_data_forward | change_data_backward
+                diff_data = _shifted_diff(values, periods)
 
-            this_flags = change_data & upper_bound_data & lower_bound_data
+            with np.errstate(invalid="ignore"):
+                small_change = np.abs(diff_data) <= change_threshold
+            change_data_forward = _full_windows(small_change, window_size)
+            change_data_backward = _shift_rows(change_data_forward, -window_size + 1)
 
-            total_flags |= this_flags
-
-    # Extend flags based on margin
+            total_flags |= (change_data_forward | change_data_backward) & within_bounds
 
+    # Extend flags based on margin. Each step ORs in the *unextended* flags
+    # one row away, so any margin above 0 widens the flags by one row.
     extended_flags = total_flags.copy()
-    for _ in range(margin):
-        extended_flags |= total_flags.shift()
-        extended_flags |= total_flags.shift(-1)
+    if margin > 0:
+        extended_flags |= _shift_rows(total_flags, 1)
+        extended_flags |= _shift_rows(total_flags, -1)
 
+    extended_flags = pd.DataFrame(extended_flags, index=data.index, columns=data.columns)
     flag_stats = extended_flags.mean().mul(100).round(2).to_dict()
 
     data[extended_flags] = gradient_flag_value
 
     return data, flag_stats
+
+
+def rolling_median(values, window, min_periods=None):
+    """
+    Computes the median of the trailing window of each value.
+
+    The same as `pandas.Series(values).rolling(window, min_periods).median()`.
+    Once the windows are full, the medians are found with the 1D rank filter
+    of scipy, which keeps the window sorted as it slides, instead of the
+    skiplist of pandas. Only the first `window - 1` values, whose windows
+    are partial, go through pandas. With a scipy older than 1.14 (see
+    HAS_FAST_RANK_FILTER), everything goes through pandas.
+
+    Args:
+        values (numpy.ndarray): The values. They must not be NaN, since NaN
+            values are not skipped like pandas does. Any NaN falls back to
+            pandas.
+        window (int): The number of values in each window.
+        min_periods (int, optional): The number of values a partial window
+            needs for its median. Defaults to `window`.
+
+    Returns:
+        numpy.ndarray: The medians, NaN where a window has fewer than
+            `min_periods` values.
+    """
+    values = np.asarray(values, dtype=float)
+    if not HAS_FAST_RANK_FILTER or np.isnan(values).any():
+        return (
+            pd.Series(values).rolling(window, min_periods=min_periods).median().to_numpy()
+        )
+
+    medians = np.full(len(values), np.nan)
+    n_partial = min(window - 1, len(values))
+    medians[:n_partial] = (
+        pd.Series(values[:n_partial])
+        .rolling(window, min_periods=min_periods)
+        .median()
+        .to_numpy()
+    )
+    if len(values) < window:
+        return medians
+
+    # the origin moves the window of each value behind it
+    rank_options = dict(size=window, mode="nearest", origin=(window - 1) // 2)
+    if window % 2:
+        full_medians = ndimage.rank_filter(values, window // 2, **rank_options)
+    else:
+        # the mean of the two middle values, like pandas
+        full_medians = (
+            ndimage.rank_filter(values, window // 2 - 1, **rank_options)
+            + ndimage.rank_filter(values, window // 2, **rank_options)
+        ) / 2
+    medians[window - 1 :] = full_medians[window - 1 :]
+    return medians
+
+
+def _shifted_diff(values, periods):
+    """`DataFrame.diff(periods)` on a 2D array, column-wise."""
+    diff = np.full_like(values, np.nan)
+    n_rows = len(values)
+    if abs(periods) >= n_rows:
+        return diff
+    if periods > 0:
+        diff[periods:] = values[periods:] - values[:-periods]
+    else:
+        diff[:periods] = values[:periods] - values[-periods:]
+    return diff
+
+
+def _shift_rows(flags, periods):
+    """`DataFrame.shift(periods)` on a 2D boolean array, filled with False."""
+    shifted = np.zeros_like(flags)
+    n_rows = len(flags)
+    if periods == 0:
+        shifted[:] = flags
+    elif abs(periods) >= n_rows:
+        pass
+    elif periods > 0:
+        shifted[periods:] = flags[:-periods]
+    else:
+        shifted[:periods] = flags[-periods:]
+    return shifted
+
+
+def _full_windows(flags, window_size):
+    """Whether the trailing window of each row holds only True values.
+
+    The same as `flags.rolling(window_size).sum() == window_size`, using a
+    cumulative sum instead of a rolling window per column.
+    """
+    n_rows = len(flags)
+    full = np.zeros_like(flags)
+    if window_size > n_rows:
+        return full
+    counts = np.zeros((n_rows + 1,) + flags.shape[1:], dtype=np.int32, order="F")
+    np.cumsum(flags, axis=0, out=counts[1:])
+    # the window of row i spans the rows (i - window_size, i]
+    first_row = max(window_size - 1, 0)
+    window_counts = (
+        counts[first_row + 1 :] - counts[first_row + 1 - window_size : n_rows + 1 - window_size]
+    )
+    full[first_row:] = window_counts == window_size
+    return full
@@ -0,0 +1,366 @@
+"""A result cache for the query methods of `Databricks_Repository`.
+
+The same queries are issued over and over again: by several callbacks
+that fire on the same selection, and by different users looking at the
+same date range. The `cached_query` decorator remembers the results of a
+repository method, keyed by its arguments.
+
+Entries expire after the TTL given to the decorator, and are dropped as
+soon as the `lastModified` value that `DESCRIBE DETAIL` reports for one
+of their source tables changes, so the daily table refreshes are picked
+up without waiting for the TTL.
+
+Concurrent identical calls are coalesced: while one caller runs the
+query, the others wait for it and share its result instead of running the
+same query again (see `SingleFlight`). With the disk backend this also
+holds across the gunicorn workers of a host.
+
+Where the entries live is up to the backend (see `Model.CacheBackends`).
+By default they are kept in the memory of the process. When the
+`ALT_ISIGHT_CACHE_DIR` environment variable is set, they are stored in
+that directory instead, which every gunicorn worker of the host shares.
+The directory must be private to the user running the app (see
+`DiskCacheBackend`); otherwise the memory backend is used.
+"""
+
+import copy
+import functools
+import inspect
+import os
+import threading
+import time
+
+import pandas as pd
+
+from Model.CacheBackends import CacheEntry, DiskCacheBackend, MemoryCacheBackend
+from Model.SparkActions import SPARK_ACTIONS
+
+
+TABLE_VERSION_CHECK_INTERVAL_SECONDS = 60
+
+# Time To Live of the results, by kind of query
+TTL_LOOKUP_SECONDS = 24 * 60 * 60
+TTL_METRICS_SECONDS = 6 * 60 * 60
+TTL_TIME_SERIES_SECONDS = 60 * 60
+
+
+def _normalize_argument(value):
+    """Turn an argument into something hashable with a stable repr."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize_argument(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_normalize_argument(v) for v in value))
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize_argument(v)) for k, v in value.items()))
+    return value
+
+
+def make_cache_key(method_name, catalog_path, params):
+    """Build the cache key of a query.
+
+    Args:
+        method_name (str): The name of the repository method.
+        catalog_path (str): The catalog the query runs against, so the
+            results of different environments never collide.
+        params (dict): The arguments of the call, by name, defaults
+            included.
+
+    Returns:
+        (str): The key.
+    """
+    normalized = tuple(
+        (name, _normalize_argument(value)) for name, value in sorted(params.items())
+    )
+    return repr((method_name, catalog_path, normalized))
+
+
+def copy_result(value):
+    """Copy a result so callers can not alter what is cached."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    return copy.deepcopy(value)
+
+
+class QueryCache:
+    """A cache of query results, on top of a storage backend."""
+
+    def __init__(self, backend=None, version_check_interval=None, enabled=None):
+        """Initializes a new instance of the class.
+
+        Args:
+            backend (object, optional): Where the entries are stored. See
+                `Model.CacheBackends`. Defaults to a `MemoryCacheBackend`.
+            version_check_interval (float, optional): The number of seconds
+                a table version is trusted before `DESCRIBE DETAIL` is run
+                again for that table.
+            enabled (bool, optional): Whether results are cached at all. By
+                default, this is True unless the `ALT_ISIGHT_QUERY_CACHE`
+                environment variable is set to "0" or "false".
+        """
+        if backend is None:
+            backend = MemoryCacheBackend()
+        if version_check_interval is None:
+            version_check_interval = TABLE_VERSION_CHECK_INTERVAL_SECONDS
+        if enabled is None:
+            enabled = os.environ.get("ALT_ISIGHT_QUERY_CACHE", "1").lower() not in ("0", "false")
+        self.backend = backend
+        self.version_check_interval = version_check_interval
+        self.enabled = enabled
+        self._table_versions = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "invalidated": 0,
+            "evicted": 0,
+        }
+
+    def _count(self, stat, amount=1):
+        with self._lock:
+            self.stats[stat] += amount
+
+    def get_table_versions(self, table_paths, lookup):
+        """Return the current version of each table.
+
+        Args:
+            table_paths (tuple): The fully qualified table names.
+            lookup (callable): Called with a table name to fetch its
+                version when the remembered one is too old.
+
+        Returns:
+            (str): The versions, in the order of `table_paths`, as a
+                string so that they can be stored by any backend.
+        """
+        versions = []
+        now = time.monotonic()
+        for table_path in table_paths:
+            with self._lock:
+                checked_at, version = self._table_versions.get(table_path, (None, None))
+            if checked_at is None or now - checked_at >= self.version_check_interval:
+                version = lookup(table_path)
+                with self._lock:
+                    self._table_versions[table_path] = (now, version)
+            versions.append(version)
+        return repr(tuple(versions))
+
+    def _lookup(self, key, versions):
+        """Return `(found, value, reason)`, without counting anything."""
+        entry = self.backend.get(key)
+        if entry is None:
+            return False, None, None
+        if time.time() >= entry.expires_at:
+            self.backend.delete(key)
+            return False, None, "expired"
+        if entry.versions != versions:
+            self.backend.delete(key)
+            return False, None, "invalidated"
+        return True, entry.value, None
+
+    def get(self, key, versions, count=True):
+        """Look up a result.
+
+        Args:
+            key (str): See `make_cache_key`.
+            versions (str): The current versions of the source tables.
+            count (bool): Whether the lookup is reflected in `stats`.
+
+        Returns:
+            (tuple): A `(found, value)` pair. `value` is a copy of the
+                cached result, or None if nothing usable was found.
+        """
+        found, value, reason = self._lookup(key, versions)
+        if count:
+            self._count("hits" if found else "misses")
+            if reason is not None:
+                self._count(reason)
+        if not found:
+            return False, None
+        return True, copy_result(value)
+
+    def set(self, key, value, ttl, versions):
+        """Store a result.
+
+        Args:
+            key (str): See `make_cache_key`.
+            value (object): The result of the query.
+            ttl (float): The number of seconds the result stays valid.
+            versions (str): The versions of the source tables the result
+                was computed from.
+        """
+        entry = CacheEntry(time.time() + ttl, versions, copy_result(value))
+        evicted = self.backend.set(key, entry)
+        self._count("evicted", evicted)
+
+    def clear(self):
+        """Drop every cached result and table version."""
+        self.backend.clear()
+        with self._lock:
+            self._table_versions.clear()
+
+    def __len__(self):
+        return len(self.backend)
+
+
+class _InFlightCall:
+    """A computation that other callers can wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Let concurrent identical calls share one computation.
+
+    The first caller of a key (the leader) runs the computation. Callers
+    that arrive with the same key while it runs wait for it, and get its
+    result (or its exception) instead of running the computation again.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "leaders": 0,
+            "coalesced": 0,
+        }
+
+    def do(self, key, func):
+        """Run `func` once for all the concurrent callers of `key`.
+
+        Args:
+            key (str): Identifies identical computations.
+            func (callable): The computation, called without arguments.
+
+        Returns:
+            (tuple): A `(result, shared)` pair. `shared` is True when the
+                result was computed by another caller, in which case it is
+                the very same object that the leader got.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _InFlightCall()
+                self._calls[key] = call
+                self.stats["leaders"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+SINGLE_FLIGHT = SingleFlight()
+
+
+def create_default_backend():
+    """Pick the storage backend from the environment.
+
+    Returns:
+        (object): A `DiskCacheBackend` in `ALT_ISIGHT_CACHE_DIR` (capped to
+            `ALT_ISIGHT_CACHE_MAX_BYTES`, if set) or a `MemoryCacheBackend`.
+    """
+    cache_dir = os.environ.get("ALT_ISIGHT_CACHE_DIR")
+    if cache_dir:
+        max_bytes = os.environ.get("ALT_ISIGHT_CACHE_MAX_BYTES")
+        try:
+            return DiskCacheBackend(
+                cache_dir,
+                max_bytes=int(max_bytes) if max_bytes else None,
+            )
+        except PermissionError as e:
+            print(f"Not using the disk cache in {cache_dir}: {e}")
+    return MemoryCacheBackend()
+
+
+QUERY_CACHE = QueryCache(backend=create_default_backend())
+
+
+def cached_query(tables, ttl=None, catalog_name="solar"):
+    """Cache the results of a `Databricks_Repository` method.
+
+    The decorated method must only depend on its arguments and on the
+    content of `tables`. The repository must provide `_get_catalog_path`
+    and `get_table_version`.
+
+    Args:
+        tables (tuple): The tables the method reads from, relative to
+            the catalog (eg. "isight.metrics").
+        ttl (float, optional): The number of seconds a result stays
+            valid, even if its tables are not refreshed. Defaults to
+            `TTL_METRICS_SECONDS`.
+        catalog_name (str): Either "solar" or "wind".
+
+    Returns:
+        (callable): The decorator.
+    """
+    if ttl is None:
+        ttl = TTL_METRICS_SECONDS
+
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            query_cache = QUERY_CACHE
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            params.pop("self", None)
+
+            catalog_path = self._get_catalog_path(catalog_name)
+            key = make_cache_key(method.__name__, catalog_path, params)
+
+            def call_method():
+                with SPARK_ACTIONS.track(method.__name__):
+                    return method(self, *args, **kwargs)
+
+            if not query_cache.enabled:
+                value, shared = SINGLE_FLIGHT.do(key, call_method)
+                return copy_result(value) if shared else value
+
+            table_paths = tuple(f"{catalog_path}.{table}" for table in tables)
+            versions = query_cache.get_table_versions(
+                table_paths,
+                lambda table_path: self.get_table_version(table_path, catalog_name),
+            )
+
+            found, value = query_cache.get(key, versions)
+            if found:
+                return value
+
+            def run_query():
+                # Other workers wait here while one of them runs the query,
+                # and then find its result in the (shared) cache.
+                with query_cache.backend.key_lock(key):
+                    found, value = query_cache.get(key, versions, count=False)
+                    if found:
+                        return value
+                    value = call_method()
+                    query_cache.set(key, value, ttl, versions)
+                    return value
+
+            value, shared = SINGLE_FLIGHT.do(key, run_query)
+            return copy_result(value) if shared else value
+
+        wrapper.uncached = method
+        return wrapper
+
+    return decorator
@@ -0,0 +1,161 @@
+"""A process-wide registry of Databricks Sessions.
+
+Every Dash callback builds its own `Databricks_Repository`, so the
+sessions can not live on the repository instance: they would be rebuilt
+on every interaction. Instead, each gunicorn worker holds one session per
+catalog in `SESSION_POOL`, which all repositories share.
+"""
+
+import threading
+import time
+
+
+HEALTH_CHECK_INTERVAL_SECONDS = 300
+
+
+class SparkSessionPool:
+    """Hold one PySpark Session per catalog for the lifetime of the process."""
+
+    def __init__(self, health_check_interval=None):
+        """Initializes a new instance of the class.
+
+        Args:
+            health_check_interval (float, optional): The minimum number of
+                seconds a session must have been idle for before it is
+                health checked. Checking on every call would add a round
+                trip to every interaction, so a session is only pinged once
+                it has not been used for longer than this. Defaults to
+                `HEALTH_CHECK_INTERVAL_SECONDS`.
+        """
+        if health_check_interval is None:
+            health_check_interval = HEALTH_CHECK_INTERVAL_SECONDS
+        self.health_check_interval = health_check_interval
+        self._sessions = {}
+        self._last_used = {}
+        # guards the dicts and the stats only; it is never held during a
+        # network call
+        self._lock = threading.Lock()
+        # serializes the health checks and reconnections of one catalog,
+        # so that a slow catalog does not stall the others
+        self._catalog_locks = {}
+        self.stats = {
+            "created": 0,
+            "reused": 0,
+            "reconnected": 0,
+            "failed_health_checks": 0,
+        }
+
+    @staticmethod
+    def _normalize(catalog_name):
+        return catalog_name.lower()
+
+    @staticmethod
+    def is_healthy(session):
+        """Run a trivial query to make sure a session can still be used.
+
+        Args:
+            session (PySpark Session): The session to test.
+
+        Returns:
+            (bool): True if the session answered the query.
+        """
+        try:
+            session.sql("SELECT 1").collect()
+        except Exception as e:
+            print(f"Databricks session failed its health check: {e}")
+            return False
+        return True
+
+    def _get_catalog_lock(self, key):
+        with self._lock:
+            return self._catalog_locks.setdefault(key, threading.Lock())
+
+    def _get_recently_used_session(self, key):
+        """Return the session of a catalog if it was used recently, else None."""
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                return None
+            now = time.monotonic()
+            if now - self._last_used[key] >= self.health_check_interval:
+                return None
+            self._last_used[key] = now
+            self.stats["reused"] += 1
+            return session
+
+    def get_session(self, catalog_name, factory):
+        """Return the session of a catalog, creating it if necessary.
+
+        The health check and the factory are network calls, so they run
+        outside of the pool lock, under a lock of their catalog only.
+
+        Args:
+            catalog_name (str): Either "solar" or "wind".
+            factory (callable): A function that takes `catalog_name` and
+                returns a brand new session. It is only called when the
+                catalog has no session yet, or when its session failed a
+                health check.
+
+        Returns:
+            (PySpark Session): The pooled session.
+        """
+        key = self._normalize(catalog_name)
+        session = self._get_recently_used_session(key)
+        if session is not None:
+            return session
+
+        with self._get_catalog_lock(key):
+            # another caller may have checked or rebuilt the session while
+            # this one waited for the catalog lock
+            session = self._get_recently_used_session(key)
+            if session is not None:
+                return session
+
+            with self._lock:
+                session = self._sessions.get(key)
+            if session is not None:
+                healthy = self.is_healthy(session)
+                with self._lock:
+                    # unless it was invalidated during the check
+                    if healthy and self._sessions.get(key) is session:
+                        self._last_used[key] = time.monotonic()
+                        self.stats["reused"] += 1
+                        return session
+                    if not healthy:
+                        self.stats["failed_health_checks"] += 1
+                        self.stats["reconnected"] += 1
+                        if self._sessions.get(key) is session:
+                            self._sessions.pop(key)
+                            self._last_used.pop(key)
+
+            session = factory(catalog_name)
+            with self._lock:
+                self._sessions[key] = session
+                self._last_used[key] = time.monotonic()
+                self.stats["created"] += 1
+            return session
+
+    def invalidate(self, catalog_name=None):
+        """Drop a pooled session so the next request reconnects.
+
+        Args:
+            catalog_name (str, optional): The catalog to drop. If None,
+                every session is dropped.
+        """
+        with self._lock:
+            if catalog_name is None:
+                self._sessions.clear()
+                self._last_used.clear()
+            else:
+                key = self._normalize(catalog_name)
+                self._sessions.pop(key, None)
+                self._last_used.pop(key, None)
+
+    def reset_stats(self):
+        """Set all the counters back to zero."""
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+
+SESSION_POOL = SparkSessionPool()
@@ -0,0 +1,190 @@
+"""Count the Spark actions run by each repository call.
+
+Every action (`toPandas`, `collect`, `count`, ...) executes a query on the
+cluster and ships its result to the driver, so a repository method should
+run at most one. `SPARK_ACTIONS` makes that checkable: once a DataFrame
+class is instrumented, each of its actions is counted against the
+repository calls being tracked on the current thread.
+
+    with SPARK_ACTIONS.instrumented(DataFrame):
+        with SPARK_ACTIONS.track("get_metrics_data") as call:
+            ...
+    call.actions  # the number of actions run inside the block
+
+Instrumenting patches the methods of the class for the whole process, so
+it is opt-in: the tests instrument their fake DataFrames, and the app
+only instruments the Spark Connect DataFrame when the
+`ALT_ISIGHT_COUNT_SPARK_ACTIONS` environment variable is set (see
+`Model.DataAccess`).
+"""
+
+import contextlib
+import functools
+import os
+import threading
+
+
+_MISSING = object()
+
+SPARK_ACTION_METHODS = (
+    "collect",
+    "count",
+    "first",
+    "head",
+    "isEmpty",
+    "show",
+    "tail",
+    "take",
+    "toLocalIterator",
+    "toPandas",
+)
+
+
+class TrackedCall:
+    """The actions run during one repository call."""
+
+    def __init__(self, name):
+        self.name = name
+        self.actions = 0
+        self.action_names = []
+
+
+class SparkActionCounter:
+    """Count Spark actions, in total and per tracked repository call."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {
+            "calls": 0,
+            "actions": 0,
+            "max_actions_per_call": 0,
+        }
+        self.last_call_actions = {}
+        # {class: {action name: its attribute before instrumenting}}
+        self._originals = {}
+
+    def _stack(self):
+        if not hasattr(self._local, "calls"):
+            self._local.calls = []
+        return self._local.calls
+
+    def record(self, action_name):
+        """Count one action against the calls tracked on this thread.
+
+        Nested calls (eg. `get_tornado_data` calling `get_metrics_data`)
+        are all charged, so an outer call reports everything it caused.
+
+        Args:
+            action_name (str): The DataFrame method that was called.
+        """
+        for call in self._stack():
+            call.actions += 1
+            call.action_names.append(action_name)
+        with self._lock:
+            self.stats["actions"] += 1
+
+    @contextlib.contextmanager
+    def track(self, name):
+        """Track the actions of a repository call.
+
+        Args:
+            name (str): The name of the repository method.
+
+        Yields:
+            (TrackedCall): Its `actions` are up to date once the block
+                exits.
+        """
+        call = TrackedCall(name)
+        stack = self._stack()
+        stack.append(call)
+        try:
+            yield call
+        finally:
+            stack.pop()
+            with self._lock:
+                self.stats["calls"] += 1
+                self.stats["max_actions_per_call"] = max(
+                    self.stats["max_actions_per_call"], call.actions
+                )
+                self.last_call_actions[name] = call.actions
+
+    def instrument(self, dataframe_class):
+        """Count the actions of every instance of a DataFrame class.
+
+        Instrumenting the same class twice has no effect.
+
+        Args:
+            dataframe_class (type): eg. the Spark Connect DataFrame.
+        """
+        originals = self._originals.setdefault(dataframe_class, {})
+        for action_name in SPARK_ACTION_METHODS:
+            method = getattr(dataframe_class, action_name, None)
+            if method is None or getattr(method, "_counts_spark_actions", False):
+                continue
+            originals[action_name] = dataframe_class.__dict__.get(action_name, _MISSING)
+            setattr(dataframe_class, action_name, self._counting(method, action_name))
+
+    def uninstrument(self, dataframe_class):
+        """Give a DataFrame class back the methods it had before `instrument`.
+
+        Args:
+            dataframe_class (type): A class instrumented by this counter.
+        """
+        for action_name, original in self._originals.pop(dataframe_class, {}).items():
+            if original is _MISSING:
+                # the method was inherited
+                delattr(dataframe_class, action_name)
+            else:
+                setattr(dataframe_class, action_name, original)
+
+    @contextlib.contextmanager
+    def instrumented(self, dataframe_class):
+        """Count the actions of a DataFrame class within a block only.
+
+        Args:
+            dataframe_class (type): eg. a fake DataFrame of the tests.
+        """
+        self.instrument(dataframe_class)
+        try:
+            yield self
+        finally:
+            self.uninstrument(dataframe_class)
+
+    def _counting(self, method, action_name):
+        counter = self
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            # Some actions are built on others (`first` calls `head`, which
+            # calls `take`, ...): only the outermost one is counted.
+            if getattr(counter._local, "in_action", False):
+                return method(*args, **kwargs)
+            counter.record(action_name)
+            counter._local.in_action = True
+            try:
+                return method(*args, **kwargs)
+            finally:
+                counter._local.in_action = False
+
+        wrapper._counts_spark_actions = True
+        return wrapper
+
+    def reset_stats(self):
+        """Set all the counters back to zero."""
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0
+            self.last_call_actions.clear()
+
+
+def is_counting_requested():
+    """Whether the `ALT_ISIGHT_COUNT_SPARK_ACTIONS` environment variable is set.
+
+    Returns:
+        (bool): True if it is set to "1" or "true".
+    """
+    return os.environ.get("ALT_ISIGHT_COUNT_SPARK_ACTIONS", "0").lower() in ("1", "true")
+
+
+SPARK_ACTIONS = SparkActionCounter()
@@ -3,11 +3,15 @@ import sys
 import pandas as pd
 import numpy as np
 import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from scipy.stats import zscore
 from Model.Turbine import Turbine
+from Model.BitMask import BitMask
 from Model.Component import Component
 from Model.Constants.General import (
     CLEANING_ORDER,
+    RAW_MISSING_FLAG,
     TURBINE_TECH,
     COMPRESSED_COLUMN_TYPES,
     DO_NOT_CALCULATE_SEVERITY,
@@ -17,27 +21,48 @@ from Model.Constants.OnlineFilter import ONLINE_FILTER_PARAMETERS
 from Model.Constants.RangeFilter import RANGE_FILTER_PARAMETERS
 from Model.DataAccess import RepositoryFactory
 from Model.PowerCurve import PowerCurve
+from Utils.ParquetFiles import is_parquet_path, read_compressed, read_time_series
 from Utils.Enums import AggTypes, ComponentTypes, DataSourceType
 from Utils.Constants import (
     DEFAULT_PARSE_FUNCS,
     PROJECT_SUBSETS,
 )
+from Utils.RevenueGrid import RevenueGrid, load_revenue_grid
 from Utils.Transformers import (
     get_component_types,
     component_type_map,
     merge_csv_files,
     normalize_compressed,
-    MWh_csv_to_dict,
     map_mwh_to_revenue,
     does_precompute_yaw_error,
     get_turbine,
     get_component_type,
     calculate_window_severity_with_recovery_threshold,
-    filter_days,
-    custom_sum,
+    filter_low_recovery_days,
+    calculate_daily_sums,
 )
 
-from Model.Filter import gradient_filter, range_filter
+from Model.Filter import gradient_filter, range_filter, rolling_median
+
+
+def cache_per_instance(method):
+    """Cache the results of a method on its instance.
+
+    Unlike `functools.lru_cache` on a method, whose cache holds every
+    instance it was called with for the life of the process, the results
+    go away with the instance, so a component and its data can be freed
+    (see `Model.ChunkedWindFarm`).
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = self.__dict__.setdefault("_method_cache", {})
+        key = (method.__qualname__, args, tuple(sorted(kwargs.items())))
+        if key not in cache:
+            cache[key] = method(self, *args, **kwargs)
+        return cache[key]
+
+    return wrapper
 
 
 class WindFarm:
@@ -92,6 +117,7 @@ class WindFarm:
         Args:
             avg_path: The path to the input data file. Defaults to None.Can be a string or a list. if
                 a list then the files are opened individually and merged together using an outer join.
+                A single Parquet file is not loaded up front: its columns are read as they are needed.
             avg_data: An alternative to passing the path of the average data file. can pass in as a
                 dataframe instead.
             compressed_path (str): path to the compressed data file
@@ -106,7 +132,9 @@ class WindFarm:
                          is None it is assumed to be WAK.
             technology (str): can be left blank or populated. If populated it matches the project,
                               technology keys found in constants
-            revenue_grid():
+            revenue_grid (RevenueGrid, optional): the revenue per MWh of each project. A dict from
+                `MWh_csv_to_dict` is also accepted. Defaults to the grid of the default prices file,
+                loaded once per process (see `load_revenue_grid`).
             oem_powercurve_path (pandas.DataFrame): the path to a dataframe containing all oem power curves for all
                 projects and technologies
 
@@ -126,16 +154,16 @@ class WindFarm:
         self._tag_type_suffixes = None
         self._online_parameters = None
         self._online_input_data = None
-        self._online_map = None
+        self._online_mask = None
         self._oem_powercurve = None
         self._powercurves = None
         self._powercurve_distributions = None
         self._components = {}
-        self._revenue_dict = (
-            revenue_grid
-            if revenue_grid is not None
-            else MWh_csv_to_dict(file_path="../assets/data/RevenuePerMwh.csv")
-        )
+        if revenue_grid is None:
+            revenue_grid = load_revenue_grid()
+        elif not isinstance(revenue_grid, RevenueGrid):
+            revenue_grid = RevenueGrid.from_dict(revenue_grid)
+        self._revenue_grid = revenue_grid
         self._turbines = None
 
         if all(x is None for x in [self._compressed_path, self._compressed_data]):
@@ -145,9 +173,15 @@ class WindFarm:
 
         # avg path is a string or a list of strings. either way return a single dataframe
         # assumes each file has the same date range of data
+        avg_file_path = None
         if avg_data is None:
             if isinstance(avg_path, list):
                 input_data = merge_csv_files(avg_path)
+            elif data_source_type == DataSourceType.PARQUET or is_parquet_path(avg_path):
+                # the repository reads the columns of each component from the file
+                data_source_type = DataSourceType.PARQUET
+                avg_file_path = avg_path
+                input_data = None
             else:
                 input_data = pd.read_csv(avg_path, index_col=[0], parse_dates=[0])
 
@@ -160,7 +194,9 @@ class WindFarm:
             input_data = avg_data
 
         self.repository = RepositoryFactory.create_repository(
-            data_source_type=data_source_type, data=input_data
+            data_source_type=data_source_type,
+            data_file_path=avg_file_path,
+            data=input_data,
         )
 
         yaw_input_data = None
@@ -170,7 +206,7 @@ class WindFarm:
             if isinstance(yaw_path, list):
                 yaw_input_data = merge_csv_files(yaw_path)
             else:
-                yaw_input_data = pd.read_csv(yaw_path, index_col=[0], parse_dates=[0])
+                yaw_input_data = read_time_series(yaw_path)
 
         if yaw_input_data is not None:
             self.repository.add_data(yaw_input_data, freq="10s")
@@ -212,7 +248,7 @@ class WindFarm:
                     axis=1,
                 ),
                 freq="10T",
-                revenue_dict=self._revenue_dict,
+                revenue_dict=self._revenue_grid,
             )
             # Public properties for each calculated component type
             for component_type, component_obj in self._components.items():
@@ -301,7 +337,7 @@ class WindFarm:
                 name=component_type,
                 project=self.name,
                 technology=self.technology,
-                online_map=self.online_map.copy(),
+                online_map=self.online_mask,
                 data=self.get_subset(component_type=component_type),
             )
         else:
@@ -309,7 +345,7 @@ class WindFarm:
                 name=component_type,
                 project=self.name,
                 technology=self.technology,
-                online_map=self.online_map.copy(),
+                online_map=self.online_mask,
                 data=self.get_subset(component_type=component_type),
             )
 
@@ -338,12 +374,19 @@ class WindFarm:
 
             return list(ONLINE_FILTER_PARAMETERS[self.name].items())[0][1]
 
+    @property
+    def online_mask(self):
+        """The combined map produced after filtering by all online parameters, as a
+        BitMask shared by every FarmComponent of the farm"""
+        if self._online_mask is None:
+            online_map, self._online_input_data = self.get_online_only()
+            self._online_mask = BitMask.from_frame(online_map)
+        return self._online_mask
+
     @property
     def online_map(self):
         """The combined boolean map produced after filtering by all online parameters"""
-        if self._online_map is None:
-            self._online_map, self._online_input_data = self.get_online_only()
-        return self._online_map
+        return self.online_mask.to_frame()
 
     @property
     def components(self):
@@ -568,7 +611,7 @@ class WindFarm:
 
         """
         if self._compressed_data is None:
-            compressed_data = pd.read_csv(self._compressed_path, low_memory=False)
+            compressed_data = read_compressed(self._compressed_path)
         else:
             compressed_data = self._compressed_data
 
@@ -625,7 +668,7 @@ class WindFarm:
         """
 
         turbines = {}
-        for col_name in self.repository.data.columns:
+        for col_name in self.repository.get_main_column_names():
             turbine_name = self._turbine_name_func(col_name)
             # check if this is a new turbine and create a Turbine object if necessary
             if turbine_name not in turbines:
@@ -676,7 +719,15 @@ class WindFarm:
         return self.turbines[name]
 
     def get_flagged_turbines(
-        self, start=None, end=None, period="6H", density_thresh=0.9, n_std=1, top_n=100
+        self,
+        start=None,
+        end=None,
+        period="6H",
+        density_thresh=0.9,
+        n_std=1,
+        top_n=100,
+        max_workers=None,
+        executor="thread",
     ):
         """
         Retrieves the flagged turbines and their severity scores farm wide over all components within a specified time range.
@@ -688,6 +739,15 @@ class WindFarm:
             density_thresh (float): Threshold value for density-based anomaly detection. Defaults to 0.9.
             n_std (int): Number of standard deviations for anomaly detection. Defaults to 1.
             top_n (int): Number of top flagged turbines on the farm to retrieve. Defaults to 100.
+            max_workers (int, optional): If specified, the components are cleaned and scored concurrently
+                by this many workers. The results are merged in the order of the components, so they do
+                not depend on it. Defaults to None, one component after the other.
+            executor (str): Either "thread", or "process" for forked worker processes. Both share the
+                data of the farm (read only) rather than copying it, but only the threads keep the
+                cleaned data of the components for later. "process" is only available where
+                processes can be forked, and is meant for batch runs: forking a process that holds
+                gRPC threads, like the Spark Connect sessions of the Dash app, is not safe.
+                Defaults to "thread".
 
         Returns:
             flagged_turbines (pandas.DataFrame): DataFrame containing the flagged turbines and their severity scores.
@@ -696,20 +756,59 @@ class WindFarm:
                 Columns represent the component names, and rows represent daily periods.
 
         Raises:
-            None.
+            ValueError: If `executor` is invalid, or is "process" where processes can not be
+                forked.
 
         """
         all_turbines = []
         severity_scores = []
 
-        for component in self.components:
-            if component not in DO_NOT_CALCULATE_SEVERITY:
-                print(f"[WindFarm 496] processing severity {self.name}, {component}...")
-                this_flagged_turbines, daily_severity_scores = self.components[
-                    component
-                ].get_flagged_turbines(n_std=n_std, top_n=top_n, start=start, end=end)
-                all_turbines.append(this_flagged_turbines)
-                severity_scores.append(daily_severity_scores)
+        components = [c for c in self.components if c not in DO_NOT_CALCULATE_SEVERITY]
+
+        score_kwargs = dict(n_std=n_std, top_n=top_n, start=start, end=end)
+
+        if max_workers is None:
+            results = [
+                _score_component(self, component, score_kwargs) for component in components
+            ]
+        elif executor == "thread":
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results = list(
+                    pool.map(
+                        lambda component: _score_component(self, component, score_kwargs),
+                        components,
+                    )
+                )
+        elif executor == "process":
+            if "fork" not in multiprocessing.get_all_start_methods():
+                raise ValueError(
+                    "The 'process' executor needs forked processes, which this platform does not "
+                    "support. Use the 'thread' executor instead."
+                )
+            # The forked workers inherit the farm through the initializer,
+            # instead of unpickling a copy. It is only set in the workers,
+            # so several farms can be scored at the same time.
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_set_forked_windfarm,
+                initargs=(self,),
+            ) as pool:
+                results = list(
+                    pool.map(
+                        _score_forked_component,
+                        components,
+                        [score_kwargs] * len(components),
+                    )
+                )
+        else:
+            raise ValueError(
+                f"Invalid executor '{executor}'. It must be one of {COMPONENT_EXECUTORS}."
+            )
+
+        for this_flagged_turbines, daily_severity_scores in results:
+            all_turbines.append(this_flagged_turbines)
+            severity_scores.append(daily_severity_scores)
 
         daily_severities = pd.concat(severity_scores, axis=1)
         flagged_turbines = pd.concat(all_turbines).sort_values(ascending=False)
@@ -724,6 +823,33 @@ class WindFarm:
         return flagged_turbines, daily_severities
 
 
+COMPONENT_EXECUTORS = ("thread", "process")
+
+# the farm whose components are scored by a forked worker process; only
+# set in the workers (see `_set_forked_windfarm`)
+_FORKED_WINDFARM = None
+
+
+def _score_component(windfarm, component, score_kwargs):
+    """Score one component of a farm, see `WindFarm.get_flagged_turbines`."""
+    print(f"[WindFarm 496] processing severity {windfarm.name}, {component}...")
+    return windfarm.components[component].get_flagged_turbines(**score_kwargs)
+
+
+def _set_forked_windfarm(windfarm):
+    """Initialize a forked worker process with the farm it scores.
+
+    The farm is inherited through the fork, not pickled.
+    """
+    global _FORKED_WINDFARM
+    _FORKED_WINDFARM = windfarm
+
+
+def _score_forked_component(component, score_kwargs):
+    """Score one component of `_FORKED_WINDFARM`, in a forked worker process."""
+    return _score_component(_FORKED_WINDFARM, component, score_kwargs)
+
+
 class FarmComponent:
     """
 
@@ -751,9 +877,13 @@ class FarmComponent:
             name (str): The name of the farm component.
             technology (str): Model of turbine. can
             data (pandas.DataFrame): A pandas dataframe containing time-series data for this farm component.
+            online_map (Model.BitMask.BitMask or pandas.DataFrame, optional): The online map of the
+                  farm, one column per turbine. It is shared, never copied nor modified.
             freq (str, optional): The time frequency of the data, in pandas offset string format.
                   Defaults to '10T'.
         """
+        if isinstance(online_map, pd.DataFrame):
+            online_map = BitMask.from_frame(online_map)
 
         self.name = name
         self.project = project
@@ -761,6 +891,7 @@ class FarmComponent:
         self.data = data
         self._online_map = online_map
         self._resampled_online_map = None
+        self._online_map_positions = None
         self._freq = freq
         self._gradient_parameters = None
         self._gradient_filtered_data = None
@@ -770,7 +901,9 @@ class FarmComponent:
         self._range_filtered_stats = None
         self._online_filtered_data = None
         self._online_filtered_stats = None
+        self._cleaning_flags = None
         self._clean_data = None
+        self._valid_clean_data = None
         self._z_scores = None
         self._window_severity_score = None
         self._daily_mean = None
@@ -813,13 +946,21 @@ class FarmComponent:
                 )[0][1][self.name]
         return self._gradient_parameters
 
-    @property
-    def gradient_filtered_stats(self):
-        if self._gradient_filtered_stats is None:
+    def _run_gradient_filter(self):
+        if self._gradient_filtered_data is None:
             (
                 self._gradient_filtered_data,
                 self._gradient_filtered_stats,
-            ) = gradient_filter(self.data, **self.gradient_filter_parameters)
+            ) = gradient_filter(self.data.copy(), **self.gradient_filter_parameters)
+
+    @property
+    def gradient_filtered_stats(self):
+        """The percentage of each column flagged by the gradient filter.
+
+        Like `gradient_filtered_data`, it is computed on a copy of `data`,
+        which is never flagged, whichever of them is read first.
+        """
+        self._run_gradient_filter()
         return self._gradient_filtered_stats
 
     @property
@@ -827,11 +968,10 @@ class FarmComponent:
         """
         returns a mask
         """
-        if self._gradient_filtered_data is None:
-            (
-                self._gradient_filtered_data,
-                self._gradient_filtered_stats,
-            ) = gradient_filter(self.data.copy(), **self.gradient_filter_parameters)
+        return self._get_cleaning_stage_map("gradient_filtered_data")
+
+    def _compute_gradient_filtered_data(self):
+        self._run_gradient_filter()
         return self._gradient_filtered_data > -1000
 
     @property
@@ -849,61 +989,71 @@ class FarmComponent:
 
         return self._range_filter_parameters
 
-    @property
-    def range_filtered_stats(self):
-        if self._range_filtered_stats is None:
+    def _run_range_filter(self):
+        if self._range_filtered_data is None:
             self._range_filtered_data, self._range_filtered_stats = range_filter(
-                self.data, **self.range_filter_parameters
+                self.data.copy(), **self.range_filter_parameters
             )
+
+    @property
+    def range_filtered_stats(self):
+        self._run_range_filter()
         return self._range_filtered_stats
 
     @property
     def range_filtered_data(self):
-        if self._range_filtered_data is None:
-            self._range_filtered_data, self._range_filtered_stats = range_filter(
-                self.data.copy(), **self.range_filter_parameters
-            )
+        """
+        returns a mask
+        """
+        return self._get_cleaning_stage_map("range_filtered_data")
+
+    def _compute_range_filtered_data(self):
+        self._run_range_filter()
         return self._range_filtered_data > -1000
 
+    @property
+    def resampled_online_map(self):
+        """The online map at the frequency of the data, as a BitMask"""
+        if self._resampled_online_map is None:
+            # if the frequencies are not equal, resample the map
+            # so it can be applied correctly to the data. The shared map
+            # keeps each resampled version, so the other components of the
+            # same frequency reuse it.
+            self._resampled_online_map = self._online_map.resample(self._freq)
+        return self._resampled_online_map
+
+    @property
+    def online_map_positions(self):
+        """For each column of the data, the position of its turbine in the online map.
+
+        Columns whose turbine is not in the map get -1, and are filtered out
+        entirely. A map with one column per data column, none of which is
+        labelled by turbine, is used as is.
+        """
+        if self._online_map_positions is None:
+            online_map = self._online_map
+            positions = online_map.columns.get_indexer(
+                [get_turbine(col) for col in self.data.columns]
+            )
+            if (positions < 0).all() and online_map.shape[1] == self.data.shape[1]:
+                positions = np.arange(self.data.shape[1])
+            self._online_map_positions = positions
+        return self._online_map_positions
+
     @property
     def online_filtered_data(self):
         """
         returns a dataframe of numeric values
         """
-        this_map = pd.DataFrame()
+        if self._online_filtered_data is not None:
+            return self._online_filtered_data
 
         if self._online_map is not None:
-            # if the frequencies are not equl, resample the map
-            # so it can be applied correctly to the data
-            map_freq = pd.infer_freq(self._online_map.index)
-            # if any(x in self.name for x in ['Dir','Yaw']):
-
-            if map_freq != self._freq:
-                self._online_map = self._online_map.resample(self._freq).ffill()
-
-            if self._online_map.shape[1] != self.data.shape[1]:
-                # adjust the online map shape (wrt columns)to match the data
-                # for each column in the data match the turbine in the
-                # map and repeat it to form a dataframe of the same shape as data
-                for col in self.data.columns:
-                    this_turbine = get_turbine(col)
-                    if this_turbine not in self._online_map:
-                        continue
-                    if isinstance(self._online_map[this_turbine], pd.Series):
-                        this_turbine_map = self._online_map[this_turbine].to_frame()
-                    else:
-                        this_turbine_map = self._online_map[this_turbine]
-                    if len(this_map) == 0:
-                        this_map = this_turbine_map
-                    else:
-                        this_map = pd.concat(
-                            [this_map, this_turbine_map],
-                            axis=1,
-                        )
-            else:
-                this_map = self._online_map
-                this_map.columns = self.data.columns
-            self._online_filtered_data = self.data.copy()[this_map].fillna(-9992)
+            # repeat the map of each turbine for each of its columns in the data
+            this_map = self.resampled_online_map.expand(
+                self.data.index, self.online_map_positions
+            )
+            self._online_filtered_data = self.data.where(this_map).fillna(-9992)
 
             return self._online_filtered_data
         else:
@@ -916,29 +1066,65 @@ class FarmComponent:
         """
         returns a mask with the same shape as the FarmComponent Data
         """
+        return self._get_cleaning_stage_map("online_filtered_data_map")
 
+    def _compute_online_filtered_data_map(self):
         return self.online_filtered_data > -1000
 
+    @property
+    def cleaning_flags(self):
+        """One packed bitmask of the cleaning stages, with the shape of the data.
+
+        Bit 0 (RAW_MISSING_FLAG) is set where the raw value is missing, and
+        bit i where the value is removed by the (i-1)th method of
+        CLEANING_ORDER. Every cleaning method runs once, the first time
+        this is accessed, and all the masks and cleaned data are read from
+        it afterwards.
+
+        Returns:
+            (numpy.ndarray): The flags, as uint8.
+        """
+        if self._cleaning_flags is None:
+            with np.errstate(invalid="ignore"):
+                raw_data_map = self.data.to_numpy(dtype=float) > -1000
+            flags = np.where(raw_data_map, 0, RAW_MISSING_FLAG).astype(np.uint8)
+            for bit, clean_type in enumerate(CLEANING_ORDER, start=1):
+                stage_map = getattr(self, f"_compute_{clean_type}")()
+                flags[~np.asarray(stage_map, dtype=bool)] |= np.uint8(1 << bit)
+            self._cleaning_flags = flags
+        return self._cleaning_flags
+
+    def _get_cleaning_stage_map(self, clean_type):
+        """The mask of one cleaning method, read from `cleaning_flags`."""
+        bit = np.uint8(1 << (CLEANING_ORDER.index(clean_type) + 1))
+        return pd.DataFrame(
+            (self.cleaning_flags & bit) == 0,
+            index=self.data.index,
+            columns=self.data.columns,
+        )
+
     @property
     def clean_data(self):
         """Fully cleaned data subject to the combined effect of each cleaning method
         in the order specified by the Utils.Constants.General.CLEANING_ORDER constant.
         """
-        datamaps = [getattr(self, clean_type) for clean_type in CLEANING_ORDER]
-
-        combined_clean_mask = functools.reduce(operator.and_, datamaps)
+        if self._clean_data is None:
+            combined_clean_mask = (self.cleaning_flags & ~np.uint8(RAW_MISSING_FLAG)) == 0
+            self._clean_data = self.data.where(combined_clean_mask, other=-9999)
+        return self._clean_data
 
-        clean_data = self.data.where(combined_clean_mask, other=-9999)
-
-        return clean_data
+    @property
+    def valid_clean_data(self):
+        """`clean_data` with NaN instead of the removed values."""
+        if self._valid_clean_data is None:
+            self._valid_clean_data = self.data.where(self.cleaning_flags == 0)
+        return self._valid_clean_data
 
     @property
     def clean_data_map(self):
-        datamaps = [getattr(self, clean_type) for clean_type in CLEANING_ORDER]
-        datamaps.insert(0, self.data > -1000)
-        combined_clean_mask = functools.reduce(operator.and_, datamaps)
-
-        return combined_clean_mask
+        return pd.DataFrame(
+            self.cleaning_flags == 0, index=self.data.index, columns=self.data.columns
+        )
 
     @property
     def daily_mean(self):
@@ -958,9 +1144,7 @@ class FarmComponent:
                 a daily date.
 
         """
-        this_clean_data = self.clean_data.copy()
-        this_clean_data = this_clean_data[this_clean_data > -1000]
-        daily_mean = this_clean_data.resample("D").mean()
+        daily_mean = self.valid_clean_data.resample("D").mean()
 
         return daily_mean
 
@@ -1082,7 +1266,7 @@ class FarmComponent:
 
         return top_turbines, daily_severity_scores
 
-    @functools.lru_cache(maxsize=None)
+    @cache_per_instance
     def get_severity_scores(
         self, period="6H", density_thresh=0.9, n_std=1, daily_threshold=0.9
     ):
@@ -1113,11 +1297,7 @@ class FarmComponent:
 
         # remove full days for each applicable turbine if
         # the recovery for that day is not high enough
-        df = df.groupby(df.index.date).apply(
-            lambda x: x.apply(
-                lambda y: filter_days(y, freq=self._freq, threshold=daily_threshold)
-            )
-        )
+        df = filter_low_recovery_days(df, freq=self._freq, threshold=daily_threshold)
 
         # Now Calculate row mean and standard deviation
         row_mean = df[df > -1000].mean(axis=1)
@@ -1137,10 +1317,8 @@ class FarmComponent:
             z_scores=self._z_scores, period=36, density_thresh=density_thresh
         )
 
-        # Group by day and calculate daily sums
-        daily_severity = window_severity_frame.groupby(
-            window_severity_frame.index.date
-        ).apply(lambda x: x.apply(custom_sum))
+        # Group by day and calculate daily sums, NaN for days without any window
+        daily_severity = calculate_daily_sums(window_severity_frame)
 
         return daily_severity
 
@@ -1161,7 +1339,7 @@ class FarmComponent:
         # Get the corresponding aggregation function for the specified type
         # get gradient params for this component type
 
-        clean_data = self.clean_data[self.clean_data > -1000]
+        clean_data = self.valid_clean_data
 
         # apply the specified aggregation type to the clean data frame
         aggregation_func = getattr(clean_data, aggregation_type, None)
@@ -1372,11 +1550,8 @@ class CalculatedFarmComponent:
             - The returned efficiency values are filled with -9999 where the calculation is not possible due
               to insufficient data.
         """
-        # Find all the turbine names in the dataframe
-
         if daily_threshold is None:
             daily_threshold = 0.9
-        turbines = set([get_turbine(col) for col in df.columns])
 
         active_power_type_str = component_type_map(
             ComponentTypes.ACTIVE_POWER.value, rtn_property_str=False
@@ -1385,90 +1560,108 @@ class CalculatedFarmComponent:
             ComponentTypes.EXPECTED_POWER.value, rtn_property_str=False
         )[0]
 
-        efficiency_frame = pd.DataFrame()
-        lost_energy_frame = pd.DataFrame()
-
-        # Loop through each turbine and calculate its efficiency
-        for turbine in turbines:
-            # Get the columns for this turbine's active power and expected power
-            active_power_cols = [
+        # Pair the active and expected power columns of each turbine once
+        turbines = []
+        active_power_cols = []
+        expected_power_cols = []
+        turbine_cols = []
+        for turbine in dict.fromkeys(get_turbine(col) for col in df.columns):
+            this_active_power_cols = [
                 col
                 for col in df.columns
                 if turbine in col and active_power_type_str == get_component_type(col)
             ]
-            expected_power_cols = [
+            this_expected_power_cols = [
                 col
                 for col in df.columns
                 if turbine in col and expected_power_type_str in col
             ]
-
-            # complete date range --used in multiple places
-            all_intervals = pd.date_range(
-                start=df.index.min(), end=df.index.max(), freq=self._freq
-            )
-
-            # drop missing records to create a coincident data set
-            df_input = df.loc[:, active_power_cols + expected_power_cols]
-
-            df_input_filtered = df_input[df_input > -1000].dropna()
-
-            if len(df_input_filtered) == 0:
+            if not this_active_power_cols or not this_expected_power_cols:
                 continue
+            turbines.append(turbine)
+            active_power_cols.append(this_active_power_cols[0])
+            expected_power_cols.append(this_expected_power_cols[0])
+            turbine_cols.append(this_active_power_cols + this_expected_power_cols)
 
-            df_input_filtered = df_input_filtered.groupby(
-                df_input_filtered.index.date
-            ).apply(lambda x: filter_days(x, threshold=daily_threshold))
-
-            df_input_filtered = df_input_filtered.reset_index(level="DateTime")
-            df_input_filtered = df_input_filtered.set_index("DateTime")
-            df_input_filtered = df_input_filtered.reindex(
-                all_intervals, fill_value=np.nan
-            )
+        # complete date range
+        all_intervals = pd.date_range(
+            start=df.index.min(), end=df.index.max(), freq=self._freq
+        )
 
-            # Calculate the lost energy and add it to the dataframe
-            # This can be non zero when efficiency is missing because
-            # efficiency is calculated on a 24 hour rolling sum subject to
-            # a 90% recovery threshold
-            lost_energy_frame[turbine + "-LOST-ENERGY"] = (
-                df_input_filtered[active_power_cols].iloc[:, 0]
-                - df_input_filtered[expected_power_cols].iloc[:, 0]
-            ) / 6000
-
-            # The filter above handles the recovery of the cleaned data
-            # removing any days that have low recovery. The filter below handles
-            # the recovery of the rolling window which is only applied to
-            # the efficiency calculation because of the potential noisiness of its values
-            rolling_window = 144
-            min_valid_count = int(
-                0.9 * rolling_window
-            )  # at least 90% of the values must be valid
-
-            # Calculate the rolling sums for the numerator and denominator
-            numerator_rolling_sum = (
-                df_input_filtered[active_power_cols]
-                .iloc[:, 0]
-                .rolling(rolling_window, min_periods=min_valid_count)
-                .sum()
-            )
-            denominator_rolling_sum = (
-                df_input_filtered[expected_power_cols]
-                .iloc[:, 0]
-                .rolling(rolling_window, min_periods=min_valid_count)
-                .sum()
-            )
-            df_input_filtered["ap_rolling"] = numerator_rolling_sum
-            df_input_filtered["ep_rolling"] = denominator_rolling_sum
+        if not turbines:
+            return pd.DataFrame(), pd.DataFrame()
+
+        # drop missing records to create a coincident data set: a record is
+        # valid for a turbine when all of its columns are
+        valid_values = (df > -1000).to_numpy()
+        column_positions = {col: i for i, col in enumerate(df.columns)}
+        coincident = np.column_stack(
+            [
+                valid_values[:, [column_positions[col] for col in cols]].all(axis=1)
+                for cols in turbine_cols
+            ]
+        )
 
-            # Handle cases where the denominator is zero to avoid dividing by zero
-            mask = denominator_rolling_sum == 0
-            denominator_rolling_sum[
-                mask
-            ] = 1  # replace zeros with ones; this won't affect the result where the numerator is also zero
+        # turbines without any valid record are left out
+        has_records = coincident.any(axis=0)
+        if not has_records.any():
+            return pd.DataFrame(), pd.DataFrame()
+        turbines = [x for x, keep in zip(turbines, has_records) if keep]
+        active_power_cols = [x for x, keep in zip(active_power_cols, has_records) if keep]
+        expected_power_cols = [x for x, keep in zip(expected_power_cols, has_records) if keep]
+
+        # remove the days with low recovery of each turbine as a mask, then
+        # complete the date range
+        coincident = filter_low_recovery_days(
+            pd.DataFrame(
+                np.where(coincident[:, has_records], 1.0, np.nan),
+                index=df.index,
+                columns=turbines,
+            ),
+            threshold=daily_threshold,
+        )
+        coincident = coincident.reindex(df.index).notna().to_numpy()
+        active_power = (
+            df[active_power_cols].set_axis(turbines, axis=1).where(coincident)
+        ).reindex(all_intervals)
+        expected_power = (
+            df[expected_power_cols].set_axis(turbines, axis=1).where(coincident)
+        ).reindex(all_intervals)
+
+        # Calculate the lost energy of every turbine
+        # This can be non zero when efficiency is missing because
+        # efficiency is calculated on a 24 hour rolling sum subject to
+        # a 90% recovery threshold
+        lost_energy_frame = (active_power - expected_power) / 6000
+        lost_energy_frame.columns = [f"{turbine}-LOST-ENERGY" for turbine in turbines]
+
+        # The filter above handles the recovery of the cleaned data
+        # removing any days that have low recovery. The filter below handles
+        # the recovery of the rolling window which is only applied to
+        # the efficiency calculation because of the potential noisiness of its values
+        rolling_window = 144
+        min_valid_count = int(
+            0.9 * rolling_window
+        )  # at least 90% of the values must be valid
+
+        # Calculate the rolling sums for the numerator and denominator, for
+        # all turbines at once
+        numerator_rolling_sum = active_power.rolling(
+            rolling_window, min_periods=min_valid_count
+        ).sum()
+        denominator_rolling_sum = expected_power.rolling(
+            rolling_window, min_periods=min_valid_count
+        ).sum()
+
+        # Handle cases where the denominator is zero to avoid dividing by zero
+        # replace zeros with ones; this won't affect the result where the numerator is also zero
+        denominator_rolling_sum = denominator_rolling_sum.mask(
+            denominator_rolling_sum == 0, 1
+        )
 
-            # Calculate the efficiency using the rolling sums and update the dataframe
-            efficiency_frame[turbine + "-EFFICIENCY"] = (
-                numerator_rolling_sum / denominator_rolling_sum
-            ).fillna(-9999)
+        # Calculate the efficiency using the rolling sums
+        efficiency_frame = (numerator_rolling_sum / denominator_rolling_sum).fillna(-9999)
+        efficiency_frame.columns = [f"{turbine}-EFFICIENCY" for turbine in turbines]
 
         return lost_energy_frame, efficiency_frame
 
@@ -1496,7 +1689,7 @@ class CalculatedFarmComponent:
 
         return aggregated_df
 
-    @functools.lru_cache(maxsize=None)
+    @cache_per_instance
     def get_severity_scores(self, period="6H", density_thresh=0, n_std=0):
         """
         Calculates severity scores for each turbine-component in the input data over time, based on the number of
@@ -1549,10 +1742,8 @@ class CalculatedFarmComponent:
             z_scores=self._z_scores, period=36, density_thresh=density_thresh  # minutes
         )
 
-        # Group by day and calculate daily sums
-        daily_severity = window_severity_frame.groupby(
-            window_severity_frame.index.date
-        ).apply(lambda x: x.apply(custom_sum))
+        # Group by day and calculate daily sums, NaN for days without any window
+        daily_severity = calculate_daily_sums(window_severity_frame)
 
         return daily_severity
 
@@ -1624,7 +1815,7 @@ class CalculatedYawErrorFarmComponent(CalculatedFarmComponent):
         yaw_error_dfs = []
 
         # Find all the turbine names in the dataframe
-        turbines = set([get_turbine(col) for col in df.columns])
+        turbines = dict.fromkeys(get_turbine(col) for col in df.columns)
 
         yaw_pos_type_str = component_type_map(
             ComponentTypes.YAW_POSITION.value, rtn_property_str=False
@@ -1633,7 +1824,8 @@ class CalculatedYawErrorFarmComponent(CalculatedFarmComponent):
             ComponentTypes.NACELLE_WIND_DIRECTION.value, rtn_property_str=False
         )[0]
 
-        # Loop through each turbine
+        # Loop through each turbine. They are not run in threads: the 1D
+        # rank filter of rolling_median holds the GIL
         for turbine in turbines:
             # Get the columns for this turbine's yaw pos and nac wd
             yaw_pos_cols = [
@@ -1675,13 +1867,21 @@ class CalculatedYawErrorFarmComponent(CalculatedFarmComponent):
             min_periods = int(rolling_window_size * minimum_valid_window_pct)
 
             # Compute rolling average yaw error
-            rolling_avg_yaw_error = yaw_error.rolling(
-                window=rolling_window_size, min_periods=min_periods
-            ).median()
+            rolling_avg_yaw_error = pd.Series(
+                rolling_median(
+                    yaw_error.to_numpy(), rolling_window_size, min_periods=min_periods
+                ),
+                index=yaw_error.index,
+            )
 
-            rolling_avg_yaw_error = rolling_avg_yaw_error.groupby(
-                rolling_avg_yaw_error.index
-            ).agg("first")
+            # keep the first value of any repeated timestamp
+            if not (
+                rolling_avg_yaw_error.index.is_unique
+                and rolling_avg_yaw_error.index.is_monotonic_increasing
+            ):
+                rolling_avg_yaw_error = rolling_avg_yaw_error.groupby(
+                    rolling_avg_yaw_error.index
+                ).agg("first")
 
             yaw_error_dfs.append(
                 rolling_avg_yaw_error.to_frame(name=turbine + "-YAW-ERROR")
@@ -1693,7 +1893,7 @@ class CalculatedYawErrorFarmComponent(CalculatedFarmComponent):
 
         return result_df
 
-    @functools.lru_cache(maxsize=None)
+    @cache_per_instance
     def get_severity_scores(self, period="6H", density_thresh=0, n_std=1):
         """
         Calculates severity scores for each turbine-component in the input data over time, based on the number of
@@ -0,0 +1,172 @@
+"""The daily outputs of a wind farm, without the wind farm.
+
+`Fleet` only combines a few daily frames of each farm: the daily means,
+efficiency, lost energy and revenue, the severity scores and the power
+curves. `WindFarmOutputs` holds those frames by name, so that they can be
+kept (or sent back from a worker process) instead of the `WindFarm` and
+all of its data. `ChunkedWindFarm` builds them one date window at a time.
+"""
+
+import pandas as pd
+
+from Model.Constants.General import DO_NOT_CALCULATE_SEVERITY
+from Model.WindFarm import CalculatedFarmComponent, FarmComponent
+from Utils.Enums import ComponentTypes
+from Utils.Transformers import get_component_type, get_turbine
+
+
+SEVERITY_OUTPUT_PREFIX = "severity:"
+
+
+def get_windfarm_outputs(windfarm, n_std=1, with_powercurves=False):
+    """Compute the daily outputs of a wind farm.
+
+    Args:
+        windfarm (WindFarm): The farm.
+        n_std (float): The n_std of the severity scores.
+        with_powercurves (bool): Whether to compute the power curves too.
+
+    Returns:
+        (dict): The daily frames, by name. The severity scores of each
+            component are named "severity:<component>".
+    """
+    outputs = {}
+
+    daily_means = [
+        component.daily_mean
+        for name, component in windfarm.components.items()
+        if isinstance(component, FarmComponent)
+        and not any(x.lower() in name.lower() for x in ["yaw", "dir"])
+    ]
+    daily_means = [daily_mean for daily_mean in daily_means if daily_mean is not None]
+    if daily_means:
+        outputs["daily_mean"] = pd.concat(daily_means, axis=1)
+
+    lost_energy = windfarm.components.get(ComponentTypes.LOST_ENERGY.value)
+    if isinstance(lost_energy, CalculatedFarmComponent):
+        outputs["daily_efficiency"] = lost_energy.daily_efficiency
+        outputs["daily_lost_energy"] = lost_energy.daily_lost_energy
+        outputs["daily_lost_revenue"] = lost_energy.daily_lost_revenue
+
+    for name, component in windfarm.components.items():
+        if name in DO_NOT_CALCULATE_SEVERITY:
+            continue
+        _, daily_severity_scores = component.get_flagged_turbines(n_std=n_std)
+        outputs[f"{SEVERITY_OUTPUT_PREFIX}{name}"] = daily_severity_scores
+
+    if with_powercurves:
+        outputs["powercurves"] = windfarm.powercurves
+        outputs["powercurve_distributions"] = windfarm.powercurve_distributions
+
+    return outputs
+
+
+class WindFarmOutputs:
+    """The daily outputs of a wind farm, with the interface `Fleet` uses."""
+
+    def __init__(self, project, technology=None, outputs=None, n_std=1):
+        """Initializes a new instance of the class.
+
+        Args:
+            project (str): See `WindFarm`.
+            technology (str): See `WindFarm`.
+            outputs (dict, optional): The daily frames, by name, as returned
+                by `get_windfarm_outputs`.
+            n_std (float): The n_std the severity scores were computed with.
+        """
+        self.name = project
+        self.technology = technology
+        self._outputs = outputs
+        self._n_std = n_std
+
+    def _process(self):
+        """Return the daily frames, by name."""
+        return self._outputs
+
+    def _get_output(self, name):
+        return self._process().get(name, pd.DataFrame())
+
+    @property
+    def daily_mean(self):
+        """Daily means of every component, like `Fleet.get_daily_mean` for one farm."""
+        return self._get_output("daily_mean")
+
+    @property
+    def daily_efficiency(self):
+        """See `CalculatedFarmComponent.daily_efficiency`."""
+        return self._get_output("daily_efficiency")
+
+    @property
+    def daily_lost_energy(self):
+        """See `CalculatedFarmComponent.daily_lost_energy`."""
+        return self._get_output("daily_lost_energy")
+
+    @property
+    def daily_lost_revenue(self):
+        """See `CalculatedFarmComponent.daily_lost_revenue`."""
+        return self._get_output("daily_lost_revenue")
+
+    @property
+    def powercurves(self):
+        """See `WindFarm.powercurves`."""
+        return self._get_output("powercurves")
+
+    @property
+    def powercurve_distributions(self):
+        """See `WindFarm.powercurve_distributions`."""
+        return self._get_output("powercurve_distributions")
+
+    @property
+    def daily_severity_scores(self):
+        """(dict): The daily severity scores of each component."""
+        return {
+            name[len(SEVERITY_OUTPUT_PREFIX) :]: output
+            for name, output in self._process().items()
+            if name.startswith(SEVERITY_OUTPUT_PREFIX)
+        }
+
+    def get_flagged_turbines(
+        self,
+        start=None,
+        end=None,
+        period="6H",
+        density_thresh=0.9,
+        n_std=1,
+        top_n=100,
+        max_workers=None,
+        executor="thread",
+    ):
+        """See `WindFarm.get_flagged_turbines`.
+
+        The severity scores are computed with the outputs, so `n_std` must
+        be the one they were computed with, and `max_workers` and
+        `executor` are ignored.
+        """
+        if n_std != self._n_std:
+            raise ValueError(
+                f"{type(self).__name__}: the severity scores were computed with "
+                f"n_std={self._n_std}, not {n_std}."
+            )
+        all_turbines = []
+        severity_scores = []
+        for daily_severity_scores in self.daily_severity_scores.values():
+            this_start = daily_severity_scores.index[0] if start is None else start
+            this_end = daily_severity_scores.index[-1] if end is None else end
+            if isinstance(this_start, str):
+                this_start = pd.to_datetime(this_start)
+            if isinstance(this_end, str):
+                this_end = pd.to_datetime(this_end)
+            turbine_scores = daily_severity_scores.loc[this_start:this_end].sum()
+            all_turbines.append(turbine_scores.nlargest(top_n))
+            severity_scores.append(daily_severity_scores)
+
+        daily_severities = pd.concat(severity_scores, axis=1)
+        flagged_turbines = pd.concat(all_turbines).sort_values(ascending=False)
+        flagged_turbines = pd.DataFrame(
+            list(flagged_turbines.items()), columns=["Turbine", "Severity"]
+        )
+        flagged_turbines["Turbine"] = flagged_turbines["Turbine"].apply(
+            lambda x: f"{get_turbine(x)}-{get_component_type(x)}"
+        )
+
+        return flagged_turbines, daily_severities
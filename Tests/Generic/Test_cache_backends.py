@@ -0,0 +1,150 @@
+"""Test the storage backends of the result cache."""
+
+import datetime
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from Model.CacheBackends import CacheEntry, DiskCacheBackend, MemoryCacheBackend
+from Model.QueryCache import QueryCache, create_default_backend
+
+
+def _metrics_frame(rows=3):
+    return pd.DataFrame(
+        {
+            "date": pd.date_range("2024-07-26", periods=rows),
+            "ADB-BLK01-PCS002-WS1-GHI_cosine": np.arange(rows, dtype=float),
+        }
+    ).set_index("date")
+
+
+def test_workers_share_results(tmp_path):
+    """Two caches on the same directory behave like two gunicorn workers."""
+    worker_1 = QueryCache(backend=DiskCacheBackend(str(tmp_path)), enabled=True)
+    worker_2 = QueryCache(backend=DiskCacheBackend(str(tmp_path)), enabled=True)
+
+    df = _metrics_frame()
+    worker_1.set("wind_performance_metrics", df, ttl=60, versions="(1,)")
+    found, cached_df = worker_2.get("wind_performance_metrics", versions="(1,)")
+    assert found
+    assert_frame_equal(cached_df, df, check_freq=False)
+
+    found, _ = worker_2.get("wind_performance_metrics", versions="(2,)")
+    assert not found
+    assert worker_2.stats["invalidated"] == 1
+    assert len(worker_1) == 0
+
+
+def test_non_frame_and_multiindex_values_are_not_pickled(tmp_path):
+    backend = DiskCacheBackend(str(tmp_path))
+    values = {
+        "plants": ["ADB", "TRQ"],
+        "date_range": (datetime.date(2024, 7, 26), pd.Timestamp("2024-08-01 10:00")),
+        "options": [{"label": "Gearbox", "value": 101}],
+    }
+    for key, value in values.items():
+        backend.set(key, CacheEntry(time.time() + 60, "()", value))
+        assert backend.get(key).value == value
+
+    df = _metrics_frame()
+    df.columns = pd.MultiIndex.from_product([["Gbx_Oil_Temp"], ["temperature"]])
+    backend.set("by_component", CacheEntry(time.time() + 60, "()", df))
+    assert_frame_equal(backend.get("by_component").value, df, check_freq=False)
+
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".pickle")]
+
+
+def test_pickles_are_never_loaded(tmp_path):
+    backend = DiskCacheBackend(str(tmp_path))
+    backend.set("plants", CacheEntry(time.time() + 60, "()", ["ADB"]))
+    with open(backend._meta_path("plants")) as f:
+        meta = json.load(f)
+    meta["format"] = "pickle"
+    with open(backend._meta_path("plants"), "w") as f:
+        json.dump(meta, f)
+    with open(backend._data_path("plants", "pickle"), "wb") as f:
+        pickle.dump(["TRQ"], f)
+    assert backend.get("plants") is None
+
+
+def test_unstorable_values_are_skipped(tmp_path):
+    backend = DiskCacheBackend(str(tmp_path))
+    assert backend.set("object", CacheEntry(time.time() + 60, "()", object())) == 0
+    assert backend.get("object") is None
+
+
+def test_changing_format_removes_the_old_data_file(tmp_path):
+    backend = DiskCacheBackend(str(tmp_path))
+    # as left by an older version
+    with open(backend._data_path("dates", "pickle"), "wb") as f:
+        pickle.dump([], f)
+    backend.set("dates", CacheEntry(time.time() + 60, "()", _metrics_frame()))
+    assert not os.path.exists(backend._data_path("dates", "pickle"))
+
+    backend.set("dates", CacheEntry(time.time() + 60, "()", ["2024-07-26"]))
+    assert not os.path.exists(backend._data_path("dates", "parquet"))
+    assert backend.get("dates").value == ["2024-07-26"]
+
+
+def test_lock_files_are_cleaned_up(tmp_path):
+    backend = DiskCacheBackend(str(tmp_path))
+    locks_directory = os.path.join(tmp_path, "locks")
+    with backend.key_lock("failed"):
+        pass
+    with backend.key_lock("running"):
+        with backend.key_lock("deleted"):
+            pass
+        backend.set("deleted", CacheEntry(time.time() + 60, "()", []))
+        backend.delete("deleted")
+        # only the lock of the computation in progress is left
+        assert os.listdir(locks_directory) == [backend._file_stem("running") + ".lock"]
+    backend.set("other", CacheEntry(time.time() + 60, "()", []))
+    assert os.listdir(locks_directory) == []
+
+
+@pytest.mark.skipif(not hasattr(os, "geteuid"), reason="POSIX permissions")
+def test_directory_must_be_private(tmp_path):
+    backend = DiskCacheBackend(str(tmp_path / "cache"))
+    assert os.stat(backend.directory).st_mode & 0o777 == 0o700
+
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    os.chmod(shared, 0o777)
+    with pytest.raises(PermissionError):
+        DiskCacheBackend(str(shared))
+
+
+def test_default_backend_refuses_a_shared_directory(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    os.chmod(shared, 0o777)
+    monkeypatch.setenv("ALT_ISIGHT_CACHE_DIR", str(shared))
+    assert isinstance(create_default_backend(), MemoryCacheBackend)
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    backend = DiskCacheBackend(str(tmp_path))
+    backend.set("first", CacheEntry(time.time() + 60, "()", _metrics_frame(500)))
+    one_entry_bytes = sum(
+        os.path.getsize(os.path.join(tmp_path, name))
+        for name in os.listdir(tmp_path)
+        if name.endswith(".parquet")
+    )
+    backend.max_bytes = int(one_entry_bytes * 2.5)
+
+    backend.set("second", CacheEntry(time.time() + 60, "()", _metrics_frame(500)))
+    # make "first" the most recently read entry
+    os.utime(backend._meta_path("second"), (0, 0))
+    assert backend.get("first") is not None
+
+    evicted = backend.set("third", CacheEntry(time.time() + 60, "()", _metrics_frame(500)))
+    assert evicted == 1
+    assert backend.get("second") is None
+    assert backend.get("first") is not None
+    assert backend.get("third") is not None
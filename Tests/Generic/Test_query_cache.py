@@ -0,0 +1,97 @@
+"""Test the result cache of the Repository."""
+
+import pandas as pd
+import pytest
+
+from Model import QueryCache as query_cache_module
+from Model.CacheBackends import MemoryCacheBackend
+from Model.QueryCache import QueryCache, cached_query
+
+
+class FakeRepository:
+    """Count the queries that actually reach the 'database'."""
+
+    def __init__(self):
+        self.calls = 0
+        self.table_versions = {}
+
+    def _get_catalog_path(self, catalog_name):
+        return f"{catalog_name}_catalog"
+
+    def get_table_version(self, table_name, catalog_name=None):
+        return self.table_versions.get(table_name, 1)
+
+    @cached_query(tables=("isight.metrics",), ttl=60)
+    def get_metrics_data(self, start_date, end_date, plant=None):
+        self.calls += 1
+        return pd.DataFrame({"value": [1.0, 2.0], "plant": [plant, plant]})
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    cache = QueryCache(
+        backend=MemoryCacheBackend(max_entries=2),
+        version_check_interval=0,
+        enabled=True,
+    )
+    monkeypatch.setattr(query_cache_module, "QUERY_CACHE", cache)
+    return cache
+
+
+def test_identical_calls_hit_the_cache(fresh_cache):
+    repo = FakeRepository()
+    first = repo.get_metrics_data("2024-01-01", "2024-01-31", plant=["ADB"])
+    second = repo.get_metrics_data("2024-01-01", end_date="2024-01-31", plant=["ADB"])
+    assert repo.calls == 1
+    assert fresh_cache.stats["hits"] == 1
+    pd.testing.assert_frame_equal(first, second)
+
+    repo.get_metrics_data("2024-01-01", "2024-01-31", plant=["TRQ"])
+    assert repo.calls == 2
+
+
+def test_cached_results_are_copies(fresh_cache):
+    repo = FakeRepository()
+    first = repo.get_metrics_data("2024-01-01", "2024-01-31")
+    first["value"] = -1
+    second = repo.get_metrics_data("2024-01-01", "2024-01-31")
+    assert list(second["value"]) == [1.0, 2.0]
+
+
+def test_table_refresh_invalidates(fresh_cache):
+    repo = FakeRepository()
+    repo.get_metrics_data("2024-01-01", "2024-01-31")
+    repo.table_versions["solar_catalog.isight.metrics"] = 2
+    repo.get_metrics_data("2024-01-01", "2024-01-31")
+    assert repo.calls == 2
+    assert fresh_cache.stats["invalidated"] == 1
+
+
+def test_ttl_expiry(fresh_cache, monkeypatch):
+    repo = FakeRepository()
+    now = [1000.0]
+    monkeypatch.setattr(query_cache_module.time, "time", lambda: now[0])
+    repo.get_metrics_data("2024-01-01", "2024-01-31")
+    now[0] += 30
+    repo.get_metrics_data("2024-01-01", "2024-01-31")
+    assert repo.calls == 1
+    now[0] += 31
+    repo.get_metrics_data("2024-01-01", "2024-01-31")
+    assert repo.calls == 2
+    assert fresh_cache.stats["expired"] == 1
+
+
+def test_lru_eviction(fresh_cache):
+    repo = FakeRepository()
+    repo.get_metrics_data("2024-01-01", "2024-01-31", plant="A")
+    repo.get_metrics_data("2024-01-01", "2024-01-31", plant="B")
+    repo.get_metrics_data("2024-01-01", "2024-01-31", plant="A")
+    repo.get_metrics_data("2024-01-01", "2024-01-31", plant="C")
+    assert len(fresh_cache) == 2
+    assert fresh_cache.stats["evicted"] == 1
+
+    # "B" was the least recently used, so it is the one that was evicted
+    repo.get_metrics_data("2024-01-01", "2024-01-31", plant="A")
+    assert repo.calls == 3
+    repo.get_metrics_data("2024-01-01", "2024-01-31", plant="B")
+    assert repo.calls == 4
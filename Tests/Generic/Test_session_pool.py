@@ -0,0 +1,103 @@
+"""Test the process-wide Spark Session Pool."""
+
+import threading
+
+from Model.SessionPool import SparkSessionPool
+
+
+class FakeSession:
+    def __init__(self, catalog_name, healthy=True):
+        self.catalog_name = catalog_name
+        self.healthy = healthy
+
+    def sql(self, query):
+        if not self.healthy:
+            raise ConnectionError("session expired")
+        return self
+
+    def collect(self):
+        return [(1,)]
+
+
+def test_session_is_reused_per_catalog():
+    pool = SparkSessionPool()
+    created = []
+
+    def factory(catalog_name):
+        created.append(catalog_name)
+        return FakeSession(catalog_name)
+
+    solar = pool.get_session("solar", factory)
+    wind = pool.get_session("wind", factory)
+    assert pool.get_session("Solar", factory) is solar
+    assert pool.get_session("wind", factory) is wind
+    assert pool.get_session("solar", factory) is solar
+
+    assert created == ["solar", "wind"]
+    assert pool.stats["created"] == 2
+    assert pool.stats["reused"] == 3
+
+
+def test_unhealthy_session_is_rebuilt():
+    pool = SparkSessionPool(health_check_interval=0)
+    first = pool.get_session("solar", FakeSession)
+    first.healthy = False
+
+    second = pool.get_session("solar", FakeSession)
+    assert second is not first
+    assert pool.stats["created"] == 2
+    assert pool.stats["reconnected"] == 1
+    assert pool.stats["failed_health_checks"] == 1
+
+    assert pool.get_session("solar", FakeSession) is second
+    assert pool.stats["reused"] == 1
+
+
+def test_invalidate_forces_reconnect():
+    pool = SparkSessionPool()
+    first = pool.get_session("wind", FakeSession)
+    pool.invalidate("wind")
+    assert pool.get_session("wind", FakeSession) is not first
+    assert pool.stats["created"] == 2
+
+
+def test_health_check_interval_counts_from_last_use():
+    pool = SparkSessionPool(health_check_interval=60)
+    session = pool.get_session("solar", FakeSession)
+    session.healthy = False
+    # used again and again within the interval, so never pinged
+    for _ in range(3):
+        assert pool.get_session("solar", FakeSession) is session
+    assert pool.stats["failed_health_checks"] == 0
+
+
+def test_slow_catalog_does_not_block_the_others():
+    pool = SparkSessionPool()
+    factory_entered = threading.Event()
+    release_factory = threading.Event()
+    created = []
+
+    def slow_factory(catalog_name):
+        created.append(catalog_name)
+        factory_entered.set()
+        assert release_factory.wait(timeout=10)
+        return FakeSession(catalog_name)
+
+    solar_threads = [
+        threading.Thread(target=pool.get_session, args=("solar", slow_factory))
+        for _ in range(2)
+    ]
+    for thread in solar_threads:
+        thread.start()
+    assert factory_entered.wait(timeout=10)
+
+    # the solar session is still being built
+    wind = pool.get_session("wind", FakeSession)
+    assert wind.catalog_name == "wind"
+
+    release_factory.set()
+    for thread in solar_threads:
+        thread.join(timeout=10)
+    # the second solar caller waited for the first one's session
+    assert created == ["solar"]
+    assert pool.stats["created"] == 2
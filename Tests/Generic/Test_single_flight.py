@@ -0,0 +1,108 @@
+"""Test the coalescing of concurrent identical queries."""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from Model import QueryCache as query_cache_module
+from Model.QueryCache import QueryCache, SingleFlight, cached_query
+
+
+class SlowRepository:
+    """A repository whose query blocks until it is released."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def _get_catalog_path(self, catalog_name):
+        return f"{catalog_name}_catalog"
+
+    def get_table_version(self, table_name, catalog_name=None):
+        return 1
+
+    @cached_query(tables=("isight.clean_data",))
+    def get_inverter_performance_power_online_filter(self, inverter, plant, start_date, end_date):
+        self.calls += 1
+        self.release.wait(timeout=5)
+        return pd.DataFrame({"ActivePower": [1.0, 2.0, 3.0]})
+
+
+def _run_concurrently(func, count):
+    results = [None] * count
+
+    def target(i):
+        results[i] = func()
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+@pytest.mark.parametrize("cache_enabled", [True, False])
+def test_drill_down_subcharts_share_one_query(monkeypatch, cache_enabled):
+    """The three subcharts of a click ask for the same data at once."""
+    monkeypatch.setattr(query_cache_module, "QUERY_CACHE", QueryCache(enabled=cache_enabled))
+    single_flight = SingleFlight()
+    monkeypatch.setattr(query_cache_module, "SINGLE_FLIGHT", single_flight)
+
+    repo = SlowRepository()
+    threads, results = _run_concurrently(
+        lambda: repo.get_inverter_performance_power_online_filter(
+            "ADB-INV01", "ADB", "2024-07-01", "2024-07-31",
+        ),
+        count=3,
+    )
+    _wait_for(lambda: single_flight.stats["coalesced"] == 2)
+    repo.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert repo.calls == 1
+    for result in results:
+        assert list(result["ActivePower"]) == [1.0, 2.0, 3.0]
+    # every caller gets its own frame
+    assert len({id(result) for result in results}) == 3
+
+
+def test_errors_are_shared():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing_query():
+        started.set()
+        release.wait(timeout=5)
+        raise ValueError("query failed")
+
+    errors = []
+
+    def call():
+        try:
+            single_flight.do("key", failing_query)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(timeout=5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    _wait_for(lambda: single_flight.stats["coalesced"] == 1)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2
+    # the next call starts a new computation
+    assert single_flight.do("key", lambda: 42) == (42, False)
@@ -0,0 +1,514 @@
+"""Test the counting of the Spark actions run by each repository call."""
+
+import operator
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from pyspark.sql import Row
+from pyspark.sql.connect import expressions
+from pyspark.sql.connect.dataframe import DataFrame as ConnectDataFrame
+from pyspark.sql.functions import col
+from pyspark.sql.types import DateType
+
+import Model.DataAccess as DataAccess
+import Model.QueryCache as QueryCacheModule
+from Model.ColumnCatalog import COLUMN_CATALOGS
+from Model.DataAccess import Databricks_Repository
+from Model.QueryCache import QueryCache
+from Model.SparkActions import SPARK_ACTIONS, SparkActionCounter
+
+
+def _column_name(column):
+    """The name of a column given as a string or a `Column`."""
+    if isinstance(column, str):
+        return column
+    if hasattr(column._expr, "_alias"):
+        return column._expr._alias[0]
+    return column._expr._unparsed_identifier
+
+
+class FakeSparkFrame:
+    """Just enough of a PySpark DataFrame to run the repository methods.
+
+    The filters are ignored, and every action returns one row, whose
+    values come from `values` (1.0 by default).
+    """
+
+    def __init__(self, columns, values=None):
+        self.columns = [_column_name(c) for c in columns]
+        self.values = values if values is not None else {}
+
+    def _with_columns(self, columns):
+        return FakeSparkFrame(columns, self.values)
+
+    @property
+    def dtypes(self):
+        return [
+            (col_name, "date" if col_name == "date" else "double")
+            for col_name in self.columns
+        ]
+
+    def __getattr__(self, name):
+        if name in self.__dict__.get("columns", []):
+            return col(name)
+        raise AttributeError(name)
+
+    def __getitem__(self, name):
+        return col(name)
+
+    def filter(self, condition):
+        return self
+
+    def orderBy(self, *cols):
+        return self
+
+    def withColumnRenamed(self, existing, new):
+        return self._with_columns([new if c == existing else c for c in self.columns])
+
+    def withColumn(self, name, column):
+        return self._with_columns(self.columns + [name])
+
+    def select(self, *cols):
+        return self._with_columns(cols)
+
+    def agg(self, *exprs):
+        return self._with_columns(exprs)
+
+    def groupBy(self, *cols):
+        frame = self
+
+        class GroupedData:
+            def agg(self, *exprs):
+                return frame._with_columns(list(cols) + list(exprs))
+
+        return GroupedData()
+
+    def join(self, other, on, how="inner"):
+        return self._with_columns(
+            self.columns + [c for c in other.columns if c != on]
+        )
+
+    def crossJoin(self, other):
+        return self._with_columns(self.columns + other.columns)
+
+    def unionByName(self, other):
+        return self
+
+    def take(self, num):
+        return self.collect()[:num]
+
+    def first(self):
+        return self.take(1)[0]
+
+    def collect(self):
+        return [Row(**{c: self.values.get(c, 1.0) for c in self.columns})]
+
+    def toPandas(self):
+        return pd.DataFrame({c: [self.values.get(c, 1.0)] for c in self.columns})
+
+
+COMPARISONS = {
+    "==": operator.eq,
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+    "and": operator.and_,
+    "or": operator.or_,
+}
+AGGREGATES = {
+    "max": lambda values: values.max(),
+    "avg": lambda values: values.mean(),
+    "sum": lambda values: values.sum(min_count=1),
+}
+
+
+def _evaluate(expr, data):
+    """Evaluate a Spark Connect expression on the rows of a pandas frame."""
+    if isinstance(expr, expressions.ColumnAlias):
+        return _evaluate(expr._child, data)
+    if isinstance(expr, expressions.ColumnReference):
+        return data[expr._unparsed_identifier]
+    if isinstance(expr, expressions.LiteralExpression):
+        value = expr._value
+        if isinstance(expr._dataType, DateType):
+            value = date(1970, 1, 1) + timedelta(days=value)
+        return pd.Series([value] * len(data), index=data.index, dtype=object)
+    if isinstance(expr, expressions.CaseWhen):
+        result = pd.Series(None, index=data.index, dtype=object)
+        if expr._else_value is not None:
+            result = _evaluate(expr._else_value, data).astype(object)
+        for condition, value in reversed(expr._branches):
+            matches = _evaluate(condition, data).fillna(False).astype(bool)
+            result = result.where(~matches, _evaluate(value, data).astype(object))
+        # like Spark, the type of the values, not of the CASE
+        return result.infer_objects()
+    if isinstance(expr, expressions.UnresolvedFunction):
+        args = [_evaluate(arg, data) for arg in expr._args]
+        if expr._name == "isnull":
+            return args[0].isna()
+        return COMPARISONS[expr._name](*args)
+    raise NotImplementedError(repr(expr))
+
+
+def _aggregate(expr, data):
+    """Evaluate an aggregate expression on a group of rows."""
+    if isinstance(expr, expressions.ColumnAlias):
+        return _aggregate(expr._child, data)
+    [arg] = expr._args
+    values = pd.to_numeric(_evaluate(arg, data).dropna())
+    result = AGGREGATES[expr._name](values)
+    return None if pd.isna(result) else result
+
+
+class PandasSparkFrame:
+    """A PySpark DataFrame evaluated with pandas, to check what a query returns."""
+
+    to_pandas_calls = 0
+
+    def __init__(self, data):
+        self.data = data.reset_index(drop=True)
+
+    @property
+    def columns(self):
+        return list(self.data.columns)
+
+    @property
+    def dtypes(self):
+        return [
+            (
+                col_name,
+                "date" if col_name == "date"
+                else "double" if pd.api.types.is_float_dtype(dtype)
+                else "string",
+            )
+            for col_name, dtype in self.data.dtypes.items()
+        ]
+
+    def __getattr__(self, name):
+        if name in self.__dict__.get("data", pd.DataFrame()).columns:
+            return col(name)
+        raise AttributeError(name)
+
+    def __getitem__(self, name):
+        return col(name)
+
+    def filter(self, condition):
+        keep = _evaluate(condition._expr, self.data).astype(bool)
+        return PandasSparkFrame(self.data[keep])
+
+    def orderBy(self, *cols):
+        names = [c if isinstance(c, str) else str(c._expr._child) for c in cols]
+        return PandasSparkFrame(self.data.sort_values(names, kind="stable"))
+
+    def withColumnRenamed(self, existing, new):
+        return PandasSparkFrame(self.data.rename(columns={existing: new}))
+
+    def select(self, *cols):
+        if len(cols) == 1 and isinstance(cols[0], list):
+            cols = cols[0]
+        return PandasSparkFrame(
+            pd.DataFrame(
+                {
+                    _column_name(c): (
+                        self.data[c]
+                        if isinstance(c, str)
+                        else _evaluate(c._expr, self.data)
+                    )
+                    for c in cols
+                },
+                index=self.data.index,
+            )
+        )
+
+    def agg(self, *exprs):
+        return PandasSparkFrame(
+            pd.DataFrame(
+                {_column_name(e): [_aggregate(e._expr, self.data)] for e in exprs}
+            )
+        )
+
+    def groupBy(self, *keys):
+        frame = self
+
+        class GroupedData:
+            def agg(self, *exprs):
+                rows = [
+                    dict(
+                        zip(keys, key if isinstance(key, tuple) else (key,)),
+                        **{_column_name(e): _aggregate(e._expr, group) for e in exprs},
+                    )
+                    for key, group in frame.data.groupby(list(keys), sort=True)
+                ]
+                return PandasSparkFrame(pd.DataFrame(rows))
+
+        return GroupedData()
+
+    def join(self, other, on, how="inner"):
+        return PandasSparkFrame(self.data.merge(other.data, on=on, how=how))
+
+    def toPandas(self):
+        PandasSparkFrame.to_pandas_calls += 1
+        return self.data.copy()
+
+
+class FakeSession:
+    def __init__(self, columns, values=None):
+        self.columns = columns
+        self.values = values if values is not None else {}
+        self.queries = []
+
+    def table(self, table_path):
+        return FakeSparkFrame(self.columns, self.values)
+
+    def sql(self, query):
+        self.queries.append(query)
+        return FakeSparkFrame(["lastModified"], {"lastModified": datetime(2024, 8, 1)})
+
+
+@pytest.fixture(autouse=True)
+def spark_actions():
+    with SPARK_ACTIONS.instrumented(FakeSparkFrame):
+        yield SPARK_ACTIONS
+
+
+@pytest.fixture(autouse=True)
+def query_cache(monkeypatch):
+    """A fresh result cache, used the way the app does."""
+    query_cache = QueryCache(enabled=True)
+    monkeypatch.setattr(QueryCacheModule, "QUERY_CACHE", query_cache)
+    monkeypatch.setattr(DataAccess, "QUERY_CACHE", query_cache)
+    return query_cache
+
+
+@pytest.fixture(autouse=True)
+def no_swallowed_errors(capsys):
+    """Fail the tests in which a repository prints an error and moves on."""
+    yield
+    out = capsys.readouterr().out
+    assert "Not able to" not in out, out
+
+
+class PandasSession(FakeSession):
+    """A session whose tables are pandas frames, by table name."""
+
+    def __init__(self, tables):
+        super().__init__([])
+        self.tables = tables
+
+    def table(self, table_path):
+        [data] = [
+            data for name, data in self.tables.items() if table_path.endswith(f".{name}")
+        ]
+        return PandasSparkFrame(data)
+
+
+def _make_conn(columns, values=None):
+    COLUMN_CATALOGS.clear()
+    conn = Databricks_Repository()
+    session = FakeSession(columns, values)
+    conn.get_session = lambda catalog_name=None: session
+    return conn, session
+
+
+@pytest.fixture
+def conn():
+    conn, _ = _make_conn([
+        "date",
+        "ADB-BLK01-PCS002-WS1-GHI_recovery",
+        "ADB-BLK01-PCS002-WS1-POA_recovery",
+        "TRQ-BLK03-PCS106-WS4-POA_recovery",
+    ])
+    return conn
+
+
+def test_nested_actions_are_counted_once():
+    counter = SparkActionCounter()
+
+    class Frame:
+        def take(self, num):
+            return self.collect()[:num]
+
+        def first(self):
+            return self.take(1)[0]
+
+        def collect(self):
+            return [1]
+
+    counter.instrument(Frame)
+    counter.instrument(Frame)
+    with counter.track("outer") as outer:
+        Frame().first()
+        with counter.track("inner") as inner:
+            Frame().collect()
+
+    assert inner.actions == 1
+    assert outer.actions == 2
+    assert outer.action_names == ["first", "collect"]
+    assert counter.stats == {"calls": 2, "actions": 2, "max_actions_per_call": 2}
+    assert counter.last_call_actions == {"inner": 1, "outer": 2}
+
+
+def test_actions_outside_a_call_are_not_charged():
+    counter = SparkActionCounter()
+
+    class Frame:
+        def collect(self):
+            return []
+
+    counter.instrument(Frame)
+    Frame().collect()
+    with counter.track("call") as call:
+        pass
+    assert call.actions == 0
+    assert counter.stats["actions"] == 1
+
+
+def test_uninstrument_restores_the_class():
+    counter = SparkActionCounter()
+
+    class Base:
+        def collect(self):
+            return []
+
+    class Frame(Base):
+        def take(self, num):
+            return []
+
+    take = Frame.take
+    with counter.instrumented(Frame):
+        assert Frame.take is not take
+        assert "collect" in Frame.__dict__
+    assert Frame.take is take
+    assert "collect" not in Frame.__dict__
+
+
+def test_connect_dataframe_is_not_instrumented_by_default():
+    assert not getattr(ConnectDataFrame.toPandas, "_counts_spark_actions", False)
+
+
+@pytest.mark.parametrize("measurement", ["POA", "BOM"])
+def test_get_recovery_data_runs_one_action(conn, measurement):
+    df = conn.get_recovery_data(
+        start_date=datetime(2024, 7, 1),
+        end_date=datetime(2024, 7, 31),
+        measurement=measurement,
+    )
+    assert SPARK_ACTIONS.last_call_actions["get_recovery_data"] == 1
+    if measurement == "POA":
+        assert len(df.columns) == 2
+    else:
+        assert list(df.columns) == ["date"]
+
+
+@pytest.mark.parametrize("measurement", ["POA", "BOM"])
+def test_get_metrics_data_runs_one_action(conn, measurement):
+    conn.get_metrics_data(
+        start_date=datetime(2024, 7, 1),
+        end_date=datetime(2024, 7, 31),
+        measurement=measurement,
+        should_aggregate=True,
+    )
+    assert SPARK_ACTIONS.last_call_actions["get_metrics_data"] == 1
+
+
+def test_table_versions_are_looked_up_outside_of_the_call():
+    conn, session = _make_conn(["date", "ADB-BLK01-PCS002-WS1-POA_recovery"])
+    conn.get_recovery_data(
+        start_date=datetime(2024, 7, 1),
+        end_date=datetime(2024, 7, 31),
+        measurement="POA",
+    )
+    assert len(session.queries) == 3
+    assert all(query.startswith("DESCRIBE DETAIL") for query in session.queries)
+
+
+def test_get_date_range_runs_one_action():
+    conn, _ = _make_conn(
+        ["date", "day"],
+        {
+            "min_date": date(2024, 1, 1),
+            "max_date": date(2024, 7, 31),
+            "inv_min_date": "2023-12-01",
+            "inv_max_date": "2024-07-30",
+        },
+    )
+    assert conn.get_date_range() == (date(2023, 12, 1), date(2024, 7, 31))
+    assert SPARK_ACTIONS.last_call_actions["get_date_range"] == 1
+
+
+def test_get_wind_date_range_runs_one_action():
+    conn, _ = _make_conn(
+        ["day", "element_name"], {"min_date": "2024-01-01", "max_date": "2024-07-31"}
+    )
+    assert conn.get_wind_date_range() == (date(2024, 1, 1), date(2024, 7, 31))
+    assert SPARK_ACTIONS.last_call_actions["get_wind_date_range"] == 1
+
+
+def test_gen_wind_yaw_error_data_by_turbine_runs_one_action():
+    conn, _ = _make_conn(
+        ["date", "day", "element_name", "yaw_error", "mean_efficiency"],
+        {"element_name": "BR2-K020", "aggr_yaw_error": 2.5, "aggr_efficiency": 0.9},
+    )
+    df = conn.gen_wind_yaw_error_data_by_turbine(date(2024, 7, 1), date(2024, 7, 31))
+    assert df.to_dict("index") == {
+        "BR2-K020": {"aggr_yaw_error": 2.5, "aggr_efficiency": 0.9}
+    }
+    assert SPARK_ACTIONS.last_call_actions["gen_wind_yaw_error_data_by_turbine"] == 1
+
+
+def test_get_metrics_data_masks_the_clear_sky_days_in_spark():
+    days = [date(2024, 7, 1), date(2024, 7, 2), date(2024, 7, 3)]
+    metrics = pd.DataFrame(
+        {
+            "date": days,
+            "ADB-BLK01-PCS002-WS1-POA_recovery": [1.0, 2.0, 4.0],
+            "ADB-BLK01-PCS002-WS1-BOM_recovery": [10.0, 20.0, 60.0],
+            "TRQ-BLK03-PCS106-WS4-POA_recovery": [100.0, 200.0, 400.0],
+        }
+    )
+    clear_sky = pd.DataFrame(
+        {
+            "date_clear_sky": [days[0], days[2], days[1], days[2]],
+            "plant_abbrev_clear_sky": ["ADB", "ADB", "TRQ", "TRQ"],
+            "is_clear_sky_day": [1, 1, 1, 0],
+        }
+    )
+    COLUMN_CATALOGS.clear()
+    conn = Databricks_Repository()
+    session = PandasSession(
+        {"isight.metrics": metrics, "isight.clear_sky_days": clear_sky}
+    )
+    conn.get_session = lambda catalog_name=None: session
+
+    PandasSparkFrame.to_pandas_calls = 0
+    with SPARK_ACTIONS.instrumented(PandasSparkFrame):
+        df = conn.get_metrics_data(
+            start_date=datetime(2024, 7, 1),
+            end_date=datetime(2024, 7, 31),
+            should_aggregate=True,
+            only_clear_sky_days=True,
+        )
+
+    # the values of the clear sky days of each plant are left out
+    assert df.to_dict("records") == [
+        {
+            "ADB-BLK01-PCS002-WS1-BOM_recovery": 20.0,
+            "ADB-BLK01-PCS002-WS1-POA_recovery": 2.0,
+            "TRQ-BLK03-PCS106-WS4-POA_recovery": 500.0,
+        }
+    ]
+    # like the pandas masking
+    pandas_clear_sky = clear_sky[clear_sky["is_clear_sky_day"] == 1].rename(
+        columns={"date_clear_sky": "date", "plant_abbrev_clear_sky": "plant"}
+    )
+    expected = Databricks_Repository.aggr_pandas_numeric_cols(
+        Databricks_Repository.keep_only_clear_sky_days(metrics.copy(), pandas_clear_sky),
+        should_aggregate=True,
+    )
+    pd.testing.assert_frame_equal(df[expected.columns], expected, check_dtype=False)
+
+    assert PandasSparkFrame.to_pandas_calls == 1
+    assert SPARK_ACTIONS.last_call_actions["get_metrics_data"] == 1
@@ -1,6 +1,6 @@
 """Clear Sky Testing Module."""
 
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
 import numpy as np
 import pandas as pd
@@ -34,6 +34,45 @@ def test_keep_only_clear_sky_days():
     })
     assert_frame_equal(result_df, expected_df, check_dtype=False, check_like=True)
 
+def test_keep_only_clear_sky_days_several_plants():
+    conn = Databricks_Repository()
+    dates = [date(2024, 7, 26) + timedelta(days=i) for i in range(3)]
+    df = pd.DataFrame({
+        'date': dates,
+        'ADB-BLK01-PCS002-WS1-GHI_cosine': [1.0, 2.0, 4.0],
+        'APX-BLK01-PCS001-WS1-BOM_eucl': [1, 2, 4],
+        'TRQ-BLK03-PCS106-WS4-POA_pct_diff': [1.0, 2.0, 4.0],
+    })
+    clear_sky_df = pd.DataFrame({
+        'date': [dates[0], dates[2], dates[2]],
+        'plant': ['ADB', 'ADB', 'TRQ'],
+        'is_clear_sky_day': [1, 1, 1]
+    })
+    result_df = conn.keep_only_clear_sky_days(
+        metrics_df=df,
+        clear_sky_df=clear_sky_df,
+    )
+    expected_df = pd.DataFrame({
+        'date': dates,
+        'ADB-BLK01-PCS002-WS1-GHI_cosine': [np.nan, 2.0, np.nan],
+        'APX-BLK01-PCS001-WS1-BOM_eucl': [1, 2, 4],
+        'TRQ-BLK03-PCS106-WS4-POA_pct_diff': [1.0, 2.0, np.nan],
+    })
+    assert_frame_equal(result_df, expected_df)
+
+def test_keep_only_clear_sky_days_without_clear_sky():
+    conn = Databricks_Repository()
+    df = pd.DataFrame({
+        'date': pd.date_range(start='2024-07-26', periods=2),
+        'ADB-BLK01-PCS002-WS1-GHI_cosine': [1.0, 2.0],
+    })
+    clear_sky_df = pd.DataFrame(columns=['date', 'plant', 'is_clear_sky_day'])
+    result_df = conn.keep_only_clear_sky_days(
+        metrics_df=df.copy(),
+        clear_sky_df=clear_sky_df,
+    )
+    assert_frame_equal(result_df, df)
+
 def test_aggr_pandas_numeric_cols_avg():
     conn = Databricks_Repository()
     df = pd.DataFrame({
@@ -0,0 +1,59 @@
+"""Test the parsed column catalog of the wide solar tables."""
+
+from Model.ColumnCatalog import ColumnCatalog, ColumnCatalogRegistry
+
+COLUMNS = [
+    "date",
+    "ADB-BLK01-PCS002-WS1-GHI_cosine",
+    "ADB-BLK01-PCS002-WS1-GHI_pct_diff",
+    "ADB-BLK01-PCS013-WS3-POA_js",
+    "TRQ-BLK03-PCS106-WS4-POA_pct_diff",
+    "TRQ-BLK03-PCS106-WS4-BOM_eucl",
+]
+
+
+def test_catalog_lists_plants_and_weather_stations():
+    catalog = ColumnCatalog(COLUMNS)
+    assert catalog.date_columns == ["date"]
+    assert len(catalog) == 5
+    assert catalog.plants == ["ADB", "TRQ"]
+    assert sorted(catalog.weather_stations) == ["ADB-WS1", "ADB-WS3", "TRQ-WS4"]
+
+
+def test_select_matches_the_list_comprehensions():
+    catalog = ColumnCatalog(COLUMNS)
+    for plant in [None, ["ADB"], ["ADB", "TRQ"], ["XYZ"]]:
+        for measurement in [None, "GHI", "POA", "BOM"]:
+            for metric in [None, "cosine", "pct_diff", "js", "eucl"]:
+                expected = [c for c in COLUMNS if c != "date"]
+                if metric:
+                    expected = [c for c in expected if c.endswith(metric)]
+                if measurement:
+                    expected = [c for c in expected if measurement in c]
+                if plant is not None:
+                    expected = [c for c in expected if c.startswith(tuple(plant))]
+                actual = catalog.select(plant=plant, measurement=measurement, metric=metric)
+                assert actual == expected
+
+
+def test_select_by_base():
+    catalog = ColumnCatalog(COLUMNS)
+    assert catalog.select(base="ADB-BLK01-PCS002-WS1-GHI") == [
+        "ADB-BLK01-PCS002-WS1-GHI_cosine",
+        "ADB-BLK01-PCS002-WS1-GHI_pct_diff",
+    ]
+
+
+def test_registry_rebuilds_on_new_version():
+    registry = ColumnCatalogRegistry()
+    listed = []
+
+    def columns():
+        listed.append(1)
+        return COLUMNS
+
+    first = registry.get("s.isight.metrics", "(1,)", columns)
+    assert registry.get("s.isight.metrics", "(1,)", columns) is first
+    assert len(listed) == 1
+    assert registry.get("s.isight.metrics", "(2,)", columns) is not first
+    assert registry.stats == {"built": 2, "reused": 1}
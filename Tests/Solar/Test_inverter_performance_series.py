@@ -0,0 +1,65 @@
+"""Test the join of the inverter performance series."""
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from Model.DataAccess import join_inverter_performance_series
+
+
+def _series_rows():
+    t1, t2, t3, t4 = pd.date_range("2024-07-26", periods=4, freq="10min")
+    rows = [
+        # two Weather Stations POA attributes share t1
+        (t1, "IrradiancePOAAverage", 800.0),
+        (t1, "IrradiancePOAAverage", 810.0),
+        (t1, "ActivePowerNormalized", 0.9),
+        (t1, "ActivePowerExpected", 1.0),
+        (t1, "ActivePower+Value", 950.0),
+        (t1, "InverterActivePowerNormalizedAverage", 0.85),
+        # a missing POA value is kept
+        (t2, "IrradiancePOAAverage", np.nan),
+        (t2, "ActivePowerNormalized", 0.8),
+        (t2, "ActivePowerExpected", 0.9),
+        (t2, "ActivePower+Value", 850.0),
+        (t2, "InverterActivePowerNormalizedAverage", 0.75),
+        # no expected power
+        (t3, "IrradiancePOAAverage", 700.0),
+        (t3, "ActivePowerNormalized", 0.7),
+        (t3, "ActivePower+Value", 750.0),
+        (t3, "InverterActivePowerNormalizedAverage", 0.65),
+        # flagged active power
+        (t4, "IrradiancePOAAverage", 600.0),
+        (t4, "ActivePowerNormalized", 0.6),
+        (t4, "ActivePowerExpected", 0.7),
+        (t4, "ActivePower+Value", -9999.0),
+        (t4, "InverterActivePowerNormalizedAverage", 0.55),
+    ]
+    return pd.DataFrame(rows, columns=["start_time_utc", "series_name", "attribute_value"])
+
+
+def test_duplicate_timestamps_keep_every_combination():
+    df = join_inverter_performance_series(_series_rows(), "ADB")
+
+    t1, t2 = pd.date_range("2024-07-26", periods=2, freq="10min")
+    expected = pd.DataFrame(
+        {
+            "start_time_utc": [t1, t1, t2],
+            "IrradiancePOAAverage": [800.0, 810.0, np.nan],
+            "ActivePowerNormalized": [0.9, 0.9, 0.8],
+            "ActivePowerExpected": [1.0, 1.0, 0.9],
+            "ActivePower": [950.0, 950.0, 850.0],
+            "plant_abbrev": ["ADB", "ADB", "ADB"],
+            "InverterActivePowerNormalizedAverage": [0.85, 0.85, 0.75],
+        }
+    )
+    assert_frame_equal(df, expected)
+
+
+def test_row_order_does_not_matter():
+    rows = _series_rows()
+    shuffled = rows.sample(frac=1, random_state=0)
+    assert_frame_equal(
+        join_inverter_performance_series(shuffled, "ADB"),
+        join_inverter_performance_series(rows, "ADB"),
+    )
@@ -0,0 +1,65 @@
+"""Test the slicing of the batched tornado data."""
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from Model.DataAccess import Databricks_Repository
+
+
+@pytest.fixture
+def tornado_data():
+    return {
+        "metrics": pd.DataFrame({
+            "ADB-BLK01-PCS002-WS1-GHI_cosine": [0.9],
+            "ADB-BLK01-PCS002-WS1-POA_cosine": [0.8],
+            "TRQ-BLK03-PCS106-WS4-BOM_pct_diff": [2.0],
+        }),
+        "recovery": pd.DataFrame({
+            "ADB-BLK01-PCS002-WS1-GHI_recovery": [99.0],
+        }),
+        "budget_deviation": pd.DataFrame({
+            "index": ["ADB-002-WS1", "ADB-002-WS1", "TRQ-106-WS4"],
+            "type": ["GHI", "POA", "BOM"],
+            "energy": [57.0, 81.0, -4837.0],
+            "revenue": [1.0, 2.0, 3.0],
+        }),
+        "clear_sky_ratios": pd.DataFrame({
+            "plant": ["ADB"],
+            "ratio": [0.5],
+        }),
+    }
+
+
+def test_select_budget_deviation(tornado_data):
+    result_df = Databricks_Repository.select_budget_deviation(
+        all_deviations_df=tornado_data["budget_deviation"],
+        measurement="POA",
+        kpi="energy",
+    )
+    expected_df = pd.DataFrame(
+        {"deviation": [81.0]},
+        index=pd.Index(["ADB-002-WS1"], name="index"),
+    )
+    assert_frame_equal(result_df, expected_df)
+
+
+def test_select_budget_deviation_invalid_kpi(tornado_data):
+    with pytest.raises(Exception):
+        Databricks_Repository.select_budget_deviation(
+            all_deviations_df=tornado_data["budget_deviation"],
+            measurement="POA",
+            kpi="power",
+        )
+
+
+def test_select_tornado_data(tornado_data):
+    result = Databricks_Repository.select_tornado_data(
+        tornado_data=tornado_data,
+        measurement="GHI",
+    )
+    assert list(result["metrics"].columns) == ["ADB-BLK01-PCS002-WS1-GHI_cosine"]
+    assert list(result["budget_deviation"]["deviation"]) == [57.0]
+    assert list(result["lost_revenue"]["deviation"]) == [1.0]
+    assert result["recovery"] is tornado_data["recovery"]
+    assert result["clear_sky_ratios"] is tornado_data["clear_sky_ratios"]
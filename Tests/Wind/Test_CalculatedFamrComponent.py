@@ -69,6 +69,34 @@ class TestCalculatedFarmComponent(unittest.TestCase):
             atol=1e-2,  # Allow a difference of 0.01 in the efficiency values
         )
 
+    def test_calculate_simple_efficiency_matches_each_turbine(self):
+        data = self.data.copy()
+        data["WAK-T003-KW"] = -9999.0  # no valid record
+        data["WAK-T003-EXPCTD-KW-CALC"] = 1000.0
+
+        lost_energy, efficiency = self.component.calculate_simple_efficiency(
+            data, self.interval, self.capacity, daily_threshold=0.4
+        )
+
+        self.assertEqual(
+            list(efficiency.columns), ["WAK-T001-EFFICIENCY", "WAK-T002-EFFICIENCY"]
+        )
+        for turbine in ["WAK-T001", "WAK-T002"]:
+            turbine_lost_energy, turbine_efficiency = (
+                self.component.calculate_simple_efficiency(
+                    data.filter(like=turbine),
+                    self.interval,
+                    self.capacity,
+                    daily_threshold=0.4,
+                )
+            )
+            pd.testing.assert_frame_equal(
+                lost_energy[[turbine + "-LOST-ENERGY"]], turbine_lost_energy
+            )
+            pd.testing.assert_frame_equal(
+                efficiency[[turbine + "-EFFICIENCY"]], turbine_efficiency
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
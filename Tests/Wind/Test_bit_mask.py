@@ -0,0 +1,106 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from Model.BitMask import BitMask
+from Model.WindFarm import FarmComponent
+
+
+class TestBitMask(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        # 13 rows, so the last byte of each column is only partly used
+        index = pd.date_range("2022-01-01 00:05", periods=13, freq="10T")
+        self.frame = pd.DataFrame(
+            rng.random((13, 3)) > 0.4,
+            index=index,
+            columns=["WAK-T001", "WAK-T002", "WAK-T003"],
+        )
+        self.other = pd.DataFrame(
+            rng.random((13, 3)) > 0.4, index=index, columns=self.frame.columns
+        )
+        self.mask = BitMask.from_frame(self.frame)
+
+    def test_round_trip(self):
+        pd.testing.assert_frame_equal(self.mask.to_frame(), self.frame)
+        self.assertEqual(self.mask.shape, (13, 3))
+        self.assertEqual(self.mask.nbytes, 2 * 3)
+
+    def test_logical_operators(self):
+        other = BitMask.from_frame(self.other)
+        pd.testing.assert_frame_equal(
+            (self.mask & other).to_frame(), self.frame & self.other
+        )
+        pd.testing.assert_frame_equal(
+            (self.mask | other).to_frame(), self.frame | self.other
+        )
+        pd.testing.assert_frame_equal((~self.mask).to_frame(), ~self.frame)
+        pd.testing.assert_series_equal((~self.mask).mean(), (~self.frame).mean())
+        with self.assertRaises(ValueError):
+            self.mask & BitMask.from_frame(self.other.iloc[1:])
+
+    def test_resample_matches_pandas(self):
+        for freq in ["10s", "30T", "1H"]:
+            expected = self.frame.resample(freq).ffill().fillna(False).astype(bool)
+            pd.testing.assert_frame_equal(
+                self.mask.resample(freq).to_frame(), expected, check_freq=False
+            )
+
+    def test_broadcast_columns(self):
+        columns = ["WAK-T002-Temp-A", "WAK-T002-Temp-B", "WAK-T009-Temp-A"]
+        expanded = self.mask.broadcast_columns(
+            ["WAK-T002", "WAK-T002", "WAK-T009"], columns=columns
+        ).to_frame()
+        self.assertEqual(list(expanded.columns), columns)
+        np.testing.assert_array_equal(expanded.iloc[:, 0], self.frame["WAK-T002"])
+        np.testing.assert_array_equal(expanded.iloc[:, 1], self.frame["WAK-T002"])
+        self.assertFalse(expanded.iloc[:, 2].any())
+
+    def test_components_share_the_mask(self):
+        data = pd.DataFrame(
+            50.0,
+            index=self.frame.index,
+            columns=[f"{c}-Temp" for c in self.frame.columns],
+        )
+        components = [
+            FarmComponent("Gen_Brg_NDE_Temp", "WAK", data=data, online_map=self.mask)
+            for _ in range(2)
+        ]
+        for component in components:
+            self.assertIs(component.resampled_online_map, self.mask)
+            expected = data.where(self.frame.to_numpy()).fillna(-9992)
+            pd.testing.assert_frame_equal(component.online_filtered_data, expected)
+        pd.testing.assert_frame_equal(self.mask.to_frame(), self.frame)
+
+    def test_resampled_masks_are_kept(self):
+        self.assertIs(self.mask.resample("10min"), self.mask)
+        self.assertIs(self.mask.resample("10s"), self.mask.resample("10S"))
+
+    def test_components_expand_the_map_per_turbine(self):
+        index = pd.date_range("2022-01-01 00:05", periods=13 * 60, freq="10s")
+        data = pd.DataFrame(
+            50.0,
+            index=index,
+            columns=["WAK-T002-Dir-A", "WAK-T002-Dir-B", "WAK-T009-Dir-A"],
+        )
+        components = [
+            FarmComponent("Yaw", "WAK", data=data, online_map=self.mask, freq="10s")
+            for _ in range(2)
+        ]
+        self.assertIs(
+            components[0].resampled_online_map, components[1].resampled_online_map
+        )
+
+        online_map = self.frame.resample("10s").ffill().reindex(index)
+        expected = data.copy()
+        expected.iloc[:, 0] = data.iloc[:, 0].where(online_map["WAK-T002"])
+        expected.iloc[:, 1] = data.iloc[:, 1].where(online_map["WAK-T002"])
+        expected.iloc[:, 2] = np.nan
+        pd.testing.assert_frame_equal(
+            components[0].online_filtered_data, expected.fillna(-9992)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
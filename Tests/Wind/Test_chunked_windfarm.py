@@ -0,0 +1,282 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from Model.ChunkedWindFarm import (
+    ChunkedWindFarm,
+    DateWindowReader,
+    get_required_overlap_days,
+    select_owned_days,
+    slice_compressed,
+)
+from Model.WindFarm import WindFarm
+from Model.WindFarmOutputs import get_windfarm_outputs
+from Utils import ParquetFiles
+from Utils.Enums import DataSourceType
+from Utils.ParquetFiles import read_compressed
+
+
+OEM_POWERCURVE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "..",
+    "assets",
+    "data",
+    "power_curves",
+    "all_power_curves.csv",
+)
+
+
+class TestDateWindowReader(unittest.TestCase):
+    def setUp(self):
+        index = pd.date_range("2024-01-01", periods=144 * 5, freq="10T")
+        self.data = pd.DataFrame(
+            {
+                "WAK-T001-KW": np.arange(len(index), dtype=float),
+                "WAK-T002-KW": ["bad"] * len(index),
+            },
+            index=index,
+        )
+        fd, self.path = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        self.data.to_csv(self.path)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_windows_are_read_forward(self):
+        reader = DateWindowReader(self.path, chunk_rows=100, to_numeric=True)
+        self.assertEqual(reader.first_timestamp, pd.Timestamp("2024-01-01"))
+
+        window = reader.read(pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-03"))
+        self.assertEqual(len(window), 288)
+        self.assertTrue((window["WAK-T002-KW"] == -9999).all())
+
+        # overlapping windows share the rows they both cover
+        window = reader.read(pd.Timestamp("2024-01-02"), pd.Timestamp("2024-01-09"))
+        np.testing.assert_array_equal(
+            window["WAK-T001-KW"], self.data["WAK-T001-KW"].iloc[144:]
+        )
+        self.assertTrue(reader.exhausted)
+
+    def test_turbine_columns(self):
+        reader = DateWindowReader(self.path, chunk_rows=100, turbines=["T001"])
+        window = reader.read(pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-02"))
+        self.assertEqual(list(window.columns), ["WAK-T001-KW"])
+
+    def test_csv_start_is_skipped_without_parsing(self):
+        start = pd.Timestamp("2024-01-04")
+        with mock.patch.object(ParquetFiles, "CSV_SEARCH_BLOCK_SIZE", 1024):
+            reader = DateWindowReader(
+                self.path, chunk_rows=100, to_numeric=True, start=start
+            )
+            # only the last search block before the start is read
+            self.assertGreater(reader.first_timestamp, pd.Timestamp("2024-01-03 12:00"))
+            self.assertLessEqual(reader.first_timestamp, start)
+            window = reader.read(start, pd.Timestamp("2024-01-09"))
+        pd.testing.assert_index_equal(
+            window.index, self.data.index[self.data.index >= start], check_names=False
+        )
+        np.testing.assert_array_equal(
+            window["WAK-T001-KW"], self.data["WAK-T001-KW"].iloc[144 * 3 :]
+        )
+        self.assertTrue((window["WAK-T002-KW"] == -9999).all())
+
+    def test_csv_search_finds_the_last_line_before_start(self):
+        with open(self.path, "rb") as f:
+            f.readline()
+            for start in self.data.index[::37]:
+                offset = ParquetFiles._find_csv_offset(f, start, block_size=0)
+                f.seek(offset)
+                line = f.readline()
+                self.assertLessEqual(pd.Timestamp(line.split(b",")[0].decode()), start)
+                line = f.readline()
+                if line and start > self.data.index[0]:
+                    self.assertGreaterEqual(pd.Timestamp(line.split(b",")[0].decode()), start)
+                f.seek(0)
+                f.readline()
+
+    def test_parquet_row_groups_before_start_are_skipped(self):
+        parquet_path = self.path.replace(".csv", ".parquet")
+        self.data[["WAK-T001-KW"]].to_parquet(parquet_path, row_group_size=144)
+        self.addCleanup(os.remove, parquet_path)
+        start = pd.Timestamp("2024-01-03 12:00")
+
+        reader = DateWindowReader(parquet_path, chunk_rows=50, start=start)
+        self.assertEqual(reader.first_timestamp, pd.Timestamp("2024-01-03"))
+        window = reader.read(start, pd.Timestamp("2024-01-09"))
+        np.testing.assert_array_equal(
+            window["WAK-T001-KW"], self.data["WAK-T001-KW"].iloc[144 * 2 + 72 :]
+        )
+
+
+class TestWindowSlicing(unittest.TestCase):
+    def test_slice_compressed_keeps_the_state_at_the_edges(self):
+        compressed = pd.DataFrame(
+            {
+                "datetime": pd.to_datetime(
+                    ["2024-01-01 00:00", "2024-01-01 05:00", "2024-01-02 03:00", None]
+                ),
+                "WAK-T001-ERR-CODE": [1, 2, 1, np.nan],
+                "datetime.1": pd.to_datetime(
+                    [
+                        "2024-01-01 08:00",
+                        "2024-01-01 12:00",
+                        "2024-01-01 13:00",
+                        "2024-01-03 00:00",
+                    ]
+                ),
+                "WAK-T002-ERR-CODE": [2, 1, 2, 1],
+            }
+        )
+        window = slice_compressed(
+            compressed, pd.Timestamp("2024-01-01 10:00"), pd.Timestamp("2024-01-02")
+        )
+        self.assertEqual(
+            list(window["datetime"].dropna()),
+            [pd.Timestamp("2024-01-01 10:00"), pd.Timestamp("2024-01-02")],
+        )
+        self.assertEqual(list(window["WAK-T001-ERR-CODE"].dropna()), [2, 1])
+        self.assertEqual(
+            list(window["datetime.1"]),
+            [
+                pd.Timestamp("2024-01-01 10:00"),
+                pd.Timestamp("2024-01-01 12:00"),
+                pd.Timestamp("2024-01-01 13:00"),
+                pd.Timestamp("2024-01-02"),
+            ],
+        )
+
+    def test_select_owned_days(self):
+        daily = pd.DataFrame(
+            {"A": range(5)}, index=pd.date_range("2024-01-01", periods=5, freq="D")
+        )
+        owned = select_owned_days(
+            daily, pd.Timestamp("2024-01-02"), pd.Timestamp("2024-01-04")
+        )
+        self.assertEqual(list(owned["A"]), [1, 2])
+
+        curves = pd.DataFrame(
+            {
+                "Turbine": ["T001"] * 3,
+                "Day": [pd.Timestamp(f"2024-01-0{d}").date() for d in (1, 2, 3)],
+            }
+        )
+        owned = select_owned_days(
+            curves, pd.Timestamp("2024-01-02"), pd.Timestamp("2024-01-04")
+        )
+        self.assertEqual(len(owned), 2)
+        self.assertIsNone(select_owned_days(pd.DataFrame(), None, None))
+
+        # the power curves are indexed by turbine and day, and the OEM curve is of no day
+        curves = curves.set_index(["Turbine", "Day"])
+        curves.loc[("WAK OEM Power Curve", "All"), :] = []
+        owned = select_owned_days(
+            curves, pd.Timestamp("2024-01-02"), pd.Timestamp("2024-01-04")
+        )
+        self.assertEqual(len(owned), 2)
+        owned = select_owned_days(
+            curves,
+            pd.Timestamp("2024-01-02"),
+            pd.Timestamp("2024-01-04"),
+            keep_undated=True,
+        )
+        self.assertEqual(list(owned.index.get_level_values("Day"))[-1], "All")
+
+    def test_slice_compressed_with_an_event_at_the_start(self):
+        compressed = pd.DataFrame(
+            {
+                "datetime": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]),
+                "WAK-T001-STATE": [1, 16, 1],
+            }
+        )
+        window = slice_compressed(
+            compressed, pd.Timestamp("2024-01-02"), pd.Timestamp("2024-01-03")
+        )
+        self.assertEqual(list(window["WAK-T001-STATE"]), [16, 1])
+        self.assertFalse(window["datetime"].duplicated().any())
+
+
+class TestChunkedWindFarm(unittest.TestCase):
+    """A farm processed in windows, against a single farm built from the same files."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.avg_path = os.path.join(self.temp_dir.name, "WAK.csv")
+        self.cmp_path = os.path.join(self.temp_dir.name, "WAK_cmp.csv")
+
+        rng = np.random.default_rng(0)
+        # 11 days, so the last window is not full
+        index = pd.date_range("2024-01-01", periods=144 * 11, freq="10min", name="DateTime")
+        avg_columns = {}
+        cmp_pairs = []
+        event_times = pd.Series(index[::36].strftime("%m/%d/%Y %I:%M:%S %p"))
+        for i, turbine in enumerate(["WAK-T001", "WAK-T002", "WAK-T003"]):
+            wind_speed = np.clip(rng.normal(8, 3, len(index)), 0, 25)
+            power = np.clip(wind_speed**3, 0, 1780) + rng.normal(0, 5, len(index))
+            avg_columns[f"{turbine}-KW"] = power
+            avg_columns[f"{turbine}-EXPCTD-KW-CALC"] = power * rng.uniform(1, 1.1, len(index))
+            avg_columns[f"{turbine}-DEN-CPM-WIND-SPD-CALC"] = wind_speed
+            avg_columns[f"{turbine}-GEN-SPD-RPM"] = rng.uniform(900, 1400, len(index))
+            avg_columns[f"{turbine}-BLADE-ANGLE-A"] = rng.uniform(0, 10, len(index))
+            avg_columns[f"{turbine}-GEN-BRG-DE-T-C"] = rng.normal(50 + 5 * i, 3, len(index))
+            # some faults, so the turbines are not always online
+            for code_type, normal_code, fault_code in [("ERR-CODE", 2, 5), ("STATE", 16, 1)]:
+                codes = np.where(rng.random(len(event_times)) < 0.1, fault_code, normal_code)
+                cmp_pairs.append(
+                    pd.DataFrame({"DateTime": event_times, f"{turbine}-{code_type}": codes})
+                )
+        self.avg_data = pd.DataFrame(avg_columns, index=index).round(2)
+        self.avg_data.to_csv(self.avg_path)
+        pd.concat(cmp_pairs, axis=1).to_csv(self.cmp_path, index=False)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_windows_match_a_single_farm(self):
+        windfarm = WindFarm(
+            avg_data=pd.read_csv(self.avg_path, index_col=0, parse_dates=True),
+            compressed_data=read_compressed(self.cmp_path),
+            data_source_type=DataSourceType.CSV,
+            project="WAK",
+            oem_powercurve_path=OEM_POWERCURVE_PATH,
+        )
+        expected = get_windfarm_outputs(windfarm, with_powercurves=True)
+
+        chunked = ChunkedWindFarm(
+            self.avg_path,
+            compressed_path=self.cmp_path,
+            window_days=4,
+            overlap_days=get_required_overlap_days(),
+            chunk_rows=500,
+            project="WAK",
+            oem_powercurve_path=OEM_POWERCURVE_PATH,
+        )
+        outputs = chunked._process()
+
+        self.assertEqual(sorted(outputs), sorted(expected))
+        for name in [
+            "daily_efficiency",
+            "daily_lost_energy",
+            "severity:Gen_Brg_DE_Temp",
+            "severity:Lost_Energy",
+            "powercurves",
+            "powercurve_distributions",
+        ]:
+            self.assertIn(name, outputs)
+        for name, output in expected.items():
+            with self.subTest(output=name):
+                self.assertEqual(len(outputs[name]), len(output))
+                pd.testing.assert_frame_equal(outputs[name], output, check_freq=False)
+        # the OEM power curve is kept once
+        self.assertEqual(
+            list(outputs["powercurves"].index.get_level_values("Day")).count("All"), 1
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from Model.Constants.General import CLEANING_ORDER, RAW_MISSING_FLAG
+from Model.Filter import gradient_filter, range_filter
+from Model.WindFarm import FarmComponent
+
+
+class TestCleaningFlags(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        index = pd.date_range("2022-01-01", periods=144 * 2, freq="10T")
+        values = rng.normal(60, 15, size=(len(index), 3)).round(1)
+        values[20:40, 0] = 55.0  # a stuck sensor
+        values[100:110, 1] = -9999  # missing raw values
+        values[200:205, 2] = np.nan
+        values[150:160, 2] = 500.0  # out of range
+        self.data = pd.DataFrame(
+            values,
+            index=index,
+            columns=[f"WAK-T00{i}-Gen_Brg_NDE_Temp" for i in range(1, 4)],
+        )
+        self.online_map = pd.DataFrame(
+            True, index=index, columns=[f"WAK-T00{i}" for i in range(1, 4)]
+        )
+        self.online_map.iloc[50:70, 1] = False
+        self.fc = FarmComponent(
+            project="WAK",
+            name="Gen_Brg_NDE_Temp",
+            data=self.data.copy(),
+            online_map=self.online_map.copy(),
+        )
+
+    def expected_maps(self):
+        gradient_data, _ = gradient_filter(
+            self.data.copy(), **self.fc.gradient_filter_parameters
+        )
+        range_data, _ = range_filter(
+            self.data.copy(), **self.fc.range_filter_parameters
+        )
+        online_data = self.data.where(
+            self.online_map.set_axis(self.data.columns, axis=1)
+        ).fillna(-9992)
+        return [gradient_data > -1000, range_data > -1000, online_data > -1000]
+
+    def test_stage_maps_match_the_filters(self):
+        for clean_type, expected in zip(CLEANING_ORDER, self.expected_maps()):
+            pd.testing.assert_frame_equal(getattr(self.fc, clean_type), expected)
+
+    def test_clean_data_matches_the_combined_maps(self):
+        combined = np.logical_and.reduce([m.to_numpy() for m in self.expected_maps()])
+        pd.testing.assert_frame_equal(
+            self.fc.clean_data, self.data.where(combined, other=-9999)
+        )
+        pd.testing.assert_frame_equal(
+            self.fc.clean_data_map, (self.data > -1000) & combined
+        )
+        pd.testing.assert_frame_equal(
+            self.fc.valid_clean_data, self.fc.clean_data[self.fc.clean_data > -1000]
+        )
+
+    def test_the_filters_run_once_without_altering_the_data(self):
+        self.fc.gradient_filtered_stats
+        pd.testing.assert_frame_equal(self.fc.data, self.data)
+
+        flags = self.fc.cleaning_flags
+        self.fc.clean_data
+        self.fc.calculate_data_removal_stats()
+        self.fc.statistic("mean")
+        self.assertIs(self.fc.cleaning_flags, flags)
+        self.assertTrue((flags[100:110, 1] & RAW_MISSING_FLAG).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from Fleet import append_daily_output
+from Model.ChunkedWindFarm import DateWindowReader, get_required_overlap_days
+from Model.DailyResultStore import DailyResultStore
+from Model.WindFarmOutputs import WindFarmOutputs
+
+
+def make_powercurves(index, value):
+    """Power curves like `WindFarm.powercurves`, with the OEM curve."""
+    days = [("WAK-T001", day.date()) for day in index]
+    return pd.DataFrame(
+        {0.5: np.full(len(index) + 1, value)},
+        index=pd.MultiIndex.from_tuples(
+            days + [("WAK OEM Power Curve", "All")], names=["Turbine", "Day"]
+        ),
+    ).sort_index()
+
+
+def make_outputs(start, days, value):
+    index = pd.date_range(start, periods=days, freq="D")
+    severity = pd.DataFrame({"WAK-T001-GEN-BRG-DE-T-C": np.full(days, value)}, index=index)
+    powercurves = make_powercurves(index, value)
+    return WindFarmOutputs(
+        "WAK",
+        outputs={
+            "daily_mean": severity * 10,
+            "severity:Gen_Brg_DE_Temp": severity,
+            "powercurves": powercurves,
+        },
+    )
+
+
+class TestDailyResultStore(unittest.TestCase):
+    def setUp(self):
+        self.store_dir = tempfile.TemporaryDirectory()
+        self.store = DailyResultStore(self.store_dir.name)
+
+    def tearDown(self):
+        self.store_dir.cleanup()
+
+    def test_update_replaces_the_days_from_first_day(self):
+        self.assertIsNone(self.store.get_last_day("WAK"))
+        self.store.update("WAK", make_outputs("2024-01-01", 5, 1.0))
+        self.assertEqual(self.store.get_last_day("WAK"), pd.Timestamp("2024-01-05"))
+
+        # the next run recomputes the last day, and adds two
+        outputs = self.store.update(
+            "WAK",
+            make_outputs("2024-01-05", 3, 2.0),
+            first_day=pd.Timestamp("2024-01-05"),
+        )
+        severity = outputs.daily_severity_scores["Gen_Brg_DE_Temp"]
+        self.assertEqual(len(severity), 7)
+        np.testing.assert_array_equal(severity.iloc[:, 0], [1, 1, 1, 1, 2, 2, 2])
+        # the OEM curve is kept once
+        self.assertEqual(len(outputs.powercurves), 8)
+        np.testing.assert_array_equal(outputs.powercurves[0.5], [2, 1, 1, 1, 1, 2, 2, 2])
+        self.assertEqual(outputs.powercurves.index[0], ("WAK OEM Power Curve", "All"))
+
+        # the manifest is read back by a new store
+        store = DailyResultStore(self.store_dir.name)
+        self.assertEqual(store.get_last_day("WAK"), pd.Timestamp("2024-01-07"))
+        self.assertEqual(
+            sorted(store.load("WAK")),
+            ["daily_mean", "powercurves", "severity:Gen_Brg_DE_Temp"],
+        )
+
+    def test_update_without_first_day_replaces_everything(self):
+        self.store.update("WAK", make_outputs("2024-01-01", 5, 1.0))
+        outputs = self.store.update("WAK", make_outputs("2024-01-03", 2, 2.0))
+        self.assertEqual(len(outputs.daily_mean), 2)
+        self.assertEqual(self.store.get_last_day("WAK"), pd.Timestamp("2024-01-04"))
+
+    def test_failed_update_leaves_the_store_unchanged(self):
+        self.store.update("WAK", make_outputs("2024-01-01", 5, 1.0))
+        stored_outputs = self.store.load("WAK")
+        original_to_pickle = pd.DataFrame.to_pickle
+        calls = []
+
+        def fail_on_second_file(frame, path, *args, **kwargs):
+            calls.append(path)
+            if len(calls) == 2:
+                raise OSError("disk full")
+            return original_to_pickle(frame, path, *args, **kwargs)
+
+        with mock.patch.object(pd.DataFrame, "to_pickle", fail_on_second_file):
+            with self.assertRaises(OSError):
+                self.store.update(
+                    "WAK",
+                    make_outputs("2024-01-05", 3, 2.0),
+                    first_day=pd.Timestamp("2024-01-05"),
+                )
+
+        store = DailyResultStore(self.store_dir.name)
+        self.assertEqual(store.get_last_day("WAK"), pd.Timestamp("2024-01-05"))
+        for output_name, output in store.load("WAK").items():
+            pd.testing.assert_frame_equal(output, stored_outputs[output_name])
+        farm_dir = os.path.join(self.store_dir.name, "WAK")
+        self.assertFalse([f for f in os.listdir(farm_dir) if f.endswith(".tmp")])
+        self.assertFalse([f for f in os.listdir(self.store_dir.name) if f.endswith(".tmp")])
+
+
+class TestIncrementalRun(unittest.TestCase):
+    def test_required_overlap_days(self):
+        # covers the 24 hour efficiency window, in whole days
+        self.assertGreaterEqual(get_required_overlap_days(), 1)
+        self.assertGreaterEqual(get_required_overlap_days("1H"), 6)
+
+    def test_reader_skips_the_days_before_the_window(self):
+        index = pd.date_range("2024-01-01", periods=144 * 10, freq="10T")
+        data = pd.DataFrame({"WAK-T001-KW": np.arange(len(index), dtype=float)}, index=index)
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "WAK.csv")
+            data.to_csv(path)
+            reader = DateWindowReader(path, chunk_rows=100)
+            window = reader.read(pd.Timestamp("2024-01-08"), pd.Timestamp("2024-01-11"))
+        self.assertEqual(window.index[0], pd.Timestamp("2024-01-08"))
+        self.assertEqual(len(window), 144 * 3)
+
+    def test_append_daily_output(self):
+        index = pd.date_range("2024-01-01", periods=4, freq="D")
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "fleet_daily_severity_scores_stage.csv")
+            append_daily_output(path, pd.DataFrame({"A-SEVERITY": [1.0] * 4}, index=index))
+            append_daily_output(
+                path,
+                pd.DataFrame(
+                    {"A-SEVERITY": [2.0] * 2, "B-SEVERITY": [3.0] * 2},
+                    index=pd.date_range("2024-01-04", periods=2, freq="D"),
+                ),
+                first_day=pd.Timestamp("2024-01-04"),
+            )
+            output = pd.read_csv(path, index_col=[0], parse_dates=[0])
+
+            curves_path = os.path.join(root, "power_curve.csv")
+            append_daily_output(curves_path, make_powercurves(index, 1.0))
+            append_daily_output(
+                curves_path, make_powercurves(index[2:], 2.0), first_day=index[2]
+            )
+            output_curves = pd.read_csv(curves_path, index_col=["Turbine", "Day"])
+
+        np.testing.assert_array_equal(output["A-SEVERITY"], [1, 1, 1, 2, 2])
+        self.assertEqual(output["B-SEVERITY"].isna().sum(), 3)
+        self.assertEqual(list(output_curves.columns), ["0.5"])
+        self.assertEqual(
+            list(output_curves.index.get_level_values("Day")),
+            ["2024-01-01", "2024-01-02", "All", "2024-01-03", "2024-01-04"],
+        )
+        np.testing.assert_array_equal(output_curves["0.5"], [1, 1, 2, 2, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from Model.Fault import FaultAnalysis
+
+
+class TestIntegrateLostEnergy(unittest.TestCase):
+    def setUp(self):
+        # integrate_lost_energy does not use the fault or revenue data
+        self.fault_analysis = FaultAnalysis.__new__(FaultAnalysis)
+        rng = np.random.default_rng(0)
+        index = pd.date_range("2023-01-01", periods=300, freq="10min")
+        self.power = pd.DataFrame(
+            {
+                "PDK-T001-KW": rng.uniform(0, 1000, len(index)),
+                "PDK-T001-EXPCTD-KW-CALC": rng.uniform(0, 1200, len(index)),
+            },
+            index=index,
+        )
+
+    def get_event_loss(self, start_time, end_time):
+        """One downtime at a time: the end caps plus the full intervals."""
+        start_cap, end_cap = self.fault_analysis.compute_end_caps_energy_loss(
+            start_time, end_time, self.power, "PDK-T001"
+        )
+        start = self.power.index.searchsorted(start_time, side="right") - 1
+        end = self.power.index.searchsorted(end_time, side="left")
+        gap = (self.power["PDK-T001-EXPCTD-KW-CALC"] - self.power["PDK-T001-KW"]).values
+        return start_cap + np.sum(gap[start + 1 : end - 1]) / 6000 + end_cap
+
+    def test_matches_each_downtime(self):
+        start_times = pd.Series(
+            pd.to_datetime(
+                [
+                    "2023-01-01 00:03",  # within one interval
+                    "2023-01-01 00:05",  # over a few intervals
+                    "2023-01-01 01:00",  # from the start of an interval
+                    "2023-01-01 02:07:30",
+                    "2023-01-01 00:00",  # the whole data
+                ],
+                format="ISO8601",
+            )
+        )
+        end_times = pd.Series(
+            pd.to_datetime(
+                [
+                    "2023-01-01 00:07",
+                    "2023-01-01 00:25",
+                    "2023-01-01 01:10",
+                    "2023-01-02 05:42:10",
+                    "2023-01-03 01:50",
+                ],
+                format="ISO8601",
+            )
+        )
+        lost_energy = self.fault_analysis.integrate_lost_energy(
+            start_times, end_times, self.power, "PDK-T001"
+        )
+        expected = [self.get_event_loss(s, e) for s, e in zip(start_times, end_times)]
+        np.testing.assert_allclose(lost_energy, expected, rtol=1e-9)
+
+    def test_missing_power_only_affects_its_downtimes(self):
+        self.power.iloc[20, 0] = np.nan
+        start_times = pd.Series(pd.to_datetime(["2023-01-01 02:05", "2023-01-01 05:05"]))
+        end_times = pd.Series(pd.to_datetime(["2023-01-01 04:05", "2023-01-01 07:05"]))
+        lost_energy = self.fault_analysis.integrate_lost_energy(
+            start_times, end_times, self.power, "PDK-T001"
+        )
+        self.assertTrue(np.isnan(lost_energy[0]))
+        self.assertAlmostEqual(lost_energy[1], self.get_event_loss(start_times[1], end_times[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
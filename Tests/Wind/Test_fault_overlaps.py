@@ -0,0 +1,93 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from Model.Fault import find_overlaps, segment_faults
+
+
+def to_datetimes(times):
+    return pd.to_datetime(times).to_numpy(dtype="datetime64[ns]")
+
+
+class TestFindOverlaps(unittest.TestCase):
+    def brute_force(self, starts, ends, query_starts, query_ends):
+        return [
+            (i, j)
+            for i, (query_start, query_end) in enumerate(zip(query_starts, query_ends))
+            for j, (start, end) in enumerate(zip(starts, ends))
+            if start < query_end and end > query_start
+        ]
+
+    def check(self, starts, ends, query_starts, query_ends):
+        query_index, interval_index = find_overlaps(starts, ends, query_starts, query_ends)
+        self.assertEqual(
+            list(zip(query_index, interval_index)),
+            self.brute_force(starts, ends, query_starts, query_ends),
+        )
+
+    def test_sorted_intervals(self):
+        rng = np.random.default_rng(0)
+        base = np.datetime64("2023-01-01T00:00", "ns")
+        starts = base + np.sort(rng.choice(10000, 200, replace=False)).astype("timedelta64[m]")
+        ends = starts + np.timedelta64(10, "m")
+        query_starts = base + rng.integers(0, 10000, 300).astype("timedelta64[m]")
+        query_ends = query_starts + rng.integers(1, 120, 300).astype("timedelta64[m]")
+        self.check(starts, ends, query_starts, query_ends)
+
+    def test_unsorted_intervals(self):
+        starts = to_datetimes(["2023-01-01 01:00", "2023-01-01 00:00"])
+        ends = to_datetimes(["2023-01-01 01:10", "2023-01-01 02:00"])
+        query_starts = to_datetimes(["2023-01-01 00:30", "2023-01-01 01:05"])
+        query_ends = to_datetimes(["2023-01-01 00:40", "2023-01-01 01:20"])
+        self.check(starts, ends, query_starts, query_ends)
+
+    def test_missing_query_times_do_not_overlap(self):
+        starts = to_datetimes(["2023-01-01 00:00"])
+        ends = to_datetimes(["2023-01-01 00:10"])
+        query_index, _ = find_overlaps(
+            starts, ends, to_datetimes(["2023-01-01 00:05"]), to_datetimes([None])
+        )
+        self.assertEqual(len(query_index), 0)
+
+
+class TestSegmentFaults(unittest.TestCase):
+    def test_segments_and_tails(self):
+        starts = to_datetimes(["2023-01-01 00:05", "2023-01-01 00:15", "2023-01-01 01:02"])
+        ends = to_datetimes(["2023-01-01 00:15", "2023-01-01 00:35", "2023-01-01 01:05"])
+        df_fault = pd.DataFrame(
+            {
+                "StartDateTime": starts,
+                "FaultCode": pd.Series([1, 2, 3]).astype("category"),
+                "Turbine": "PDK-T001",
+                "EndDateTime": ends,
+                "OriginalStartDateTime": starts,
+                "OriginalEndDateTime": ends,
+            }
+        )
+        segmented_df = segment_faults(
+            df_fault,
+            to_datetimes(["2023-01-01 00:10", "2023-01-01 00:30", "2023-01-01 01:00"]),
+            to_datetimes(["2023-01-01 00:20", "2023-01-01 00:50", "2023-01-01 01:10"]),
+        )
+
+        # the second fault spans two valid intervals
+        self.assertEqual(list(segmented_df["FaultCode"]), [1, 2, 2, 3])
+        self.assertEqual(list(segmented_df["PreAdjustedDuration"]), [600, 1200, 1200, 180])
+        np.testing.assert_array_equal(
+            segmented_df["StartDateTime"],
+            to_datetimes(
+                ["2023-01-01 00:10", "2023-01-01 00:15", "2023-01-01 00:30", "2023-01-01 01:02"]
+            ),
+        )
+        # the turbine stays down after the third segment until the end of
+        # its valid interval, since the next fault starts after it
+        self.assertEqual(list(segmented_df["AdjustedDuration"]), [300, 300, 1200, 180])
+        self.assertEqual(
+            segmented_df["AdjustedEndDateTime"].iloc[2], pd.Timestamp("2023-01-01 00:50")
+        )
+        self.assertTrue(segmented_df["NextStartDateTime"].isna().iloc[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import Model.WindFarm as windfarm_module
+from Model.WindFarm import FarmComponent, WindFarm
+
+
+def make_windfarm(seed=0):
+    """A farm assembled from its components, without input files."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start="2022-01-01", end="2022-01-10", freq="10T")
+    windfarm = WindFarm.__new__(WindFarm)
+    windfarm.name = "WAK"
+    windfarm._components = {}
+    for name in ["Gen_Brg_DE_Temp", "Gen_Brg_NDE_Temp", "Gbx_Brg_HighSpd_Temp"]:
+        data = pd.DataFrame(
+            rng.normal(50, 5, size=(len(index), 4)),
+            index=index,
+            columns=[f"WAK-T00{i}-{name}" for i in range(1, 5)],
+        )
+        windfarm._components[name] = FarmComponent(
+            project="WAK", name=name, data=data, freq="10T"
+        )
+    return windfarm
+
+
+class TestFlaggedTurbinesWorkers(unittest.TestCase):
+    def test_threads_give_the_serial_results(self):
+        flagged, daily_severities = make_windfarm().get_flagged_turbines(n_std=0)
+        # a new farm, so that the threads clean and score every component
+        threaded_flagged, threaded_severities = make_windfarm().get_flagged_turbines(
+            n_std=0, max_workers=3
+        )
+        pd.testing.assert_frame_equal(flagged, threaded_flagged)
+        pd.testing.assert_frame_equal(daily_severities, threaded_severities)
+        self.assertEqual(daily_severities.shape[1], 12)
+        self.assertEqual(
+            list(daily_severities.columns[:4]),
+            [f"WAK-T00{i}-Gen_Brg_DE_Temp" for i in range(1, 5)],
+        )
+
+    def test_forked_processes_give_the_serial_results(self):
+        flagged, daily_severities = make_windfarm().get_flagged_turbines(n_std=0)
+        process_flagged, process_severities = make_windfarm().get_flagged_turbines(
+            n_std=0, max_workers=2, executor="process"
+        )
+        pd.testing.assert_frame_equal(flagged, process_flagged)
+        pd.testing.assert_frame_equal(daily_severities, process_severities)
+
+    def test_forked_processes_score_several_farms_at_once(self):
+        seeds = range(3)
+        expected = [make_windfarm(seed).get_flagged_turbines(n_std=0)[1] for seed in seeds]
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            results = list(
+                pool.map(
+                    lambda seed: make_windfarm(seed).get_flagged_turbines(
+                        n_std=0, max_workers=2, executor="process"
+                    )[1],
+                    seeds,
+                )
+            )
+        for daily_severities, process_severities in zip(expected, results):
+            pd.testing.assert_frame_equal(daily_severities, process_severities)
+        # the farms are only handed to the workers
+        self.assertIsNone(windfarm_module._FORKED_WINDFARM)
+
+    def test_process_executor_needs_fork(self):
+        with mock.patch("multiprocessing.get_all_start_methods", return_value=["spawn"]):
+            with self.assertRaises(ValueError):
+                make_windfarm().get_flagged_turbines(max_workers=2, executor="process")
+
+    def test_invalid_executor(self):
+        with self.assertRaises(ValueError):
+            make_windfarm().get_flagged_turbines(max_workers=2, executor="cluster")
+
+
+if __name__ == "__main__":
+    unittest.main()
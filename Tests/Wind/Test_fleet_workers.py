@@ -0,0 +1,185 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from Fleet import Fleet, create_windfarm_outputs
+from Model.ChunkedWindFarm import get_required_overlap_days
+from Model.WindFarmOutputs import WindFarmOutputs
+
+
+def make_outputs(project, turbines, days=3):
+    index = pd.date_range("2024-01-01", periods=days, freq="D")
+    daily_mean = pd.DataFrame(
+        {f"{project}-{t}-GEN-BRG-DE-T-C": np.arange(days, dtype=float) for t in turbines},
+        index=index,
+    )
+    lost_energy = pd.DataFrame(
+        {f"{project}-{t}-LOST-ENERGY": np.ones(days) for t in turbines}, index=index
+    )
+    severity = pd.DataFrame(
+        {f"{project}-{t}-GEN-BRG-DE-T-C": [0.0, 1.0, i] for i, t in enumerate(turbines)},
+        index=index,
+    )
+    return WindFarmOutputs(
+        project,
+        outputs={
+            "daily_mean": daily_mean,
+            "daily_lost_energy": lost_energy,
+            "daily_lost_revenue": lost_energy * 20,
+            "severity:Gen_Bearing_DE_Temp": severity,
+        },
+    )
+
+
+class TestWindFarmOutputs(unittest.TestCase):
+    def test_missing_outputs_are_empty(self):
+        outputs = make_outputs("WAK", ["T001"])
+        self.assertTrue(outputs.daily_efficiency.empty)
+        self.assertEqual(list(outputs.daily_severity_scores), ["Gen_Bearing_DE_Temp"])
+
+    def test_flagged_turbines(self):
+        outputs = make_outputs("WAK", ["T001", "T002", "T003"])
+        flagged, daily_severities = outputs.get_flagged_turbines(top_n=2)
+        self.assertEqual(list(flagged["Severity"]), [3.0, 2.0])
+        self.assertEqual(daily_severities.shape, (3, 3))
+
+        with self.assertRaises(ValueError):
+            outputs.get_flagged_turbines(n_std=2)
+
+
+class TestFleetWorkers(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        dirs = {}
+        for name in ["avg", "cmp", "yaw"]:
+            dirs[name] = os.path.join(self.temp_dir.name, name)
+            os.makedirs(dirs[name])
+        pd.DataFrame(columns=["DateTime", "BR2-K001-KW", "BR2-K002-KW"]).to_csv(
+            os.path.join(dirs["avg"], "BR2.csv"), index=False
+        )
+        pd.DataFrame(columns=["DateTime", "BR2-K001-STATE"]).to_csv(
+            os.path.join(dirs["cmp"], "BR2.csv"), index=False
+        )
+        # single_plant keeps the farms from being built
+        self.fleet = Fleet(
+            avg_dir=dirs["avg"],
+            cmp_dir=dirs["cmp"],
+            yaw_dir=dirs["yaw"],
+            single_plant="NONE",
+            max_workers=2,
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_one_job_per_technology(self):
+        jobs = self.fleet._get_windfarm_jobs("BR2")
+        self.assertEqual(
+            [job["name"] for job in jobs], ["BR2_GE_2_72_116", "BR2_GE_2_82_127"]
+        )
+        self.assertIn("BR2-K001", jobs[0]["turbines"])
+        self.assertTrue(jobs[0]["avg_path"].endswith("BR2.csv"))
+        self.assertIsNone(jobs[0]["yaw_path"])
+        # a chunked job reads the same lookback as a farm built in the process
+        self.assertEqual(jobs[0]["overlap_days"], get_required_overlap_days())
+
+    def test_subset_job_without_yaw_file(self):
+        job = self.fleet._get_windfarm_jobs("BR2")[0]
+        with mock.patch("Fleet.WindFarm") as windfarm, mock.patch(
+            "Fleet.get_windfarm_outputs", return_value={}
+        ):
+            outputs = create_windfarm_outputs(job)
+
+        kwargs = windfarm.call_args.kwargs
+        self.assertIsNone(kwargs["yaw_data"])
+        self.assertEqual(list(kwargs["avg_data"].columns), ["BR2-K001-KW"])
+        self.assertEqual(outputs.name, "BR2")
+
+    def test_chunked_paths_read_the_same_overlap(self):
+        self.fleet._window_days = 10
+        job = self.fleet._get_windfarm_jobs("BR2")[0]
+        with mock.patch("Fleet.ChunkedWindFarm") as chunked:
+            chunked.return_value._process.return_value = {}
+            create_windfarm_outputs(job)
+            self.fleet._create_chunked_windfarms("BR2")
+
+        overlaps = [call.kwargs["overlap_days"] for call in chunked.call_args_list]
+        self.assertEqual(overlaps, [get_required_overlap_days()] * 3)
+
+    def test_fleet_combines_outputs(self):
+        self.fleet._windfarms = {
+            "WAK": make_outputs("WAK", ["T001", "T002"]),
+            "KAY": make_outputs("KAY", ["T001"]),
+        }
+        self.assertEqual(self.fleet.get_daily_mean().shape, (3, 3))
+        lost_revenue = self.fleet.get_daily_lost_revenue()
+        self.assertTrue(all(c.endswith("-LOST-REVENUE") for c in lost_revenue.columns))
+        flagged, _ = self.fleet.get_flagged_turbines()
+        self.assertEqual(list(flagged["Wind Farm"].unique()), ["WAK", "KAY"])
+
+
+class TestFleetWorkerWindFarm(unittest.TestCase):
+    """A job run on a real WindFarm, built from synthetic input files."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        dirs = {}
+        for name in ["avg", "cmp", "yaw"]:
+            dirs[name] = os.path.join(self.temp_dir.name, name)
+            os.makedirs(dirs[name])
+
+        rng = np.random.default_rng(0)
+        index = pd.date_range("2024-01-01", periods=144 * 3, freq="10min", name="DateTime")
+        avg_columns = {}
+        cmp_pairs = []
+        event_times = pd.Series(index[::36].strftime("%m/%d/%Y %I:%M:%S %p"))
+        for turbine in ["WAK-T001", "WAK-T002"]:
+            avg_columns[f"{turbine}-KW"] = rng.uniform(100, 1700, len(index))
+            # with a wind speed, the farm could build power curves
+            avg_columns[f"{turbine}-DEN-CPM-WIND-SPD-CALC"] = rng.uniform(3, 12, len(index))
+            avg_columns[f"{turbine}-GEN-SPD-RPM"] = rng.uniform(900, 1400, len(index))
+            avg_columns[f"{turbine}-BLADE-ANGLE-A"] = rng.uniform(0, 10, len(index))
+            avg_columns[f"{turbine}-GEN-BRG-DE-T-C"] = rng.normal(50, 3, len(index))
+            for code_type, normal_code in [("ERR-CODE", 2), ("STATE", 16)]:
+                cmp_pairs.append(
+                    pd.DataFrame(
+                        {
+                            "DateTime": event_times,
+                            f"{turbine}-{code_type}": np.full(len(event_times), normal_code),
+                        }
+                    )
+                )
+        pd.DataFrame(avg_columns, index=index).to_csv(os.path.join(dirs["avg"], "WAK.csv"))
+        pd.concat(cmp_pairs, axis=1).to_csv(os.path.join(dirs["cmp"], "WAK.csv"), index=False)
+
+        self.fleet = Fleet(
+            avg_dir=dirs["avg"],
+            cmp_dir=dirs["cmp"],
+            yaw_dir=dirs["yaw"],
+            single_plant="NONE",
+            max_workers=2,
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_job_without_oem_powercurves(self):
+        [job] = self.fleet._get_windfarm_jobs("WAK")
+        self.assertIsNone(job["oem_powercurve_path"])
+
+        outputs = create_windfarm_outputs(job)
+
+        self.assertEqual(outputs.daily_mean.shape[0], 3)
+        self.assertEqual(
+            list(outputs.daily_severity_scores["Gen_Brg_DE_Temp"].columns),
+            ["WAK-T001-GEN-BRG-DE-T-C", "WAK-T002-GEN-BRG-DE-T-C"],
+        )
+        self.assertTrue(outputs.powercurves.empty)
+
+
+if __name__ == "__main__":
+    unittest.main()
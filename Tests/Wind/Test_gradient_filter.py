@@ -4,7 +4,7 @@ import numpy as np
 import pandas as pd
 from numpy.testing import assert_array_equal
 
-from Model.Filter import gradient_filter
+from Model.Filter import _full_windows, _shift_rows, _shifted_diff, gradient_filter
 
 
 class TestGradientFilter(unittest.TestCase):
@@ -304,3 +304,53 @@ class TestGradientFilter(unittest.TestCase):
         print("expected", expected)
         # Compare the result to the expected output
         np.testing.assert_array_almost_equal(result.values, expected.values)
+
+
+class TestGradientFilterKernel(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        values = rng.integers(0, 4, size=(60, 3)).astype(float)
+        values[10:14, 1] = np.nan
+        self.df = pd.DataFrame(values, columns=["A", "B", "C"])
+
+    def test_shifted_diff_matches_pandas(self):
+        values = self.df.to_numpy()
+        for periods in [1, 2, -1, -2, 60, -61]:
+            expected = self.df.diff(periods=periods).to_numpy()
+            assert_array_equal(_shifted_diff(values, periods), expected)
+
+    def test_full_windows_matches_rolling(self):
+        flags = self.df.to_numpy() <= 1
+        for window_size in [0, 1, 2, 4, 60, 61]:
+            expected = (
+                pd.DataFrame(flags).rolling(window=window_size).sum() == window_size
+            ).to_numpy()
+            assert_array_equal(_full_windows(flags, window_size), expected)
+
+    def test_shift_rows_fills_with_false(self):
+        flags = np.array([[True], [False], [True]])
+        assert_array_equal(_shift_rows(flags, 1), [[False], [True], [False]])
+        assert_array_equal(_shift_rows(flags, -2), [[True], [False], [False]])
+
+    def test_any_margin_extends_by_one_row(self):
+        df = pd.DataFrame({"A": [0.0, 5.0, 1.0, 1.0, 1.0, 7.0, 3.0, 9.0, 2.0]})
+        flagged = {}
+        for margin in [0, 1, 3]:
+            result, stats = gradient_filter(
+                df.copy(), 0.1, 10, 0, repeat_threshold=2, diff_depth=1, margin=margin
+            )
+            flagged[margin] = list(result["A"] == -9990)
+        self.assertEqual(
+            flagged[0], [False, False, True, True, True, False, False, False, False]
+        )
+        self.assertEqual(
+            flagged[1], [False, True, True, True, True, True, False, False, False]
+        )
+        self.assertEqual(flagged[3], flagged[1])
+        self.assertEqual(stats, {"A": 55.56})
+
+    def test_data_is_flagged_in_place(self):
+        df = pd.DataFrame({"A": [0.0, 5.0, 1.0, 1.0, 1.0, 7.0, 3.0, 9.0, 2.0]})
+        result, _ = gradient_filter(df, 0.1, 10, 0, repeat_threshold=2, diff_depth=1, margin=0)
+        self.assertIs(result, df)
+        self.assertEqual((df["A"] == -9990).sum(), 3)
@@ -0,0 +1,147 @@
+import sys
+
+sys.path.append("..")
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from Model.DataAccess import Parquet_Repository
+from Utils.ParquetFiles import (
+    convert_compressed_csv,
+    convert_time_series_csv,
+    iter_time_series_chunks,
+    read_column_names,
+    read_compressed,
+    read_time_series,
+)
+from Utils.Transformers import merge_csv_files
+
+
+class TestParquetFiles(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.avg_csv = os.path.join(self.temp_dir.name, "avg.csv")
+        self.avg_parquet = os.path.join(self.temp_dir.name, "avg.parquet")
+        self.cmp_csv = os.path.join(self.temp_dir.name, "cmp.csv")
+        self.cmp_parquet = os.path.join(self.temp_dir.name, "cmp.parquet")
+
+        self.avg_data = pd.DataFrame(
+            {
+                "WAK-T001-Active_Power": [1.5, 2.0, None, 4.0, 5.0],
+                "WAK-T002-Active_Power": [5.0, "bad", 7.0, 8.0, 9.0],
+                "WAK-T001-Nacelle_Temp": [10.0, 11.0, 12.0, 13.0, 14.0],
+            },
+            index=pd.date_range(start="2022-01-01", periods=5, freq="10T"),
+        )
+        self.avg_data.index.name = "Timestamp"
+        self.avg_data.to_csv(self.avg_csv)
+        convert_time_series_csv(self.avg_csv, self.avg_parquet, fill_value=-9999)
+
+        pd.DataFrame(
+            {
+                "WAK-T001-DateTime": ["01/01/2022 12:00:00 AM", "01/01/2022 12:25:00 AM"],
+                "WAK-T001-STATE": [2, 6],
+                "WAK-T002-DateTime": ["01/01/2022 12:05:00 AM", None],
+                "WAK-T002-STATE": [2, None],
+            }
+        ).to_csv(self.cmp_csv, index=False)
+        convert_compressed_csv(self.cmp_csv, self.cmp_parquet)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_time_series_conversion(self):
+        data = read_time_series(self.avg_parquet)
+        self.assertIsInstance(data.index, pd.DatetimeIndex)
+        self.assertTrue((data.dtypes == np.float32).all())
+        # missing and invalid values are converted like WindFarm does
+        self.assertEqual(data.iloc[2, 0], -9999)
+        self.assertEqual(data.iloc[1, 1], -9999)
+        self.assertEqual(data.iloc[0, 0], 1.5)
+
+    def test_read_column_names(self):
+        self.assertEqual(
+            read_column_names(self.avg_parquet), list(self.avg_data.columns)
+        )
+        # the header of a CSV file includes its index column
+        self.assertEqual(
+            read_column_names(self.avg_csv), ["Timestamp"] + list(self.avg_data.columns)
+        )
+
+    def test_read_time_series_projection(self):
+        columns = ["WAK-T001-Nacelle_Temp"]
+        from_parquet = read_time_series(self.avg_parquet, columns=columns)
+        from_csv = read_time_series(self.avg_csv, columns=columns)
+        self.assertEqual(list(from_parquet.columns), columns)
+        pd.testing.assert_frame_equal(
+            from_parquet, from_csv, check_dtype=False, check_freq=False
+        )
+
+    def test_iter_time_series_chunks(self):
+        chunks = list(
+            iter_time_series_chunks(
+                self.avg_parquet, 2, columns=["WAK-T001-Nacelle_Temp"]
+            )
+        )
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        data = pd.concat(chunks)
+        self.assertIsInstance(data.index, pd.DatetimeIndex)
+        self.assertEqual(list(data.columns), ["WAK-T001-Nacelle_Temp"])
+
+    def test_merge_csv_files_reads_parquet(self):
+        merged = merge_csv_files([self.avg_parquet])
+        self.assertEqual(list(merged.columns), list(self.avg_data.columns))
+
+    def test_compressed_conversion(self):
+        data = read_compressed(self.cmp_parquet)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(data["WAK-T001-DateTime"]))
+        self.assertEqual(data["WAK-T001-DateTime"][1], pd.Timestamp("2022-01-01 00:25"))
+        self.assertEqual(list(data["WAK-T001-STATE"]), [2, 6])
+        self.assertTrue(pd.isna(data["WAK-T002-DateTime"][1]))
+
+
+class TestParquetRepository(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "avg.parquet")
+        self.data_10min = pd.DataFrame(
+            {"valueA": [1, 2, 3, 4, 5], "valueB": [5, 6, 7, 8, 9]},
+            index=pd.date_range(start="2022-01-01", periods=5, freq="10T"),
+            dtype=np.float32,
+        )
+        self.data_10min.to_parquet(self.path)
+        self.data_10sec = pd.DataFrame(
+            {"valueC": [10, 11, 12, 13, 14]},
+            index=pd.date_range(start="2022-01-01", periods=5, freq="10S"),
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_column_names(self):
+        repo = Parquet_Repository(data_file_path=self.path)
+        repo.add_data(self.data_10sec, freq="10s")
+        self.assertEqual(repo.get_main_column_names(), ["valueA", "valueB"])
+        self.assertEqual(repo.get_all_column_names(), ["valueA", "valueB", "valueC"])
+        # the data itself is not loaded
+        self.assertIsNone(repo._data)
+
+    def test_get_column_data(self):
+        repo = Parquet_Repository(data_file_path=self.path)
+        repo.add_data(self.data_10sec, freq="10s")
+
+        data = repo.get_column_data(["valueB"])
+        pd.testing.assert_frame_equal(data, self.data_10min[["valueB"]], check_freq=False)
+
+        data = repo.get_column_data("valueC")
+        pd.testing.assert_frame_equal(data, self.data_10sec[["valueC"]])
+
+        with self.assertRaises(ValueError):
+            repo.get_column_data("valueZ")
+
+
+if __name__ == "__main__":
+    unittest.main()
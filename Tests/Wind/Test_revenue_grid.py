@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from Utils.RevenueGrid import DEFAULT_REVENUE_PER_MWH_PATH, RevenueGrid, load_revenue_grid
+from Utils.Transformers import MWh_csv_to_dict
+
+
+class TestRevenueGrid(unittest.TestCase):
+    def setUp(self):
+        self.csv_data = """Datetime,BR2,BTH
+01/01/2021 00:00,10,20
+01/01/2021 01:00,15,25
+01/02/2021 00:00,12,
+"""
+        self.grid = RevenueGrid.from_csv(StringIO(self.csv_data))
+
+    def test_lookup(self):
+        timestamps = pd.to_datetime(
+            [
+                "2021-01-01 00:00",
+                "2021-01-01 01:59",
+                "2021-01-01 02:00",  # no price for this hour
+                "2021-01-02 00:10",
+                "2020-12-31 23:00",  # before the grid
+                "2021-01-03 00:00",  # after the grid
+            ]
+        )
+        np.testing.assert_array_equal(
+            self.grid.lookup("BR2", timestamps), [10, 15, 0, 12, 0, 0]
+        )
+        np.testing.assert_array_equal(
+            self.grid.lookup("BTH", timestamps), [20, 25, 0, 0, 0, 0]
+        )
+        np.testing.assert_array_equal(self.grid.lookup("WAK", timestamps), np.zeros(6))
+
+    def test_matches_the_dict(self):
+        revenue_dict = MWh_csv_to_dict(StringIO(self.csv_data))
+        grid = RevenueGrid.from_dict(revenue_dict)
+        timestamps = pd.date_range("2020-12-31", periods=96, freq="h")
+        for project in ["BR2", "BTH"]:
+            expected = [
+                revenue_dict[project].get(str(t.date()), {}).get(t.hour, 0)
+                for t in timestamps
+            ]
+            np.testing.assert_array_equal(
+                np.nan_to_num(expected), grid.lookup(project, timestamps)
+            )
+        self.assertEqual(sorted(grid.projects), ["BR2", "BTH"])
+
+    def test_default_prices_file_does_not_depend_on_the_working_directory(self):
+        self.assertTrue(os.path.isfile(DEFAULT_REVENUE_PER_MWH_PATH))
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as root:
+            os.chdir(root)
+            try:
+                grid = load_revenue_grid()
+            finally:
+                os.chdir(cwd)
+        self.assertIsInstance(grid, RevenueGrid)
+
+
+if __name__ == "__main__":
+    unittest.main()
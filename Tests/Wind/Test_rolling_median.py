@@ -0,0 +1,52 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from Model import Filter
+from Model.Filter import _get_version, rolling_median
+
+
+class TestRollingMedian(unittest.TestCase):
+    def check(self, values, window, min_periods=None):
+        np.testing.assert_array_equal(
+            rolling_median(values, window, min_periods=min_periods),
+            pd.Series(values).rolling(window, min_periods=min_periods).median().to_numpy(),
+        )
+
+    def test_matches_pandas(self):
+        rng = np.random.default_rng(0)
+        values = rng.normal(0, 10, 2000)
+        for window, min_periods in [(1, 1), (2, 1), (21, 6), (500, 150), (501, None)]:
+            self.check(values, window, min_periods)
+
+    def test_ties(self):
+        values = np.random.default_rng(1).integers(-5, 5, 1000).astype(float)
+        self.check(values, 100, 30)
+
+    def test_shorter_than_the_window(self):
+        self.check(np.arange(10.0), 20, 5)
+
+    def test_missing_values(self):
+        values = np.arange(100.0)
+        values[::7] = np.nan
+        self.check(values, 10, 3)
+
+    def test_old_scipy_falls_back_to_pandas(self):
+        values = np.random.default_rng(2).normal(0, 10, 1000)
+        with mock.patch.object(Filter, "HAS_FAST_RANK_FILTER", False):
+            with mock.patch.object(Filter.ndimage, "rank_filter") as rank_filter:
+                self.check(values, 100, 30)
+                self.check(values, 101, None)
+        rank_filter.assert_not_called()
+
+    def test_get_version(self):
+        self.assertEqual(_get_version("1.5.4"), (1, 5))
+        self.assertEqual(_get_version("1.14.0rc1"), (1, 14))
+        self.assertLess(_get_version("1.13.1"), (1, 14))
+        self.assertGreaterEqual(_get_version("2.0.0"), (1, 14))
+
+
+if __name__ == "__main__":
+    unittest.main()
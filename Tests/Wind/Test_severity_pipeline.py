@@ -0,0 +1,56 @@
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from Utils.Transformers import (
+    calculate_daily_sums,
+    custom_sum,
+    filter_days,
+    filter_low_recovery_days,
+)
+
+if os.path.basename(os.getcwd()) != "Tests":
+    os.chdir("Tests")
+
+
+class TestSeverityPipeline(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        index = pd.date_range("2024-01-01 08:00", periods=144 * 3, freq="10min")
+        values = rng.normal(size=(len(index), 3))
+        values[0:40, 0] = np.nan  # first (partial) day of A below 90%
+        values[136:280, :] = np.nan  # the whole second day
+        values[300:310, 2] = np.nan  # a short gap C should survive
+        self.df = pd.DataFrame(values, index=index, columns=["A", "B", "C"])
+
+    def test_filter_low_recovery_days_matches_filter_days(self):
+        expected = self.df.groupby(self.df.index.date, group_keys=False).apply(
+            lambda x: x.apply(lambda y: filter_days(y, freq="10T", threshold=0.9))
+        )
+        result = filter_low_recovery_days(self.df, freq="10T", threshold=0.9)
+        # days where every column fails come back blank rather than dropped
+        pd.testing.assert_frame_equal(result.dropna(how="all"), expected.dropna(how="all"))
+        self.assertEqual(len(result), len(self.df))
+        self.assertTrue(result.iloc[136:280].isna().all().all())
+
+    def test_filter_low_recovery_days_unknown_freq(self):
+        with self.assertRaises(ValueError):
+            filter_low_recovery_days(self.df, freq="5T")
+
+    def test_calculate_daily_sums_matches_custom_sum(self):
+        expected = self.df.groupby(self.df.index.date).apply(
+            lambda x: x.apply(custom_sum)
+        ).astype("float64")
+        result = calculate_daily_sums(self.df)
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+    def test_calculate_daily_sums_empty(self):
+        result = calculate_daily_sums(self.df.iloc[0:0])
+        self.assertEqual(len(result), 0)
+        self.assertEqual(list(result.columns), ["A", "B", "C"])
+
+
+if __name__ == "__main__":
+    unittest.main()
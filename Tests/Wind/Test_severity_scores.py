@@ -1,5 +1,7 @@
+import gc
 import os
 import unittest
+import weakref
 from datetime import datetime
 
 import numpy as np
@@ -187,6 +189,18 @@ class FarmComponentTestCase(unittest.TestCase):
         expected_scores = expected_scores.astype("float64")
         pd.testing.assert_frame_equal(scores, expected_scores.T)
 
+    def test_severity_scores_are_cached_with_the_component(self):
+        scores = self.component.get_severity_scores(period="2H", density_thresh=0.5)
+        self.assertIs(
+            self.component.get_severity_scores(period="2H", density_thresh=0.5), scores
+        )
+
+        # the cache does not keep the component, and its data, alive
+        component = weakref.ref(self.component)
+        del self.component, self.wind_farm
+        gc.collect()
+        self.assertIsNone(component())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -17,6 +17,7 @@ class DataSourceType(Enum):
     MS_SQL_DATABASE = auto()
     POSTGRES_DATABASE = auto()
     INTERNAL_CALCULATED = auto()
+    PARQUET = auto()
 
 
 # these values will become property names
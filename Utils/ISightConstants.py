@@ -208,6 +208,7 @@ METRIC_TOOLTIP_DECIMAL_ROUNDING = {
     "pct diff": 0,
 }
 TOOLTIP_LOST_ENERGY_DECIMAL_ROUNDING = 0
+BUDGET_DEVIATION_KPIS = ["energy", "revenue"]
 
 TORNADO_TOOLTIP_CODE_ALL_MISSING = "EMP"
 TORNADO_TOOLTIP_SYMBOL_MISSING = -999
@@ -0,0 +1,344 @@
+"""Parquet copies of the wind input files, and readers for either format.
+
+The AVG, compressed (CMP) and YAW inputs are wide CSV files. Parsing them
+is the slowest part of building a Fleet, and every reader parsed whole
+files even when it needed a few columns. Once converted to Parquet:
+
+- the AVG and YAW files hold float32 values under a timestamp index (the
+  AVG values are converted with -9999 for the missing or invalid ones,
+  the way WindFarm loads them),
+- the datetime columns of the compressed files are parsed timestamps
+  and their codes are numbers,
+
+and their columns can be read one by one (see `read_time_series` and
+`Model.DataAccess.Parquet_Repository`).
+
+The conversion is run once, for the input directories of a Fleet:
+
+    python -m Utils.ParquetFiles --avg-dir avg --cmp-dir cmp --yaw-dir yaw --out-dir parquet
+
+Every reader below picks the format from the file extension, so the
+converted directories can be given to a Fleet instead of the CSV ones.
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+# the rows of each row group of a converted AVG or YAW file, so a reader
+# can skip to a date (60 days of 10 minute data, a day of 10 second data)
+TIME_SERIES_ROW_GROUP_ROWS = 8640
+
+# the range a binary search of a CSV file narrows down to, in bytes
+CSV_SEARCH_BLOCK_SIZE = 64 * 1024
+
+COMPRESSED_DATETIME_FORMATS = [
+    "%m/%d/%Y %I:%M:%S %p",
+    "%m/%d/%Y %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S %p",
+]
+
+
+def is_parquet_path(path):
+    """Whether a path is a Parquet file, from its extension."""
+    return isinstance(path, str) and path.lower().endswith(PARQUET_EXTENSIONS)
+
+
+def read_column_names(path):
+    """Return the column names of a file, without reading its data.
+
+    Args:
+        path (str): A CSV or Parquet file.
+
+    Returns:
+        (list): The column names. For a Parquet file written from a
+            DataFrame, the index is not included.
+    """
+    if is_parquet_path(path):
+        schema = pq.read_schema(path)
+        index_columns = _get_index_columns(schema)
+        return [name for name in schema.names if name not in index_columns]
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _get_index_columns(schema):
+    """The columns holding the index of a DataFrame written to Parquet."""
+    if schema.pandas_metadata is None:
+        return []
+    # (a RangeIndex is described by a dict, and not stored as a column)
+    return [c for c in schema.pandas_metadata.get("index_columns", []) if isinstance(c, str)]
+
+
+def read_time_series(path, columns=None):
+    """Read a time indexed file (AVG or YAW).
+
+    Args:
+        path (str): A CSV file whose first column holds the timestamps, or
+            a Parquet file.
+        columns (list, optional): Only read these columns. Defaults to all.
+
+    Returns:
+        (pandas.DataFrame): The data, indexed by timestamp.
+    """
+    if is_parquet_path(path):
+        return pd.read_parquet(path, columns=columns)
+    data = pd.read_csv(path, index_col=[0], parse_dates=[0])
+    if columns is not None:
+        data = data[columns]
+    return data
+
+
+def iter_time_series_chunks(path, chunk_rows, columns=None, start=None):
+    """Read a time indexed file (AVG or YAW) forward, in chunks.
+
+    The file must be sorted by timestamp.
+
+    Args:
+        path (str): A CSV file whose first column holds the timestamps, or
+            a Parquet file.
+        chunk_rows (int): The number of rows of each chunk.
+        columns (list, optional): Only read these columns. Defaults to all.
+        start (pandas.Timestamp, optional): Skip the start of the file, up to
+            this timestamp, without parsing it: the row groups of a Parquet
+            file that end before it, and the CSV lines found before it by a
+            binary search of the file. Some rows before `start` may still be
+            yielded. Defaults to reading the whole file.
+
+    Yields:
+        (pandas.DataFrame): The chunks, indexed by timestamp.
+    """
+    if is_parquet_path(path):
+        parquet_file = pq.ParquetFile(path)
+        row_groups = None
+        if start is not None:
+            row_groups = _get_row_groups_from(parquet_file, start)
+        if columns is not None:
+            columns = list(columns) + _get_index_columns(parquet_file.schema_arrow)
+        for batch in parquet_file.iter_batches(
+            batch_size=chunk_rows, row_groups=row_groups, columns=columns
+        ):
+            yield batch.to_pandas()
+        return
+
+    header = pd.read_csv(path, index_col=[0], nrows=0)
+    with open(path, "rb") as f:
+        f.readline()
+        data_offset = f.tell()
+        offset = data_offset if start is None else _find_csv_offset(f, pd.Timestamp(start))
+        if offset == data_offset:
+            chunks = pd.read_csv(path, index_col=[0], parse_dates=[0], chunksize=chunk_rows)
+        else:
+            f.seek(offset)
+            chunks = pd.read_csv(
+                f,
+                header=None,
+                names=[header.index.name] + list(header.columns),
+                index_col=[0],
+                parse_dates=[0],
+                chunksize=chunk_rows,
+            )
+        with chunks:
+            for chunk in chunks:
+                yield chunk if columns is None else chunk[columns]
+
+
+def _get_row_groups_from(parquet_file, start):
+    """The row groups of a Parquet file from the first one not ending before `start`.
+
+    Returns None (all of them) when the index has no statistics to compare.
+    """
+    index_columns = _get_index_columns(parquet_file.schema_arrow)
+    if not index_columns:
+        return None
+    metadata = parquet_file.metadata
+    column = metadata.schema.names.index(index_columns[0])
+    first = 0
+    for i in range(metadata.num_row_groups):
+        statistics = metadata.row_group(i).column(column).statistics
+        if statistics is None or not statistics.has_min_max:
+            break
+        try:
+            if pd.Timestamp(statistics.max) >= start:
+                break
+        except TypeError:
+            # eg. a timezone aware index compared with a naive start
+            break
+        first = i + 1
+    return list(range(first, metadata.num_row_groups))
+
+
+def _find_csv_offset(f, start, block_size=None):
+    """Binary search a CSV file sorted by timestamp for a line before `start`.
+
+    Args:
+        f (file): The file, opened in binary mode, positioned after the header.
+        start (pandas.Timestamp): The timestamp to look for.
+        block_size (int, optional): Stop searching once the range is this
+            small, in bytes. Defaults to CSV_SEARCH_BLOCK_SIZE.
+
+    Returns:
+        (int): The offset of a line whose timestamp is before `start` (or
+            of the first line), such that no line before it is at or after
+            `start`.
+    """
+    if block_size is None:
+        block_size = CSV_SEARCH_BLOCK_SIZE
+    low = f.tell()
+    f.seek(0, os.SEEK_END)
+    high = f.tell()
+    while high - low > block_size:
+        middle = (low + high) // 2
+        f.seek(middle - 1)
+        f.readline()  # to the first line starting at or after `middle`
+        offset = f.tell()
+        if offset <= low:
+            break
+        line = f.readline()
+        if offset >= high or not line.strip():
+            high = middle
+            continue
+        try:
+            timestamp = pd.Timestamp(line.split(b",", 1)[0].decode().strip().strip('"'))
+        except ValueError:
+            break
+        if timestamp is pd.NaT:
+            break
+        if timestamp < start:
+            low = offset
+        else:
+            high = middle
+    return low
+
+
+def read_compressed(path):
+    """Read a compressed data file.
+
+    Args:
+        path (str): A CSV or Parquet file.
+
+    Returns:
+        (pandas.DataFrame): The data, laid out datetime, value, datetime,
+            value...
+    """
+    if is_parquet_path(path):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, low_memory=False)
+
+
+def parse_compressed_datetimes(compressed_data):
+    """Parse the datetime columns of compressed data.
+
+    `normalize_compressed` uses datetime columns as they are, so they only
+    need to be parsed once.
+
+    Args:
+        compressed_data (pandas.DataFrame): The compressed data.
+
+    Returns:
+        (pandas.DataFrame): A copy with datetime64 timestamp columns.
+    """
+    compressed_data = compressed_data.copy()
+    for datetime_col in compressed_data.columns[::2]:
+        if pd.api.types.is_datetime64_any_dtype(compressed_data[datetime_col]):
+            continue
+        for format in COMPRESSED_DATETIME_FORMATS:
+            try:
+                compressed_data[datetime_col] = pd.to_datetime(
+                    compressed_data[datetime_col], format=format, errors="raise"
+                )
+                break
+            except (ValueError, TypeError):
+                continue
+    return compressed_data
+
+
+def convert_time_series_csv(csv_path, parquet_path, fill_value=None):
+    """Convert an AVG or YAW CSV file to Parquet.
+
+    Args:
+        csv_path (str): The CSV file. The first column holds the timestamps.
+        parquet_path (str): The Parquet file to write.
+        fill_value (float, optional): The value of the missing and invalid
+            values. Defaults to leaving them NaN.
+    """
+    data = pd.read_csv(csv_path, index_col=[0], parse_dates=[0])
+    data = data.apply(lambda x: pd.to_numeric(x, errors="coerce"))
+    if fill_value is not None:
+        data = data.fillna(fill_value)
+    data.astype(np.float32).to_parquet(
+        parquet_path, row_group_size=TIME_SERIES_ROW_GROUP_ROWS
+    )
+
+
+def convert_compressed_csv(csv_path, parquet_path):
+    """Convert a compressed data CSV file to Parquet.
+
+    The datetime columns are parsed. The code columns are stored as
+    numbers when they are numeric (not float32, so that every code keeps
+    its exact value), and as strings otherwise.
+
+    Args:
+        csv_path (str): The CSV file.
+        parquet_path (str): The Parquet file to write.
+    """
+    data = parse_compressed_datetimes(pd.read_csv(csv_path, low_memory=False))
+    for value_col in data.columns[1::2]:
+        try:
+            data[value_col] = pd.to_numeric(data[value_col])
+        except (ValueError, TypeError):
+            data[value_col] = data[value_col].astype("string")
+    data.to_parquet(parquet_path)
+
+
+def convert_directory(csv_dir, parquet_dir, convert):
+    """Convert every CSV file of a directory.
+
+    Args:
+        csv_dir (str): The input directory.
+        parquet_dir (str): The output directory. It is created if it does
+            not exist.
+        convert (callable): Called with the CSV path and the Parquet path.
+
+    Returns:
+        (list): The Parquet files written.
+    """
+    os.makedirs(parquet_dir, exist_ok=True)
+    written = []
+    for file in sorted(os.listdir(csv_dir)):
+        stem, extension = os.path.splitext(file)
+        if extension.lower() != ".csv":
+            continue
+        parquet_path = os.path.join(parquet_dir, f"{stem}.parquet")
+        convert(os.path.join(csv_dir, file), parquet_path)
+        written.append(parquet_path)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the wind input CSV files to Parquet.")
+    parser.add_argument("--avg-dir", help="directory of the AVG CSV files")
+    parser.add_argument("--cmp-dir", help="directory of the compressed CSV files")
+    parser.add_argument("--yaw-dir", help="directory of the YAW CSV files")
+    parser.add_argument("--out-dir", required=True, help="writes avg/, cmp/ and yaw/ here")
+    args = parser.parse_args()
+
+    conversions = [
+        (args.avg_dir, "avg", lambda c, p: convert_time_series_csv(c, p, fill_value=-9999)),
+        (args.cmp_dir, "cmp", convert_compressed_csv),
+        (args.yaw_dir, "yaw", convert_time_series_csv),
+    ]
+    for csv_dir, name, convert in conversions:
+        if csv_dir is None:
+            continue
+        written = convert_directory(csv_dir, os.path.join(args.out_dir, name), convert)
+        print(f"ParquetFiles: {len(written)} {name} files written")
+
+
+if __name__ == "__main__":
+    main()
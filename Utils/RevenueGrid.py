@@ -0,0 +1,156 @@
+"""Hourly revenue prices per project, for vectorized lookups.
+
+The lost revenue of a lost energy value is its MWh times the price of its
+project at its hour. `MWh_csv_to_dict` loads the prices as a
+`{project: {day: {hour: price}}}` dict, which takes one Python lookup per
+value. `RevenueGrid` holds them as a (project x hour) float array instead,
+so the prices of many timestamps are found with one indexing operation.
+
+The prices file is loaded once per process, and shared by the wind farms
+and the fault analysis (see `load_revenue_grid`).
+"""
+
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# resolved from this module, so it does not depend on the working directory
+DEFAULT_REVENUE_PER_MWH_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "assets",
+    "data",
+    "RevenuePerMWh.csv",
+)
+
+NANOSECONDS_PER_HOUR = 3600 * 10**9
+
+
+class RevenueGrid:
+    """The revenue per MWh of each project, for every hour from an epoch."""
+
+    def __init__(self, projects, epoch, prices):
+        """Initializes a new instance of the class.
+
+        Args:
+            projects (list): The project codes, like "WAK", one per row of
+                `prices`.
+            epoch (pandas.Timestamp): The hour of the first column of
+                `prices`.
+            prices (numpy.ndarray): The (project x hour) prices.
+        """
+        self._rows = {project: row for row, project in enumerate(projects)}
+        self._epoch = None if epoch is None else pd.Timestamp(epoch).as_unit("ns")
+        self._prices = prices
+
+    @classmethod
+    def from_frame(cls, prices):
+        """Build a grid from a frame of prices.
+
+        Args:
+            prices (pandas.DataFrame): The prices, indexed by datetime, with
+                one column per project. Like `MWh_csv_to_dict`, which keys
+                the prices by day and hour, only the first row of an hour
+                is used. Missing prices count as 0.
+
+        Returns:
+            (RevenueGrid): The grid.
+        """
+        if len(prices) == 0:
+            return cls(list(prices.columns), None, np.zeros((len(prices.columns), 0)))
+        hours = pd.DatetimeIndex(prices.index).floor("h").as_unit("ns")
+        epoch = hours.min()
+        offsets = (hours.asi8 - epoch.value) // NANOSECONDS_PER_HOUR
+        first = ~pd.Index(offsets).duplicated(keep="first")
+
+        grid = np.zeros((len(prices.columns), offsets.max() + 1))
+        grid[:, offsets[first]] = np.nan_to_num(prices.to_numpy(dtype=float)[first].T)
+        return cls(list(prices.columns), epoch, grid)
+
+    @classmethod
+    def from_csv(cls, file_path):
+        """Load a grid from a prices file like "RevenuePerMWh.csv".
+
+        Args:
+            file_path (str): A CSV file whose first column holds the
+                datetimes and whose other columns are projects.
+
+        Returns:
+            (RevenueGrid): The grid.
+        """
+        return cls.from_frame(pd.read_csv(file_path, parse_dates=[0], index_col=[0]))
+
+    @classmethod
+    def from_dict(cls, revenue_dict):
+        """Build a grid from the nested dict of `MWh_csv_to_dict`.
+
+        Args:
+            revenue_dict (dict): {project: {day: {hour: revenue_per_mwh}}}
+
+        Returns:
+            (RevenueGrid): The grid.
+        """
+        records = [
+            (project, pd.Timestamp(day) + pd.Timedelta(hours=int(hour)), price)
+            for project, days in revenue_dict.items()
+            for day, hours in days.items()
+            for hour, price in hours.items()
+        ]
+        prices = pd.DataFrame(records, columns=["Project", "Datetime", "Price"])
+        prices = prices.pivot_table(
+            index="Datetime", columns="Project", values="Price", aggfunc="first"
+        )
+        for project in revenue_dict:
+            if project not in prices.columns:
+                prices[project] = np.nan
+        return cls.from_frame(prices)
+
+    @property
+    def projects(self):
+        """list: The projects of the grid."""
+        return list(self._rows)
+
+    def lookup(self, project, timestamps):
+        """Return the revenue per MWh of a project at each timestamp.
+
+        Args:
+            project (str): The project code, like "WAK".
+            timestamps (pandas.DatetimeIndex or array-like): The timestamps.
+                Only their day and hour matter.
+
+        Returns:
+            (numpy.ndarray): The prices. They are 0 for an unknown project
+                and for the timestamps outside of the grid.
+        """
+        timestamps = pd.DatetimeIndex(timestamps).as_unit("ns")
+        prices = np.zeros(len(timestamps))
+        row = self._rows.get(project)
+        if row is None or self._epoch is None:
+            return prices
+        offsets = (timestamps.asi8 - self._epoch.value) // NANOSECONDS_PER_HOUR
+        valid = (offsets >= 0) & (offsets < self._prices.shape[1]) & ~timestamps.isna()
+        prices[valid] = self._prices[row, offsets[valid]]
+        return prices
+
+
+def load_revenue_grid(file_path=None):
+    """Load the revenue grid of a prices file, once per process.
+
+    Args:
+        file_path (str, optional): The prices file. Defaults to
+            DEFAULT_REVENUE_PER_MWH_PATH.
+
+    Returns:
+        (RevenueGrid): The grid, shared by every caller. It must not be
+            modified.
+    """
+    if file_path is None:
+        file_path = DEFAULT_REVENUE_PER_MWH_PATH
+    return _load_revenue_grid(file_path)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_revenue_grid(file_path):
+    return RevenueGrid.from_csv(file_path)
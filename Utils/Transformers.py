@@ -16,6 +16,8 @@ from Utils.Constants import (
     TRANSFORMER_COMPONENTS
 )
 from Utils.Enums import ComponentTypes
+from Utils.ParquetFiles import read_time_series
+from Utils.RevenueGrid import RevenueGrid
 from Utils.UiConstants import (
     NULL_FAULT_DESCRIPTION,
     TURBINE_FAULT_DELIM,
@@ -359,7 +361,7 @@ def merge_csv_files(path):
     Merge CSV Files
 
     Opens each CSV file individually, parses dates in the first column, sets the first column as the index,
-    and merges all the DataFrames together on their indices.
+    and merges all the DataFrames together on their indices. Parquet files are read as they are.
 
     Args:
         path (str or list): A string representing a single file path or a list of file paths.
@@ -377,11 +379,9 @@ def merge_csv_files(path):
 
     dfs = []  # List to store individual DataFrames
 
-    # Open and process each CSV file
+    # Open and process each file
     for file_path in path:
-        df = pd.read_csv(
-            file_path, parse_dates=[0], index_col=0
-        )  # Read CSV and parse dates in the first column
+        df = read_time_series(file_path)  # Parses dates in the first column of a CSV
         dfs.append(df)  # Add DataFrame to the list
 
     merged_df = pd.concat(
@@ -445,13 +445,13 @@ def normalize_compressed(csv_file=None, data=None, type=None, codes=None):
     for col in datetime_columns:
         if pd.api.types.is_datetime64_any_dtype(df[col]):
             # If the column is already a datetime, add it to raveled_frame
-            raveled_frame = raveled_frame.append(df[col])
+            raveled_frame = pd.concat([raveled_frame, df[col]])
         else:
             for format in formats:
                 try:
                     # Convert and append to raveled_frame
                     converted = pd.to_datetime(df[col], format=format, errors="raise")
-                    raveled_frame = raveled_frame.append(converted)
+                    raveled_frame = pd.concat([raveled_frame, converted])
                     break  # Exit the loop if conversion is successful
                 except (ValueError, TypeError):
                     print(ValueError, TypeError)
@@ -903,26 +903,25 @@ def map_mwh_to_revenue(df, revenue_dict):
 
     Args:
         df (pd.DataFrame): DataFrame containing megawatt-hour values.
-        revenue_dict (dict): Dictionary with the structure {project_name: {day: {hour: revenue_per_mwh}}}
+        revenue_dict (RevenueGrid or dict): The prices, as a `RevenueGrid` or a dictionary with the
+            structure {project_name: {day: {hour: revenue_per_mwh}}}
 
     Returns:
         pd.DataFrame: DataFrame with the same structure as the input, but with values converted to revenue amounts.
     """
     if df is None:
         return None
-    # Extract days and hours for the entire DataFrame
-    days = df.index.date.astype(str)
-    hours = df.index.hour
+    if not isinstance(revenue_dict, RevenueGrid):
+        revenue_dict = RevenueGrid.from_dict(revenue_dict)
 
+    # the prices of each project are looked up once for the entire DataFrame
+    project_prices = {}
     for col in df.columns:
         project = col.split("-")[0]
+        if project not in project_prices:
+            project_prices[project] = revenue_dict.lookup(project, df.index)
 
-        revenue_per_mwh = [
-            revenue_dict.get(project, {}).get(day, {}).get(hour, 0)
-            for day, hour in zip(days, hours)
-        ]
-
-        df[col] *= revenue_per_mwh
+        df[col] *= project_prices[project]
 
     return df
 
@@ -981,25 +980,20 @@ def calculate_window_severity_with_recovery_threshold(z_scores, period, density_
     - pd.DataFrame: The rolling sum of severity scores for windows meeting the recovery rate threshold,
                     with all timestamps included.
     """
-    # Initialize a DataFrame to store results, with the same index as the original DataFrame and NaN values
-    window_severity_frame = pd.DataFrame(index=z_scores.index, columns=z_scores.columns)
-    window_severity_frame[:] = np.nan
-
     # Perform rolling calculations
     rolling_masked_z_scores = z_scores.rolling(period)
-    window_counts = rolling_masked_z_scores.count()
 
     # Ensure that window_counts and period are numeric and compatible for division
-    window_counts = z_scores.rolling(period).count().astype(float)
+    window_counts = rolling_masked_z_scores.count().astype(float)
     period_float = float(period)  # Cast period to float to ensure compatibility
 
     # Calculate recovery rate for each window
     window_proportion = window_counts / period_float
     valid_windows_mask = window_proportion >= density_thresh
 
-    # Update the result DataFrame for windows that meet the threshold
-    window_sum = rolling_masked_z_scores.sum(min_count=1)
-    window_severity_frame[valid_windows_mask] = window_sum[valid_windows_mask]
+    # Keep the sums of the windows that meet the threshold, NaN elsewhere
+    window_sum = rolling_masked_z_scores.sum()
+    window_severity_frame = window_sum.where(valid_windows_mask)
 
     return window_severity_frame
 
@@ -1007,24 +1001,19 @@ def calculate_window_severity_with_recovery_threshold(z_scores, period, density_
 import pandas as pd
 
 
-def filter_days(group, interval=None, threshold=None, freq=None):
-    """Filter groups of 10-minute data for recovery.
+def get_intervals_per_day(interval=None, freq=None):
+    """The number of records a day of data is expected to hold.
 
     Args:
-        group (pandas.DataFrame or pandas.Series): DataFrame or Series containing the data for the recovery rate.
         interval (integer): The number of minutes represented by each time stamp. Defaults to 10.
-        threshold (float): This proportion of records must be valid for the frame. Defaults to 0.9.
         freq (str): Pandas time frequency alias.
 
     Returns:
-        pandas.DataFrame or pandas.Series: Returns an empty DataFrame/Series if the recovery is too low or the original DataFrame/Series if it is not.
+        int: The expected number of records per day.
     """
     if interval is None:
         interval = 10
 
-    if threshold is None:
-        threshold = 0.9
-
     multiplier = 60
     if freq == "H":
         multiplier = 1
@@ -1037,7 +1026,25 @@ def filter_days(group, interval=None, threshold=None, freq=None):
             f"Frequency '{freq}' not recognized. Handling needs to be added."
         )
 
-    intervals_per_day = 24 * multiplier // interval
+    return 24 * multiplier // interval
+
+
+def filter_days(group, interval=None, threshold=None, freq=None):
+    """Filter groups of 10-minute data for recovery.
+
+    Args:
+        group (pandas.DataFrame or pandas.Series): DataFrame or Series containing the data for the recovery rate.
+        interval (integer): The number of minutes represented by each time stamp. Defaults to 10.
+        threshold (float): This proportion of records must be valid for the frame. Defaults to 0.9.
+        freq (str): Pandas time frequency alias.
+
+    Returns:
+        pandas.DataFrame or pandas.Series: Returns an empty DataFrame/Series if the recovery is too low or the original DataFrame/Series if it is not.
+    """
+    if threshold is None:
+        threshold = 0.9
+
+    intervals_per_day = get_intervals_per_day(interval=interval, freq=freq)
     valid_records = group.dropna().shape[0]
 
     # Check recovery rate
@@ -1048,6 +1055,92 @@ def filter_days(group, interval=None, threshold=None, freq=None):
         return group
 
 
+def filter_low_recovery_days(df, interval=None, threshold=None, freq=None):
+    """Blank out the days of each column whose recovery is too low.
+
+    This gives the same result as applying `filter_days` to every column
+    of every day of `df`, without a Python call per (day, column) pair:
+    the valid records are counted per day and column in one pass, and the
+    days that fail the threshold are blanked with a single `where`.
+
+    Args:
+        df (pandas.DataFrame): Time series, one column per turbine, with a
+            DatetimeIndex.
+        interval (integer): The number of minutes represented by each time stamp. Defaults to 10.
+        threshold (float): This proportion of records must be valid for a day. Defaults to 0.9.
+        freq (str): Pandas time frequency alias.
+
+    Returns:
+        pandas.DataFrame: `df`, sorted by time, where the days with a low
+            recovery are NaN for the columns they failed in.
+    """
+    if threshold is None:
+        threshold = 0.9
+
+    intervals_per_day = get_intervals_per_day(interval=interval, freq=freq)
+    if len(df) == 0:
+        return df.copy()
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+
+    # the rows of a day are contiguous once sorted, so a day is a slice
+    day_starts, day_ends = _day_slices(df.index)
+    day_lengths = day_ends - day_starts
+
+    # (days x columns) number of valid records
+    valid_counts = np.add.reduceat(
+        df.notna().to_numpy(dtype=np.int64), day_starts, axis=0
+    )
+    keep_days = valid_counts / intervals_per_day >= threshold
+    keep = np.repeat(keep_days, day_lengths, axis=0)
+    return df.where(keep)
+
+
+def _day_slices(index):
+    """The (start, end) positions of each day of a sorted DatetimeIndex."""
+    days = index.normalize()
+    day_starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    day_ends = np.r_[day_starts[1:], len(index)]
+    return day_starts, day_ends
+
+
+def calculate_daily_sums(df):
+    """Sum each column per day, like `custom_sum` applied to every day.
+
+    The days without any value are NaN. Each day is reduced for all the
+    columns at once, with the same pairwise summation that `Series.sum`
+    uses, so the results are identical to the per-column sums.
+
+    Args:
+        df (pandas.DataFrame): Time series with a DatetimeIndex.
+
+    Returns:
+        pandas.DataFrame: One row per day, indexed by `datetime.date`
+            like `df.groupby(df.index.date)`, with the columns of `df`.
+    """
+    if len(df) == 0:
+        return pd.DataFrame(index=pd.Index([], dtype=object), columns=df.columns, dtype=float)
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    day_starts, day_ends = _day_slices(df.index)
+
+    values = df.to_numpy(dtype=float)
+    is_valid = ~np.isnan(values)
+    # (columns x rows), so that each column of a day is contiguous
+    filled = np.ascontiguousarray(np.where(is_valid, values, 0.0).T)
+    sums = np.stack(
+        [filled[:, start:end].sum(axis=1) for start, end in zip(day_starts, day_ends)]
+    )
+    valid_counts = np.add.reduceat(is_valid.astype(np.int64), day_starts, axis=0)
+    sums[valid_counts == 0] = np.nan
+
+    return pd.DataFrame(
+        sums,
+        index=pd.Index(df.index[day_starts].date, dtype=object),
+        columns=df.columns,
+    )
+
+
 def custom_sum(series):
     """Handle missings differently than the native sum
 
@@ -0,0 +1,148 @@
+"""Benchmark the peak memory of a `WindFarm` and a `ChunkedWindFarm` against the history length.
+
+A `WindFarm` holds all of its AVG data, and every filtered copy of it, so
+its peak memory grows with the number of days. `ChunkedWindFarm` only
+holds one window (with its overlap) at a time, plus the daily outputs. The
+farm is synthetic: an AVG and a compressed CSV file of a few turbines, with
+online codes and some faults, and the OEM power curves of the repo, so no
+workspace is needed:
+
+    python -m benchmarks.bench_chunked_memory --turbines 10 --days 30 60 120 240 --window-days 15
+
+The peaks are the ones `tracemalloc` sees, which covers the NumPy arrays
+of pandas. Both farms compute the daily means, efficiency, severity scores
+and power curves, and their outputs are checked to be the same. At 10
+turbines and windows of 15 days, the peak of a WindFarm went from 22 MiB
+at 30 days to 169 MiB at 240 days, and the one of a ChunkedWindFarm from
+18 MiB to 32 MiB: what still grows is the compressed data, which is read
+in full, and the daily outputs.
+"""
+
+import argparse
+import os
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from Model.ChunkedWindFarm import ChunkedWindFarm, get_required_overlap_days
+from Model.WindFarm import WindFarm
+from Model.WindFarmOutputs import get_windfarm_outputs
+from Utils.Enums import DataSourceType
+
+
+OEM_POWERCURVE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "assets",
+    "data",
+    "power_curves",
+    "all_power_curves.csv",
+)
+
+
+def write_farm_files(root, turbines, days, seed=0):
+    """Write the AVG and compressed CSV files of a synthetic WAK farm.
+
+    Returns:
+        (tuple): The paths of the AVG and compressed files.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=144 * days, freq="10min", name="DateTime")
+    avg_columns = {}
+    cmp_pairs = []
+    event_times = pd.Series(index[::36].strftime("%m/%d/%Y %I:%M:%S %p"))
+    for i in range(turbines):
+        turbine = f"WAK-T{i + 1:03d}"
+        wind_speed = np.clip(rng.normal(8, 3, len(index)), 0, 25)
+        power = np.clip(wind_speed**3, 0, 1780) + rng.normal(0, 5, len(index))
+        avg_columns[f"{turbine}-KW"] = power
+        avg_columns[f"{turbine}-EXPCTD-KW-CALC"] = power * rng.uniform(1, 1.1, len(index))
+        avg_columns[f"{turbine}-DEN-CPM-WIND-SPD-CALC"] = wind_speed
+        avg_columns[f"{turbine}-GEN-SPD-RPM"] = rng.uniform(900, 1400, len(index))
+        avg_columns[f"{turbine}-BLADE-ANGLE-A"] = rng.uniform(0, 10, len(index))
+        avg_columns[f"{turbine}-GEN-BRG-DE-T-C"] = rng.normal(50 + i, 3, len(index))
+        for code_type, normal_code, fault_code in [("ERR-CODE", 2, 5), ("STATE", 16, 1)]:
+            codes = np.where(rng.random(len(event_times)) < 0.1, fault_code, normal_code)
+            cmp_pairs.append(
+                pd.DataFrame({"DateTime": event_times, f"{turbine}-{code_type}": codes})
+            )
+
+    avg_path = os.path.join(root, f"WAK_{days}.csv")
+    cmp_path = os.path.join(root, f"WAK_{days}_cmp.csv")
+    pd.DataFrame(avg_columns, index=index).round(2).to_csv(avg_path)
+    pd.concat(cmp_pairs, axis=1).to_csv(cmp_path, index=False)
+    return avg_path, cmp_path
+
+
+def run_windfarm(avg_path, cmp_path):
+    windfarm = WindFarm(
+        avg_path=avg_path,
+        compressed_path=cmp_path,
+        data_source_type=DataSourceType.CSV,
+        project="WAK",
+        oem_powercurve_path=OEM_POWERCURVE_PATH,
+    )
+    return get_windfarm_outputs(windfarm, with_powercurves=True)
+
+
+def run_chunked_windfarm(avg_path, cmp_path, window_days):
+    chunked = ChunkedWindFarm(
+        avg_path,
+        compressed_path=cmp_path,
+        window_days=window_days,
+        overlap_days=get_required_overlap_days(),
+        project="WAK",
+        oem_powercurve_path=OEM_POWERCURVE_PATH,
+    )
+    return chunked._process()
+
+
+def measure(func):
+    """Return the result and the peak traced memory, in bytes, of a call.
+
+    The calls are not timed: tracing slows them down unevenly.
+    """
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turbines", type=int, default=10)
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 60, 120, 240])
+    parser.add_argument("--window-days", type=int, default=15)
+    args = parser.parse_args()
+
+    print(
+        f"{args.turbines} turbines, windows of {args.window_days} days "
+        f"with {get_required_overlap_days()} day(s) of overlap"
+    )
+    print(f"{'days':>6} {'WindFarm':>16} {'ChunkedWindFarm':>19}")
+    with tempfile.TemporaryDirectory() as root:
+        # the first run loads what is cached for the process, like the revenue grid
+        avg_path, cmp_path = write_farm_files(root, args.turbines, 2)
+        run_windfarm(avg_path, cmp_path)
+        run_chunked_windfarm(avg_path, cmp_path, args.window_days)
+
+        for days in args.days:
+            avg_path, cmp_path = write_farm_files(root, args.turbines, days)
+            expected, farm_peak = measure(lambda: run_windfarm(avg_path, cmp_path))
+            outputs, chunked_peak = measure(
+                lambda: run_chunked_windfarm(avg_path, cmp_path, args.window_days)
+            )
+            assert sorted(outputs) == sorted(expected)
+            for name, output in expected.items():
+                pd.testing.assert_frame_equal(outputs[name], output, check_freq=False)
+            print(
+                f"{days:>6} {farm_peak / 2**20:>12.0f} MiB {chunked_peak / 2**20:>15.0f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
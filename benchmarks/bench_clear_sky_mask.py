@@ -0,0 +1,104 @@
+"""Microbenchmark of `Databricks_Repository.keep_only_clear_sky_days`.
+
+Compares the vectorized mask with the way it used to be applied: one
+`iterrows` step per clear sky day, each scanning the dates and the
+columns of the metrics. The data is synthetic, so no workspace is needed:
+
+    python -m benchmarks.bench_clear_sky_mask --days 180 --stations 400
+"""
+
+import argparse
+import os
+import statistics
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from config import get_environment_config
+
+for key, value in get_environment_config().items():
+    os.environ.setdefault(key, value)
+
+from Model.DataAccess import Databricks_Repository
+
+
+def legacy_keep_only_clear_sky_days(metrics_df, clear_sky_df):
+    """The `iterrows` implementation, kept for comparison."""
+    for index, row in clear_sky_df.iterrows():
+        date = row["date"]
+        plant = row["plant"]
+
+        df_index = metrics_df[metrics_df["date"] == date].index
+        matching_columns = [
+            col for col in metrics_df.columns if col.startswith(plant)
+        ]
+        metrics_df.loc[df_index, matching_columns] = np.nan
+    return metrics_df
+
+
+def make_data(days, stations, plants, clear_sky_ratio, seed=0):
+    """Build a wide metrics table and its clear sky days.
+
+    Returns:
+        (tuple): The `(metrics_df, clear_sky_df)` pair.
+    """
+    rng = np.random.default_rng(seed)
+    plant_names = [f"P{i:02d}" for i in range(plants)]
+    dates = [date(2024, 1, 1) + timedelta(days=i) for i in range(days)]
+    columns = {
+        f"{plant_names[i % plants]}-BLK01-PCS{i:03d}-WS1-GHI_cosine": rng.random(days)
+        for i in range(stations)
+    }
+    metrics_df = pd.DataFrame({"date": dates, **columns})
+
+    pairs = [(d, p) for d in dates for p in plant_names]
+    is_clear_sky = rng.random(len(pairs)) < clear_sky_ratio
+    clear_sky_df = pd.DataFrame(
+        [pair for pair, keep in zip(pairs, is_clear_sky) if keep],
+        columns=["date", "plant"],
+    )
+    clear_sky_df["is_clear_sky_day"] = 1
+    return metrics_df, clear_sky_df
+
+
+def bench(name, func, metrics_df, clear_sky_df, repeat):
+    timings = []
+    for _ in range(repeat):
+        df = metrics_df.copy()
+        tic = time.perf_counter()
+        result_df = func(df, clear_sky_df)
+        timings.append(time.perf_counter() - tic)
+    print(
+        f"{name:>10}: median {statistics.median(timings) * 1000:9.2f}ms "
+        f"(min {min(timings) * 1000:.2f}ms) over {repeat} runs"
+    )
+    return result_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--stations", type=int, default=400)
+    parser.add_argument("--plants", type=int, default=12)
+    parser.add_argument("--clear-sky-ratio", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    metrics_df, clear_sky_df = make_data(
+        args.days, args.stations, args.plants, args.clear_sky_ratio
+    )
+    print(
+        f"{len(metrics_df)} days x {args.stations} columns, "
+        f"{len(clear_sky_df)} clear sky days"
+    )
+    df_legacy = bench("iterrows", legacy_keep_only_clear_sky_days, metrics_df, clear_sky_df, args.repeat)
+    df_new = bench(
+        "vectorized", Databricks_Repository.keep_only_clear_sky_days, metrics_df, clear_sky_df, args.repeat
+    )
+    print(f"identical output: {df_legacy.equals(df_new)}")
+
+
+if __name__ == "__main__":
+    main()
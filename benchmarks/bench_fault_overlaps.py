@@ -0,0 +1,186 @@
+"""Benchmark `Model.Fault.segment_faults`.
+
+Compares the sweep of sorted intervals with the way
+`FaultAnalysis.calculate_fault_metrics` used to find the overlaps: for
+every fault, a scan of every valid interval, then a pass over every
+segment for each valid interval to attribute the tails. The data is a
+synthetic year of compressed fault data, so no workspace is needed:
+
+    python -m benchmarks.bench_fault_overlaps --turbines 100 --days 365
+
+The legacy version grows with faults x intervals, so it only runs on the
+first `--legacy-turbines` turbines, and both are compared per turbine.
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from Model.Fault import segment_faults
+
+
+def legacy_segment_faults(df_fault, merged_valid_intervals):
+    """The pure Python implementation, kept for comparison."""
+    all_rows = []
+    for _, row in df_fault.iterrows():
+        turbine = row["Turbine"]
+        fault_start = row["StartDateTime"]
+        fault_end = row["EndDateTime"]
+
+        overlapping_intervals = [
+            (valid_start, valid_end)
+            for valid_start, valid_end in merged_valid_intervals
+            if valid_start < fault_end and valid_end > fault_start
+        ]
+
+        for start, end in overlapping_intervals:
+            all_rows.append(
+                (
+                    row["FaultCode"],
+                    turbine,
+                    max(start, fault_start),
+                    min(end, fault_end),
+                    (fault_end - fault_start).total_seconds(),
+                    row["OriginalStartDateTime"],
+                    row["OriginalEndDateTime"],
+                )
+            )
+
+    columns = [
+        "FaultCode",
+        "Turbine",
+        "StartDateTime",
+        "EndDateTime",
+        "PreAdjustedDuration",
+        "OriginalStartDateTime",
+        "OriginalEndDateTime",
+    ]
+    segmented_df = pd.DataFrame(all_rows, columns=columns)
+
+    overlap_durations = np.zeros(len(segmented_df))
+    adjusted_starts = np.full(
+        segmented_df.shape[0], np.datetime64("NaT"), dtype="datetime64[ns]"
+    )
+    adjusted_ends = np.full(
+        segmented_df.shape[0], np.datetime64("NaT"), dtype="datetime64[ns]"
+    )
+    for valid_interval_start, valid_interval_end in merged_valid_intervals:
+        overlap_start = np.maximum(
+            segmented_df["StartDateTime"].values, np.datetime64(valid_interval_start)
+        )
+        overlap_end = np.minimum(
+            segmented_df["EndDateTime"].values, np.datetime64(valid_interval_end)
+        )
+        segmented_df["NextStartDateTime"] = segmented_df["StartDateTime"].shift(-1)
+        condition = (segmented_df["NextStartDateTime"] > valid_interval_end) & (
+            valid_interval_start < overlap_end
+        )
+        overlap_end = np.where(condition, np.datetime64(valid_interval_end), overlap_end)
+        current_overlap_durations = (
+            (overlap_end - overlap_start).astype("timedelta64[s]").astype(int)
+        )
+        positive_overlaps = current_overlap_durations > 0
+        current_overlap_durations[~positive_overlaps] = 0
+        adjusted_starts[positive_overlaps] = overlap_start[positive_overlaps]
+        adjusted_ends[positive_overlaps] = overlap_end[positive_overlaps]
+        overlap_durations += current_overlap_durations
+
+    segmented_df["AdjustedDuration"] = overlap_durations
+    segmented_df["AdjustedStartDateTime"] = adjusted_starts
+    segmented_df["AdjustedEndDateTime"] = adjusted_ends
+    return segmented_df
+
+
+def make_turbine(days, faults_per_day, rng, turbine):
+    """The faults and merged valid intervals of one synthetic turbine."""
+    n_faults = days * faults_per_day
+    offsets = np.sort(rng.choice(days * 86400, n_faults, replace=False))
+    starts = np.datetime64("2023-01-01", "ns") + offsets.astype("timedelta64[s]")
+    ends = np.append(starts[1:], starts[-1] + np.timedelta64(10, "m"))
+    df_fault = pd.DataFrame(
+        {
+            "StartDateTime": starts,
+            "FaultCode": pd.Series(rng.integers(100, 120, n_faults)).astype("category"),
+            "Turbine": turbine,
+            "EndDateTime": ends,
+            "OriginalStartDateTime": starts,
+            "OriginalEndDateTime": ends,
+        }
+    )
+
+    # valid 10 minute intervals come in runs, which are merged the way
+    # calculate_fault_metrics merges them
+    index = pd.date_range("2023-01-01", periods=days * 144, freq="10min")
+    valid = pd.Series(rng.random(len(index)) < 0.05).rolling(4, min_periods=1).max()
+    timestamps = pd.Series(index[valid.to_numpy(dtype=bool)])
+    groups = (timestamps.diff() != pd.Timedelta(minutes=10)).cumsum()
+    merged = timestamps.groupby(groups).agg(["first", "last"])
+    merged.loc[merged["last"] == merged["first"], "last"] = merged["first"] + pd.Timedelta(
+        minutes=10
+    )
+    return df_fault, merged
+
+
+def time_call(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turbines", type=int, default=100)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--faults-per-day", type=int, default=20)
+    parser.add_argument("--legacy-turbines", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    turbines = [
+        make_turbine(args.days, args.faults_per_day, rng, f"PDK-T{i:03d}")
+        for i in range(args.turbines)
+    ]
+    print(
+        f"{args.turbines} turbines x {args.days} days, "
+        f"{sum(len(df_fault) for df_fault, _ in turbines)} faults"
+    )
+
+    sweep_total = 0.0
+    legacy_total = 0.0
+    for i, (df_fault, merged) in enumerate(turbines):
+        valid_starts = merged["first"].to_numpy(dtype="datetime64[ns]")
+        valid_ends = merged["last"].to_numpy(dtype="datetime64[ns]")
+        segmented_df, timing = time_call(
+            lambda: segment_faults(df_fault, valid_starts, valid_ends), args.repeat
+        )
+        sweep_total += timing
+        if i < args.legacy_turbines:
+            legacy_df, legacy_timing = time_call(
+                lambda: legacy_segment_faults(
+                    df_fault, list(zip(merged["first"], merged["last"]))
+                ),
+                args.repeat,
+            )
+            pd.testing.assert_frame_equal(segmented_df, legacy_df)
+            legacy_total += legacy_timing
+
+    compared = min(args.legacy_turbines, args.turbines)
+    sweep = sweep_total / args.turbines
+    print(f" sweep: {sweep_total:.2f} s for every turbine, {sweep * 1000:.0f} ms per turbine")
+    if compared:
+        legacy = legacy_total / compared
+        print(
+            f"legacy: {legacy * 1000:.0f} ms per turbine ({legacy / sweep:.0f}x), "
+            f"identical results on {compared} turbines"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Benchmark a `Fleet` built serially and with 1 to N worker processes.
+
+The fleet is synthetic: one AVG and one compressed CSV file per project,
+for the projects of ONLINE_FILTER_PARAMETERS that have a single
+technology, with online codes and power values within their limits. So
+no workspace is needed:
+
+    python -m benchmarks.bench_fleet_workers --projects 8 --turbines 20 --days 60 --max-workers 8
+
+Each run builds the fleet and combines the daily means and the flagged
+turbines, which is where the serial fleet spends its time.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import get_environment_config
+
+for key, value in get_environment_config().items():
+    os.environ.setdefault(key, value)
+
+from Fleet import Fleet
+from Model.Constants.OnlineFilter import ONLINE_FILTER_PARAMETERS
+from Utils.Constants import PROJECT_SUBSETS
+from Utils.Enums import ComponentTypes
+
+
+TAG_SUFFIXES = {
+    "KW": ComponentTypes.ACTIVE_POWER.value,
+    "GEN-SPD-RPM": ComponentTypes.GEN_SPEED.value,
+    "BLADE-ANGLE-A": ComponentTypes.PITCH_ANGLE_A.value,
+    "GEN-BRG-DE-T-C": None,
+    "GEN-BRG-NDE-T-C": None,
+    "HS-BRG-T-C": None,
+}
+
+
+def get_projects(count):
+    """The synthetic projects, with their online filter parameters."""
+    projects = [
+        (project, next(iter(technologies.values())))
+        for project, technologies in ONLINE_FILTER_PARAMETERS.items()
+        if project not in PROJECT_SUBSETS and len(technologies) == 1
+    ]
+    if count > len(projects):
+        raise ValueError(f"Only {len(projects)} synthetic projects are available.")
+    return projects[:count]
+
+
+def write_fleet(root, projects, turbines, days, seed=0):
+    """Write the AVG and compressed files of each project under `root`."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=days * 144, freq="10min")
+    dirs = {}
+    for name in ["avg", "cmp", "yaw"]:
+        dirs[name] = os.path.join(root, name)
+        os.makedirs(dirs[name])
+
+    for project, params in projects:
+        avg_columns = {}
+        cmp_columns = {}
+        for turbine in range(1, turbines + 1):
+            tag = f"{project}-T{turbine:03d}"
+            for suffix, component_type in TAG_SUFFIXES.items():
+                bounds = params.get(component_type, {"lower_bound": 20, "upper_bound": 80})
+                avg_columns[f"{tag}-{suffix}"] = rng.uniform(
+                    bounds["lower_bound"], bounds["upper_bound"], size=len(index)
+                )
+            # one event per day, in normal operation most of the time
+            for i, code_type in enumerate(["ERR-CODE", "STATE"]):
+                component_type = (
+                    ComponentTypes.FAULT_CODE.value
+                    if code_type == "ERR-CODE"
+                    else ComponentTypes.OPERATING_STATE.value
+                )
+                normal_code = params[component_type]["normal_codes"][0]
+                times = pd.date_range("2024-01-01", periods=days, freq="D") + pd.Timedelta(
+                    minutes=7
+                )
+                codes = np.where(rng.random(days) < 0.9, normal_code, normal_code + 1)
+                cmp_columns[f"DateTime.{turbine}.{i}"] = times.strftime("%m/%d/%Y %I:%M:%S %p")
+                cmp_columns[f"{tag}-{code_type}"] = codes
+
+        avg_data = pd.DataFrame(avg_columns, index=index)
+        avg_data.index.name = "DateTime"
+        avg_data.to_csv(os.path.join(dirs["avg"], f"{project}.csv"))
+        pd.DataFrame(cmp_columns).to_csv(os.path.join(dirs["cmp"], f"{project}.csv"), index=False)
+    return dirs
+
+
+def run_fleet(dirs, max_workers):
+    fleet = Fleet(
+        avg_dir=dirs["avg"], cmp_dir=dirs["cmp"], yaw_dir=dirs["yaw"], max_workers=max_workers
+    )
+    daily_mean = fleet.get_daily_mean()
+    flagged_turbines, _ = fleet.get_flagged_turbines()
+    return daily_mean, flagged_turbines
+
+
+def bench(name, func, repeat):
+    timings = []
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - tic)
+    print(
+        f"{name:>12}: median {statistics.median(timings):7.3f}s "
+        f"(min {min(timings):.3f}s) over {repeat} runs"
+    )
+    return result, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=8)
+    parser.add_argument("--turbines", type=int, default=20)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    # WindFarm reads its assets relative to a subdirectory of the repository
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    projects = get_projects(args.projects)
+    with tempfile.TemporaryDirectory() as root:
+        dirs = write_fleet(root, projects, args.turbines, args.days)
+        print(f"{len(projects)} projects x {args.turbines} turbines x {args.days} days")
+
+        (serial_mean, serial_flagged), serial_time = bench(
+            "serial", lambda: run_fleet(dirs, None), args.repeat
+        )
+        workers = 1
+        while True:
+            (daily_mean, flagged), timing = bench(
+                f"{workers} workers", lambda: run_fleet(dirs, workers), args.repeat
+            )
+            same = daily_mean.equals(serial_mean) and flagged.equals(serial_flagged)
+            print(f"{'':>12}  speedup {serial_time / timing:.2f}x, same results: {same}")
+            if workers >= args.max_workers:
+                break
+            workers = min(workers * 2, args.max_workers)
+
+
+if __name__ == "__main__":
+    main()
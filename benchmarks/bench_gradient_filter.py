@@ -0,0 +1,116 @@
+"""Benchmark `Model.Filter.gradient_filter`.
+
+Compares the array kernel with the way it used to be computed: a pandas
+`rolling().sum()` per direction, per order and per flagging side, on the
+whole frame. The data is synthetic 10-minute wind speeds with stuck
+sensor sections, so no workspace is needed:
+
+    python -m benchmarks.bench_gradient_filter --turbines 100 --days 365
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from Model.Filter import gradient_filter
+
+
+def legacy_gradient_filter(
+    data,
+    change_threshold,
+    upper_bound,
+    lower_bound,
+    repeat_threshold,
+    gradient_flag_value=-9990,
+    diff_depth=2,
+    margin=3,
+):
+    """The pandas implementation, kept for comparison."""
+    repeat_threshold = int(repeat_threshold)
+    diff_depth = int(diff_depth)
+    margin = int(margin)
+
+    total_flags = False
+    for forward in [True, False]:
+        upper_bound_data = data <= upper_bound
+        lower_bound_data = data >= lower_bound
+        for diff_num in range(1, diff_depth + 1):
+            window_size = (repeat_threshold - 1) * diff_num
+            if diff_num == 2:
+                diff_data = (
+                    diff_data.diff(periods=diff_num)
+                    if forward
+                    else diff_data.diff(periods=-diff_num)
+                )
+            else:
+                diff_data = (
+                    data.diff(periods=diff_num) if forward else data.diff(periods=-diff_num)
+                )
+            change_data_forward = (abs(diff_data) <= change_threshold).rolling(
+                window=window_size
+            ).sum() == window_size
+            change_data_backward = (abs(diff_data) <= change_threshold).rolling(
+                window=window_size
+            ).sum().shift(-window_size + 1) == window_size
+            change_data = change_data_forward | change_data_backward
+            total_flags |= change_data & upper_bound_data & lower_bound_data
+
+    extended_flags = total_flags.copy()
+    for _ in range(margin):
+        extended_flags |= total_flags.shift()
+        extended_flags |= total_flags.shift(-1)
+
+    flag_stats = extended_flags.mean().mul(100).round(2).to_dict()
+    data[extended_flags] = gradient_flag_value
+    return data, flag_stats
+
+
+def make_wind_speeds(turbines, days, seed=0):
+    """Random wind speeds, with stuck sections and gaps in every turbine."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=144 * days, freq="10min")
+    values = np.abs(rng.normal(7, 3, size=(len(index), turbines))).round(1)
+    for column in range(turbines):
+        for start in rng.integers(0, len(index) - 30, size=days // 5 + 1):
+            values[start : start + rng.integers(3, 30), column] = values[start, column]
+        for start in rng.integers(0, len(index) - 10, size=days // 10 + 1):
+            values[start : start + 10, column] = np.nan
+    return pd.DataFrame(values, index=index, columns=[f"T{i:03d}" for i in range(turbines)])
+
+
+def time_call(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turbines", type=int, default=100)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = make_wind_speeds(args.turbines, args.days)
+    kwargs = dict(change_threshold=0.1, upper_bound=30, lower_bound=3, repeat_threshold=3)
+
+    new_data, new_stats = gradient_filter(data.copy(), **kwargs)
+    old_data, old_stats = legacy_gradient_filter(data.copy(), **kwargs)
+    pd.testing.assert_frame_equal(new_data, old_data)
+    assert new_stats == old_stats
+    print(f"{data.shape[0]} rows x {data.shape[1]} turbines, identical results")
+
+    legacy = time_call(lambda: legacy_gradient_filter(data.copy(), **kwargs), args.repeat)
+    kernel = time_call(lambda: gradient_filter(data.copy(), **kwargs), args.repeat)
+    print(f"legacy: {legacy * 1000:.0f} ms")
+    print(f"kernel: {kernel * 1000:.0f} ms ({legacy / kernel:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
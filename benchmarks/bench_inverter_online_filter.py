@@ -0,0 +1,136 @@
+"""Benchmark the one-scan query behind the Inverter drill-down subcharts.
+
+Compares `get_inverter_performance_power_online_filter` with the way it
+used to be computed: five scans of `isight.clean_data` (one per series),
+each sorted, then inner-joined on `start_time_utc`.
+
+This runs against the Databricks workspace of the current environment:
+
+    python -m benchmarks.bench_inverter_online_filter ADB-BLK01-PCS001-INV01 2024-07-01 2024-07-31
+
+Wall time is measured on the client. The bytes read are taken from the
+Query History of the workspace, when the queries of the session show up
+there (serverless compute).
+"""
+
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime
+
+import numpy as np
+
+from config import get_environment_config
+
+for key, value in get_environment_config().items():
+    os.environ.setdefault(key, value)
+
+from Charts.Solar.Helpers import extract_plant
+from Model.DataAccess import Databricks_Repository
+
+
+def legacy_online_filter(conn, inverter, plant, start_date, end_date):
+    """The five-scan, four-join implementation, kept for comparison."""
+    df_ap = conn.get_inverter_active_power(inverter, start_date, end_date, as_pyspark=True)
+    df_poa = conn.get_plant_irradiance_poa_average(plant, start_date, end_date, as_pyspark=True)
+    df_ap_denom = conn.get_inverter_active_power_denormalized(inverter, start_date, end_date, as_pyspark=True)
+    df_ap_exp = conn.get_inverter_active_power_expected(inverter, start_date, end_date, as_pyspark=True)
+    df_plant_ap = conn.get_plant_active_power_normalized(plant, start_date, end_date, as_pyspark=True)
+
+    df_ap = df_ap.filter("ActivePower > -1000")
+    df_ap_denom = df_ap_denom.filter("ActivePowerNormalized > -1000")
+    df_combined = (df_poa
+        .join(df_ap_denom, on="start_time_utc", how="inner")
+        .join(df_ap_exp, on="start_time_utc", how="inner")
+        .join(df_ap, on="start_time_utc", how="inner")
+        .join(df_plant_ap, on="start_time_utc", how="inner")
+    )
+    df = df_combined.toPandas()
+    df.replace([-9999, 9999], np.nan, inplace=True)
+    measurement_columns = [
+        "IrradiancePOAAverage",
+        "ActivePowerNormalized",
+        "ActivePowerExpected",
+        "ActivePower",
+        "InverterActivePowerNormalizedAverage",
+    ]
+    return conn._filter_valid_measurements(df, measurement_columns)
+
+
+def one_scan_online_filter(conn, inverter, plant, start_date, end_date):
+    """The current implementation, bypassing the result cache."""
+    return Databricks_Repository.get_inverter_performance_power_online_filter.uncached(
+        conn, inverter, plant, start_date, end_date
+    )
+
+
+def read_bytes_since(start_time_ms):
+    """Sum the bytes read by the queries that started after a time.
+
+    Returns:
+        (int): The number of bytes, or None if the Query History is not
+            available for this workspace.
+    """
+    try:
+        from databricks.sdk import WorkspaceClient
+        from databricks.sdk.service.sql import QueryFilter, TimeRange
+
+        client = WorkspaceClient(
+            host=os.environ["SOLAR_ALT_DATABRICKS_HOST"],
+            client_id=os.environ["SOLAR_ALT_DATABRICKS_CLIENT_ID"],
+            client_secret=os.environ["SOLAR_ALT_DATABRICKS_CLIENT_SECRET"],
+        )
+        queries = client.query_history.list(
+            filter_by=QueryFilter(query_start_time_range=TimeRange(start_time_ms=start_time_ms)),
+            include_metrics=True,
+        )
+        read_bytes = [q.metrics.read_bytes or 0 for q in queries.res or [] if q.metrics]
+    except Exception as e:
+        print(f"Query History is not available: {e}")
+        return None
+    return sum(read_bytes) if read_bytes else None
+
+
+def bench(name, func, repeat):
+    timings = []
+    start_time_ms = int(time.time() * 1000)
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        df = func()
+        timings.append(time.perf_counter() - tic)
+    # give the Query History a moment to record the last query
+    time.sleep(5)
+    read_bytes = read_bytes_since(start_time_ms)
+    read_bytes_label = "n/a" if read_bytes is None else f"{read_bytes / repeat / 1e6:,.1f} MB"
+    print(
+        f"{name:>10}: median {statistics.median(timings):6.2f}s "
+        f"(min {min(timings):.2f}s) over {repeat} runs, "
+        f"{len(df)} rows, read {read_bytes_label} per run"
+    )
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inverter")
+    parser.add_argument("start_date", type=datetime.fromisoformat)
+    parser.add_argument("end_date", type=datetime.fromisoformat)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    conn = Databricks_Repository()
+    plant = extract_plant(args.inverter)
+    call_args = (conn, args.inverter, plant, args.start_date, args.end_date)
+
+    df_legacy = bench("five scans", lambda: legacy_online_filter(*call_args), args.repeat)
+    df_new = bench("one scan", lambda: one_scan_online_filter(*call_args), args.repeat)
+
+    df_legacy = df_legacy.sort_values("start_time_utc", ignore_index=True)
+    df_new = df_new.reset_index(drop=True)
+    same = df_legacy[df_new.columns].equals(df_new)
+    print(f"identical output: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Benchmark `FarmComponent.get_severity_scores`.
+
+Compares the array-based pipeline with the way it used to be computed: a
+`filter_days` call per turbine and per day to drop the days with a low
+recovery, and a `custom_sum` call per turbine and per day for the daily
+sums. The data is synthetic 10-minute data, so no workspace is needed:
+
+    python -m benchmarks.bench_severity_scores --turbines 100 --days 365
+"""
+
+import argparse
+import os
+import statistics
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from config import get_environment_config
+
+for key, value in get_environment_config().items():
+    os.environ.setdefault(key, value)
+
+from Model.WindFarm import FarmComponent
+from Utils.Transformers import (
+    calculate_window_severity_with_recovery_threshold,
+    custom_sum,
+    filter_days,
+)
+
+
+def legacy_severity_scores(component, density_thresh, daily_threshold):
+    """The per-(day, turbine) `apply` implementation, kept for comparison.
+
+    `group_keys=False` keeps the DatetimeIndex, as the pandas versions
+    this was written for did.
+    """
+    all_intervals = pd.date_range(
+        start=component.data.index.min(), end=component.data.index.max(), freq=component._freq
+    )
+    df = component.clean_data.copy().reindex(all_intervals, fill_value=np.nan)
+    df = df.groupby(df.index.date, group_keys=False).apply(
+        lambda x: x.apply(
+            lambda y: filter_days(y, freq=component._freq, threshold=daily_threshold)
+        )
+    )
+    row_mean = df[df > -1000].mean(axis=1)
+    row_std = df[df > -1000].std(axis=1)
+    z_scores = (
+        df[df > -1000] - row_mean.values.reshape(-1, 1)
+    ) / row_std.values.reshape(-1, 1)
+    window_severity_frame = calculate_window_severity_with_recovery_threshold(
+        z_scores=z_scores, period=36, density_thresh=density_thresh
+    )
+    return window_severity_frame.groupby(
+        window_severity_frame.index.date
+    ).apply(lambda x: x.apply(custom_sum))
+
+
+def make_component(turbines, days, missing_ratio, seed=0):
+    """Build the attributes `get_severity_scores` reads from a component."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=days * 144, freq="10min")
+    values = rng.normal(50, 10, size=(len(index), turbines))
+
+    # knock out whole stretches, so that some days fail the recovery check
+    for column in range(turbines):
+        for start in rng.integers(0, len(index), size=int(days * missing_ratio)):
+            values[start : start + rng.integers(6, 200), column] = np.nan
+    columns = [f"WAK-T{i:03d}-GEN-BRG-DE-T-C" for i in range(turbines)]
+    data = pd.DataFrame(values, index=index, columns=columns)
+    return SimpleNamespace(data=data, clean_data=data, _freq="10T")
+
+
+def bench(name, func, repeat):
+    timings = []
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - tic)
+    print(
+        f"{name:>12}: median {statistics.median(timings):7.3f}s "
+        f"(min {min(timings):.3f}s) over {repeat} runs"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turbines", type=int, default=100)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--missing-ratio", type=float, default=0.3)
+    parser.add_argument("--density-thresh", type=float, default=0.9)
+    parser.add_argument("--daily-threshold", type=float, default=0.9)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    component = make_component(args.turbines, args.days, args.missing_ratio)
+    print(f"{args.turbines} turbines x {len(component.data)} 10-minute records")
+
+    df_legacy = bench(
+        "apply",
+        lambda: legacy_severity_scores(component, args.density_thresh, args.daily_threshold),
+        args.repeat,
+    )
+    df_new = bench(
+        "vectorized",
+        lambda: FarmComponent.get_severity_scores.__wrapped__(
+            component,
+            density_thresh=args.density_thresh,
+            daily_threshold=args.daily_threshold,
+        ),
+        args.repeat,
+    )
+
+    df_legacy = df_legacy.astype(float)
+    same_nans = df_legacy.isna().equals(df_new.isna())
+    max_diff = np.nanmax(np.abs(df_legacy.to_numpy() - df_new.to_numpy()), initial=0)
+    print(f"same missing days: {same_nans}, max abs difference: {max_diff:.3g}")
+
+
+if __name__ == "__main__":
+    main()
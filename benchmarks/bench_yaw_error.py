@@ -0,0 +1,122 @@
+"""Benchmark `CalculatedYawErrorFarmComponent.calculate_yaw_error`.
+
+Compares the rank filter of `Model.Filter.rolling_median` with the way the
+rolling yaw error used to be computed: a pandas `rolling().median()` per
+turbine, followed by a `groupby` of the timestamps. The data is synthetic
+10-second yaw positions and wind directions with missing values, so no
+workspace is needed:
+
+    python -m benchmarks.bench_yaw_error --turbines 10 --days 30
+
+The kernel needs SciPy 1.14 or later, whose 1D rank filter keeps its
+window sorted as it slides. With an older SciPy, `rolling_median` falls
+back to pandas and both timings are the same. The SciPy version is
+printed with the results. At 10 turbines x 30 days, with SciPy 1.17.1 on
+one CPU, calculate_yaw_error went from 4.4 s to 1.4 s.
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+import scipy
+
+from Model.Filter import HAS_FAST_RANK_FILTER, rolling_median
+from Model.WindFarm import CalculatedYawErrorFarmComponent
+from Utils.Transformers import get_turbine
+
+
+def legacy_calculate_yaw_error(df, rolling_window_size=21600, minimum_valid_window_pct=0.3):
+    """The pandas implementation, kept for comparison."""
+    yaw_error_dfs = []
+    for turbine in dict.fromkeys(get_turbine(col) for col in df.columns):
+        yaw_pos_col, nac_wind_dir_col = f"{turbine}-YAW-DIR", f"{turbine}-WIND-DIR"
+        this_df = df[[yaw_pos_col, nac_wind_dir_col]]
+        this_df = this_df[this_df > -1000].dropna()
+        yaw_error = this_df[yaw_pos_col] - this_df[nac_wind_dir_col]
+
+        min_periods = int(rolling_window_size * minimum_valid_window_pct)
+        rolling_avg_yaw_error = yaw_error.rolling(
+            window=rolling_window_size, min_periods=min_periods
+        ).median()
+        rolling_avg_yaw_error = rolling_avg_yaw_error.groupby(
+            rolling_avg_yaw_error.index
+        ).agg("first")
+        yaw_error_dfs.append(rolling_avg_yaw_error.to_frame(name=turbine + "-YAW-ERROR"))
+
+    return pd.concat(yaw_error_dfs, axis=1, join="outer")
+
+
+def make_yaw_data(turbines, days, seed=0):
+    """Random yaw positions and wind directions, with flagged and missing values."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=8640 * days, freq="10s", name="DateTime")
+    columns = {}
+    for i in range(turbines):
+        yaw_position = rng.uniform(0, 360, len(index)).round(1)
+        wind_direction = (yaw_position + rng.normal(2, 8, len(index))).round(1)
+        yaw_position[rng.random(len(index)) < 0.03] = -9999
+        wind_direction[rng.random(len(index)) < 0.01] = np.nan
+        columns[f"KAY-T{i:03d}-YAW-DIR"] = yaw_position
+        columns[f"KAY-T{i:03d}-WIND-DIR"] = wind_direction
+    return pd.DataFrame(columns, index=index)
+
+
+def time_call(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turbines", type=int, default=10)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--window", type=int, default=21600)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = make_yaw_data(args.turbines, args.days)
+    component = CalculatedYawErrorFarmComponent(name="Yaw_Error", project="KAY", data=data)
+
+    new_df = component.calculate_yaw_error(data, rolling_window_size=args.window)
+    old_df = legacy_calculate_yaw_error(data, rolling_window_size=args.window)
+    pd.testing.assert_frame_equal(new_df, old_df)
+    print(f"{data.shape[0]} rows x {args.turbines} turbines, identical results")
+    print(
+        f"SciPy {scipy.__version__}, "
+        f"{'rank filter kernel' if HAS_FAST_RANK_FILTER else 'pandas fallback (SciPy < 1.14)'}"
+    )
+
+    values = np.random.default_rng(1).normal(0, 10, len(data))
+    min_periods = int(args.window * 0.3)
+    legacy_median = time_call(
+        lambda: pd.Series(values).rolling(args.window, min_periods=min_periods).median(),
+        args.repeat,
+    )
+    kernel_median = time_call(
+        lambda: rolling_median(values, args.window, min_periods=min_periods), args.repeat
+    )
+    print(f"rolling median of one turbine, window of {args.window}:")
+    print(f"  legacy: {legacy_median * 1000:.0f} ms")
+    print(f"  kernel: {kernel_median * 1000:.0f} ms ({legacy_median / kernel_median:.1f}x)")
+
+    legacy = time_call(
+        lambda: legacy_calculate_yaw_error(data, rolling_window_size=args.window), args.repeat
+    )
+    kernel = time_call(
+        lambda: component.calculate_yaw_error(data, rolling_window_size=args.window),
+        args.repeat,
+    )
+    print("calculate_yaw_error:")
+    print(f"  legacy: {legacy * 1000:.0f} ms")
+    print(f"  kernel: {kernel * 1000:.0f} ms ({legacy / kernel:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -854,54 +854,28 @@ def update_tornado_section_title(
 
 
 def create_tornado_chart(
-    conn,
-    dt_start_date,
-    dt_end_date,
-    plant,
+    tornado_data,
     measurement,
     recovery_df,
     metric,
     recovery_values,
     only_clear_sky_days,
     acknowledged_stations,
-    day_night_filter=None,
     base_color=None,
 ):
     """Create a tornado chart for the Weather Station Page.
     
     Args:
+        tornado_data (dict): The slice of the tornado data for
+            `measurement`. See `Databricks_Repository.select_tornado_data`.
         ...
     Return:
         ...
     """
-    budget_deviation_df = conn.get_budget_deviation(
-        start_date=dt_start_date,
-        end_date=dt_end_date,
-        measurement=measurement,
-        kpi="energy",
-    )
-    all_clear_sky_ratios_df = conn.get_all_clear_sky_ratios(
-        start_date=dt_start_date,
-        end_date=dt_end_date,
-    )
-    lost_revenue_df = conn.get_budget_deviation(
-        start_date=dt_start_date,
-        end_date=dt_end_date,
-        measurement=measurement,
-        kpi="revenue",
-    )
-
-    # fetch the metrics data just for the given tornado
-    metrics_df = conn.get_metrics_data(
-        metric = None,
-        measurement = measurement,
-        start_date = dt_start_date,
-        end_date = dt_end_date,
-        plant = plant,
-        should_aggregate = True,
-        only_clear_sky_days=only_clear_sky_days,
-        day_night_filter=day_night_filter,
-    )
+    budget_deviation_df = tornado_data["budget_deviation"]
+    lost_revenue_df = tornado_data["lost_revenue"]
+    all_clear_sky_ratios_df = tornado_data["clear_sky_ratios"]
+    metrics_df = tornado_data["metrics"]
 
     # remove all acknowledged weather stations
     weather_stations_to_remove = acknowledged_stations
@@ -988,13 +962,20 @@ def update_tornado_callback(
     else:
         only_clear_sky_days = False
 
-    recovery_df = conn.get_recovery_data(
-        start_date = dt_start_date,
-        end_date = dt_end_date,
-        plant = plant_arr,
-        aggr_func = "avg",
+    # the three tornados share these queries, see `get_tornado_data`
+    tornado_data = conn.get_tornado_data(
+        start_date=dt_start_date,
+        end_date=dt_end_date,
+        plant=plant_arr,
+        only_clear_sky_days=only_clear_sky_days,
         day_night_filter=day_night_filter,
     )
+    tornado_data = conn.select_tornado_data(
+        tornado_data=tornado_data,
+        measurement=measurement,
+    )
+
+    recovery_df = tornado_data["recovery"]
     recovery_df = recovery_df.iloc[0].sort_values(ascending=False)
 
     # filter out recoveries we don't want to see in the charts
@@ -1007,17 +988,13 @@ def update_tornado_callback(
     recovery_df = recovery_df.loc[~recovery_df.index.duplicated()]
 
     chart = create_tornado_chart(
-        conn=conn,
-        dt_start_date=dt_start_date,
-        dt_end_date=dt_end_date,
-        plant=plant_arr,
+        tornado_data=tornado_data,
         measurement=measurement,
         recovery_df=recovery_df,
         metric=metric,
         recovery_values=recovery_values,
         only_clear_sky_days=only_clear_sky_days,
         acknowledged_stations=acknowledged_stations,
-        day_night_filter=day_night_filter,
         base_color=base_color,
     )
     return chart